@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+import uuid
+
+# psutil is optional: without it leftover browsers are not tracked or reaped
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Environment variable carried by chromedriver and every Chrome process it
+# starts, naming the browser session and the process that owns it
+SESSION_MARKER = "SCRAPER_BROWSER_SESSION"
+SESSION_ARGUMENT = "--scraper-session="
+
+
+def new_session():
+    """A browser session id, prefixed with the owning process id"""
+    return f"{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+def session_env(session):
+    """Environment for chromedriver that marks its whole process tree"""
+    return {**os.environ, SESSION_MARKER: session}
+
+
+def _session_of(process):
+    try:
+        session = process.environ().get(SESSION_MARKER)
+        if session:
+            return session
+        for argument in process.cmdline():
+            if argument.startswith(SESSION_ARGUMENT):
+                return argument[len(SESSION_ARGUMENT) :]
+    except psutil.Error:
+        pass
+    return None
+
+
+def browser_processes():
+    """Running chromedriver and Chrome processes started by this service, by session"""
+    sessions = {}
+    if psutil is None:
+        return sessions
+    for process in psutil.process_iter(["name"]):
+        if "chrom" not in (process.info["name"] or "").lower():
+            continue
+        session = _session_of(process)
+        if session:
+            sessions.setdefault(session, []).append(process)
+    return sessions
+
+
+def kill_session(session, processes=None):
+    """Kill every process of a browser session, returning how many were killed"""
+    if psutil is None or not session:
+        return 0
+    if processes is None:
+        processes = browser_processes().get(session, [])
+    killed = 0
+    for process in processes:
+        try:
+            process.kill()
+            killed += 1
+        except psutil.Error:
+            pass
+    psutil.wait_procs(processes, timeout=3)
+    return killed
+
+
+def _rss(processes):
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def _owner_alive(session):
+    try:
+        owner = psutil.Process(int(session.split(":")[0]))
+        return owner.status() != psutil.STATUS_ZOMBIE
+    except (ValueError, psutil.Error):
+        return False
+
+
+class BrowserWatchdog:
+    """
+    Periodically finds the browsers this service started and reaps bad ones.
+
+    Every LINKEDIN_WATCHDOG_INTERVAL seconds, browser process trees are
+    grouped by session marker. Trees whose owning process is gone are killed
+    as orphans. Trees above LINKEDIN_BROWSER_MAX_RSS_MB are killed. Trees above
+    LINKEDIN_BROWSER_RECYCLE_SHARE of it have their owner recycled once its
+    current job is done.
+
+    Args:
+        on_oversized: Called with the owner pid of a tree that is too large,
+            returning whether a recycle was newly requested
+    """
+
+    def __init__(self, on_oversized=None):
+        self.on_oversized = on_oversized
+        self.interval = float(os.getenv("LINKEDIN_WATCHDOG_INTERVAL", "30"))
+        self.max_rss = float(os.getenv("LINKEDIN_BROWSER_MAX_RSS_MB", "1500")) * 2**20
+        self.recycle_share = float(os.getenv("LINKEDIN_BROWSER_RECYCLE_SHARE", "0.8"))
+        self.orphans_killed = 0
+        self.oversized_killed = 0
+        self.recycles_requested = 0
+        self.last_scan = {"sessions": 0, "processes": 0, "rss_mb": 0.0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if psutil is None:
+            print("⚠️ psutil not installed - browser watchdog disabled")
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="browser-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop scanning, after one last scan to reap what shutdown left behind"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"⚠️ Browser watchdog scan failed: {str(e)}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"⚠️ Browser watchdog scan failed: {str(e)}")
+
+    def scan(self):
+        """Reap orphaned and oversized browsers, refreshing the metrics"""
+        sessions = browser_processes()
+        live = processes = rss_total = 0
+        for session, tree in sessions.items():
+            rss = _rss(tree)
+            if not _owner_alive(session):
+                self.orphans_killed += kill_session(session, tree)
+                print(f"🧟 Killed orphaned browser session {session}")
+                continue
+
+            owner = int(session.split(":")[0])
+            if rss > self.max_rss * self.recycle_share and self.on_oversized:
+                if self.on_oversized(owner):
+                    self.recycles_requested += 1
+            if rss > self.max_rss:
+                self.oversized_killed += kill_session(session, tree)
+                print(f"🐘 Killed browser session {session} using {rss / 2**20:.0f} MB")
+                continue
+
+            live += 1
+            processes += len(tree)
+            rss_total += rss
+
+        self.last_scan = {
+            "sessions": live,
+            "processes": processes,
+            "rss_mb": round(rss_total / 2**20, 1),
+            "at": time.time(),
+        }
+
+    def stats(self):
+        return {
+            "enabled": psutil is not None,
+            "running": bool(self._thread and self._thread.is_alive()),
+            **self.last_scan,
+            "orphans_killed": self.orphans_killed,
+            "oversized_killed": self.oversized_killed,
+            "recycles_requested": self.recycles_requested,
+        }
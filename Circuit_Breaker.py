@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from collections import deque
+
+BREAKER_STATES = ("closed", "open", "half_open")
+BREAKER_MODES = ("park", "fail")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of queueing work while a fail-fast breaker is open"""
+
+    def __init__(self, retry_at):
+        self.retry_at = retry_at
+        super().__init__(
+            f"LinkedIn logins are suspended after repeated challenges, "
+            f"retry in {max(retry_at - time.time(), 0):.0f}s"
+        )
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a service that keeps rejecting them.
+
+    Outcomes of the last LINKEDIN_BREAKER_WINDOW calls are kept. Once at
+    least LINKEDIN_BREAKER_MIN_CALLS are known and the failure share reaches
+    LINKEDIN_BREAKER_THRESHOLD, the breaker opens for LINKEDIN_BREAKER_COOLDOWN
+    seconds. It then lets a single probe call through: success closes it,
+    failure reopens it with the cooldown doubled up to
+    LINKEDIN_BREAKER_MAX_COOLDOWN.
+
+    While open, callers are parked until the next probe, or refused with
+    CircuitOpenError when LINKEDIN_BREAKER_MODE is "fail".
+    """
+
+    # Seconds a parked call waits while a probe is in flight
+    PROBE_RECHECK = 15
+
+    def __init__(self, name="linkedin"):
+        self.name = name
+        self.window = int(os.getenv("LINKEDIN_BREAKER_WINDOW", "10"))
+        self.min_calls = int(os.getenv("LINKEDIN_BREAKER_MIN_CALLS", "4"))
+        self.threshold = float(os.getenv("LINKEDIN_BREAKER_THRESHOLD", "0.5"))
+        self.base_cooldown = float(os.getenv("LINKEDIN_BREAKER_COOLDOWN", "900"))
+        self.max_cooldown = float(os.getenv("LINKEDIN_BREAKER_MAX_COOLDOWN", "3600"))
+        self.mode = os.getenv("LINKEDIN_BREAKER_MODE", "park")
+        if self.mode not in BREAKER_MODES:
+            raise ValueError(f"LINKEDIN_BREAKER_MODE must be one of {BREAKER_MODES}")
+
+        self.state = "closed"
+        self.cooldown = self.base_cooldown
+        self.opened_until = 0.0
+        self.trips = 0
+        self._outcomes = deque(maxlen=self.window)  # True for failures
+        self._probe = None  # Token of the probe call in flight
+        self._lock = threading.Lock()
+
+    @property
+    def fail_fast(self):
+        return self.mode == "fail"
+
+    def check(self):
+        """Raise CircuitOpenError if new work should be refused outright"""
+        with self._lock:
+            if self.fail_fast and self.state != "closed":
+                raise CircuitOpenError(max(self.opened_until, time.time()))
+
+    def admit(self):
+        """
+        Ask to make a call.
+
+        Returns:
+            tuple: (recheck_at, probe). recheck_at is None if the call may go
+                ahead, otherwise the time at which to ask again. probe is a
+                token when the call is the half-open probe, else None; pass
+                it back to record or release
+        """
+        now = time.time()
+        with self._lock:
+            if self.state == "closed":
+                return None, None
+            if self.state == "open":
+                if now < self.opened_until:
+                    return self.opened_until, None
+                self.state = "half_open"
+                print(f"🔌 {self.name} circuit half-open, sending a probe")
+            if self._probe is not None:
+                return now + self.PROBE_RECHECK, None
+            self._probe = object()
+            return None, self._probe
+
+    def record(self, failed, probe=None):
+        """Report the outcome of an admitted call"""
+        with self._lock:
+            if probe is not None:
+                if probe is not self._probe:
+                    return  # A probe from before the breaker last changed
+                self._probe = None
+                if failed:
+                    self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                    self._open()
+                else:
+                    self.state = "closed"
+                    self.cooldown = self.base_cooldown
+                    self._outcomes.clear()
+                    print(f"✅ {self.name} circuit closed, probe succeeded")
+                return
+
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if (
+                self.state == "closed"
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.threshold
+            ):
+                self._open()
+
+    def release(self, probe=None):
+        """Report an admitted call that ended without telling either way"""
+        with self._lock:
+            if probe is not None and probe is self._probe:
+                self._probe = None
+
+    def _open(self):
+        self.state = "open"
+        self.trips += 1
+        self.opened_until = time.time() + self.cooldown
+        print(
+            f"🚫 {self.name} circuit open for {self.cooldown:.0f}s "
+            f"after repeated login challenges"
+        )
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "state": self.state,
+                "mode": self.mode,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": sum(self._outcomes),
+                "trips": self.trips,
+            }
+            if self.state != "closed":
+                stats["opened_until"] = self.opened_until
+            return stats
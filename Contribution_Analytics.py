@@ -0,0 +1,189 @@
+import numpy as np
+
+# Days per average month, for monthly means over arbitrary day ranges
+DAYS_PER_MONTH = 365.25 / 12
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+
+def contribution_array(days):
+    """
+    Pack contribution days into a dense per-day count array.
+
+    Args:
+        days (list): {"date": "YYYY-MM-DD", "count": int} entries, in any order
+
+    Returns:
+        tuple: (first date as numpy.datetime64[D], int32 array of daily counts)
+    """
+    if not days:
+        return None, np.zeros(0, dtype=np.int32)
+
+    dates = np.array([day["date"] for day in days], dtype="datetime64[D]")
+    counts = np.array([day["count"] for day in days], dtype=np.int32)
+    start = dates.min()
+    series = np.zeros(int((dates.max() - start).astype(np.int64)) + 1, dtype=np.int32)
+    series[(dates - start).astype(np.int64)] = counts
+    return start, series
+
+
+def contribution_matrix(histories):
+    """
+    Align several users' contribution days into one users x days matrix.
+
+    Every row covers the same date range; days outside a user's data are zero.
+
+    Args:
+        histories (list): One list of contribution days per user
+
+    Returns:
+        tuple: (first date as numpy.datetime64[D], int32 matrix of daily counts)
+    """
+    packed = [contribution_array(days) for days in histories]
+    present = [(start, series) for start, series in packed if series.size]
+    if not present:
+        return None, np.zeros((len(histories), 0), dtype=np.int32)
+
+    start = min(start for start, _ in present)
+    end = max(s + series.size for s, series in present)
+    matrix = np.zeros((len(histories), int((end - start).astype(np.int64))), np.int32)
+    for row, (user_start, series) in enumerate(packed):
+        if series.size:
+            offset = int((user_start - start).astype(np.int64))
+            matrix[row, offset : offset + series.size] = series
+    return start, matrix
+
+
+def _trailing_run(active):
+    """Length of the run of active days ending at the last column, per row"""
+    if active.shape[1] == 0:
+        return np.zeros(active.shape[0], dtype=np.int64)
+    inactive = ~active[:, ::-1]
+    first_gap = inactive.argmax(axis=1)
+    # argmax finds no gap in rows that are active throughout
+    return np.where(inactive.any(axis=1), first_gap, active.shape[1])
+
+
+def _longest_runs(active):
+    """Length of the longest run of active days, per row"""
+    users, day_count = active.shape
+    longest = np.zeros(users, dtype=np.int64)
+    # A trailing inactive column per row keeps runs from spanning two rows
+    padded = np.zeros((users, day_count + 1), dtype=np.int8)
+    padded[:, :day_count] = active
+    edges = np.flatnonzero(np.diff(padded.ravel(), prepend=0))
+    if not edges.size:
+        return longest
+
+    # Edges alternate between run starts and run ends, in row order
+    starts, ends = edges[0::2], edges[1::2]
+    rows = starts // (day_count + 1)
+    first_run = np.flatnonzero(np.diff(rows, prepend=-1))
+    longest[rows[first_run]] = np.maximum.reduceat(ends - starts, first_run)
+    return longest
+
+
+def batch_metrics(start, matrix, half_life_days=90):
+    """
+    Activity metrics for every row of a users x days contribution matrix.
+
+    Args:
+        start (numpy.datetime64): Date of the first column
+        matrix (numpy.ndarray): Daily contribution counts, one row per user
+        half_life_days (float): Age at which a contribution weighs half as much
+            in the recency-weighted score
+
+    Returns:
+        dict: Metric name to an array with one value per user
+    """
+    matrix = np.asarray(matrix)
+    users, day_count = matrix.shape
+    active = matrix > 0
+    totals = matrix.sum(axis=1, dtype=np.int64)
+
+    # The last day is today, which may not have seen activity yet
+    current = _trailing_run(active)
+    if day_count > 1:
+        current = np.where(active[:, -1], current, _trailing_run(active[:, :-1]))
+
+    longest = _longest_runs(active)
+
+    weeks = max(day_count / 7, 1)
+    months = max(day_count / DAYS_PER_MONTH, 1)
+
+    age = np.arange(day_count - 1, -1, -1, dtype=np.float64)
+    weights = 0.5 ** (age / half_life_days)
+    recency = matrix @ weights / weights.sum() if day_count else np.zeros(users)
+
+    by_weekday = np.zeros((users, 7), dtype=np.int64)
+    if day_count:
+        # 1970-01-01 was a Thursday, weekday 3 counting from Monday
+        first_weekday = (int(start.astype(np.int64)) + 3) % 7
+        for offset in range(min(7, day_count)):
+            weekday = (first_weekday + offset) % 7
+            by_weekday[:, weekday] = matrix[:, offset::7].sum(axis=1)
+    weekday_share = by_weekday / np.maximum(totals, 1)[:, None]
+
+    return {
+        "total_contributions": totals,
+        "current_streak": current,
+        "longest_streak": longest,
+        "weekly_mean": totals / weeks,
+        "monthly_mean": totals / months,
+        "active_day_ratio": active.mean(axis=1) if day_count else np.zeros(users),
+        "recency_score": recency,
+        "weekday_distribution": weekday_share,
+    }
+
+
+def _metrics_row(metrics, row):
+    return {
+        "total_contributions": int(metrics["total_contributions"][row]),
+        "current_streak": int(metrics["current_streak"][row]),
+        "longest_streak": int(metrics["longest_streak"][row]),
+        "weekly_mean": round(float(metrics["weekly_mean"][row]), 3),
+        "monthly_mean": round(float(metrics["monthly_mean"][row]), 3),
+        "active_day_ratio": round(float(metrics["active_day_ratio"][row]), 4),
+        "recency_score": round(float(metrics["recency_score"][row]), 4),
+        "weekday_distribution": {
+            weekday: round(float(share), 4)
+            for weekday, share in zip(WEEKDAYS, metrics["weekday_distribution"][row])
+        },
+    }
+
+
+def contribution_metrics(days, half_life_days=90):
+    """
+    Activity metrics for one user's contribution days.
+
+    Args:
+        days (list): {"date": "YYYY-MM-DD", "count": int} entries ending today
+
+    Returns:
+        dict: Streaks, weekly and monthly means, active-day ratio,
+            recency-weighted score and weekday distribution
+    """
+    start, series = contribution_array(days)
+    return _metrics_row(batch_metrics(start, series[None, :], half_life_days), 0)
+
+
+def score_cohort(histories, half_life_days=90):
+    """
+    Activity metrics for a whole cohort, computed in one pass over a matrix.
+
+    Args:
+        histories (list): One list of contribution days per user
+
+    Returns:
+        list: One metrics dict per user, in input order
+    """
+    start, matrix = contribution_matrix(histories)
+    metrics = batch_metrics(start, matrix, half_life_days)
+    return [_metrics_row(metrics, row) for row in range(len(histories))]
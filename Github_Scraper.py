@@ -1,19 +1,546 @@
-import requests
+import httpx
+import asyncio
+import contextvars
 from datetime import datetime
 import os
+import threading
+import time
+import hashlib
+import json
+import tempfile
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from dotenv import load_dotenv
 import re
-import requests
-from datetime import datetime, timedelta
+import Contribution_Analytics
+
+# ijson is optional: without it GraphQL responses are parsed in one go
+try:
+    import ijson
+except ImportError:
+    ijson = None
+from datetime import datetime, timedelta, timezone
 
 # Load environment variables from .env file
 load_dotenv()
 
+GRAPHQL_URL = "https://api.github.com/graphql"
 
-def get_github_contributions(username):
-    query = """
-    query($username: String!) {
-        user(login: $username) {
+# Shared async HTTP clients, one per event loop, reused for every GitHub request
+# so DNS, TCP and TLS set-up are paid once per connection instead of per call
+_http_clients = weakref.WeakKeyDictionary()
+_http_stats = {"requests": 0, "errors": 0, "http_version": None}
+
+# Background event loop that runs the async implementation for sync callers
+_sync_loop = None
+_sync_loop_lock = threading.Lock()
+
+
+def _http2_enabled():
+    """HTTP/2 is opt-in and needs the optional h2 package"""
+    if os.getenv("GITHUB_HTTP2", "false").lower() not in ("1", "true", "yes"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("⚠️ GITHUB_HTTP2 is set but h2 is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def get_http_client():
+    """Return the shared GitHub HTTP client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        max_connections = int(os.getenv("GITHUB_MAX_CONNECTIONS", "20"))
+        client = httpx.AsyncClient(
+            http2=_http2_enabled(),
+            timeout=httpx.Timeout(
+                float(os.getenv("GITHUB_READ_TIMEOUT", "30")),
+                connect=float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5")),
+                # Requests queue for a free connection when many are in flight
+                pool=float(os.getenv("GITHUB_POOL_TIMEOUT", "120")),
+            ),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=float(os.getenv("GITHUB_KEEPALIVE_EXPIRY", "60")),
+            ),
+        )
+        _http_clients[loop] = client
+    return client
+
+
+async def warm_http_client():
+    """
+    Open a connection to api.github.com ahead of the first scrape and seed the
+    token pool with each token's current GraphQL budget.
+    """
+    client = get_http_client()
+    pool = get_token_pool()
+    warmed = True
+    for state in pool.states() or [None]:
+        headers = {"Authorization": f"bearer {state.token}"} if state else {}
+        try:
+            # The rate limit endpoint does not count against the API quota
+            response = await client.get(
+                "https://api.github.com/rate_limit", headers=headers
+            )
+            graphql = response.json().get("resources", {}).get("graphql")
+            if state and graphql:
+                state.update(
+                    remaining=graphql["remaining"],
+                    limit=graphql["limit"],
+                    reset_at=graphql["reset"],
+                )
+        except Exception as e:
+            print(f"⚠️ GitHub HTTP client warm-up failed: {str(e)}")
+            warmed = False
+
+    if warmed:
+        print("✅ GitHub HTTP client warmed")
+    return warmed
+
+
+async def aclose_http_client():
+    """Close the running event loop's GitHub HTTP client"""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_http_client():
+    """Close the client used by the sync wrappers and stop their event loop"""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(aclose_http_client(), _sync_loop).result()
+        _sync_loop.call_soon_threadsafe(_sync_loop.stop)
+        _sync_loop = None
+
+
+def get_http_client_stats():
+    """Connection pool statistics for health output"""
+    stats = {
+        "initialized": bool(_http_clients),
+        "clients": len(_http_clients),
+        "http2": _http_stats["http_version"] == "HTTP/2",
+        "requests": _http_stats["requests"],
+        "errors": _http_stats["errors"],
+        "connections": 0,
+        "idle_connections": 0,
+    }
+
+    try:
+        for client in list(_http_clients.values()):
+            # httpx does not surface the pool publicly, so this read may break
+            # on an upgrade; the counts are reported unavailable if it does
+            connections = list(client._transport._pool.connections)
+            stats["connections"] += len(connections)
+            stats["idle_connections"] += sum(
+                1 for conn in connections if conn.is_idle()
+            )
+    except Exception:
+        stats["connections"] = stats["idle_connections"] = "unavailable"
+    return stats
+
+
+def _run_sync(coro):
+    """Run a coroutine on the background loop and wait for its result"""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_sync_loop.run_forever, name="github-http", daemon=True
+            ).start()
+        loop = _sync_loop
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+class GitHubQueryError(Exception):
+    """GraphQL-level error reported by GitHub, e.g. an unknown user"""
+
+
+class TokenState:
+    """Rate limit budget of one GitHub token, as last reported by the API"""
+
+    def __init__(self, token):
+        self.token = token
+        self.limit = 5000
+        self.remaining = 5000
+        self.reset_at = None  # Unix timestamp of the next budget reset
+        self.blocked_until = 0.0  # Set by secondary rate limits
+        self.last_used = 0.0
+        self.last_cost = 1
+        self.requests = 0
+        self.cost_used = 0
+
+    def update(self, remaining=None, limit=None, reset_at=None, cost=None):
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if limit is not None:
+            self.limit = int(limit)
+        if reset_at is not None:
+            self.reset_at = float(reset_at)
+        if cost is not None:
+            self.last_cost = max(int(cost), 1)
+            self.cost_used += int(cost)
+
+    def available_remaining(self, now):
+        """Remaining budget, treating a passed reset time as a full budget"""
+        if self.reset_at is not None and now >= self.reset_at:
+            return self.limit
+        return self.remaining
+
+    def describe(self, now):
+        return {
+            "token": f"...{self.token[-4:]}",
+            "remaining": self.available_remaining(now),
+            "limit": self.limit,
+            "reset_at": (
+                datetime.fromtimestamp(self.reset_at, timezone.utc).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ"
+                )
+                if self.reset_at
+                else None
+            ),
+            "blocked_for_seconds": max(0, round(self.blocked_until - now)),
+            "requests": self.requests,
+            "cost_used": self.cost_used,
+        }
+
+
+class TokenPool:
+    """
+    Spread GraphQL requests over several GitHub tokens by remaining budget.
+
+    Each request goes to the unblocked token with the most remaining points.
+    Once a token's budget falls below the reserve, its requests are spaced out
+    so the rest of the budget lasts until resetAt instead of running dry.
+    """
+
+    def __init__(self, tokens):
+        self._states = {token: TokenState(token) for token in tokens}
+        self.tokens = list(self._states)
+        self.reserve = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "500"))
+        self.max_wait = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "60"))
+        # The sync wrappers run on their own loop, so callers can be on two threads
+        self._lock = threading.Lock()
+
+    def states(self):
+        return [self._states[token] for token in self.tokens]
+
+    def _pacing_delay(self, state, now):
+        """Seconds to wait before the token may be used again"""
+        delay = max(0.0, state.blocked_until - now)
+
+        remaining = state.available_remaining(now)
+        if remaining <= state.last_cost:
+            # Budget spent, nothing to do but wait for the reset
+            return max(delay, (state.reset_at or now) - now)
+
+        if remaining < self.reserve and state.reset_at:
+            # Space the remaining queries evenly across the rest of the window
+            queries_left = remaining / state.last_cost
+            interval = (state.reset_at - now) / queries_left
+            delay = max(delay, state.last_used + interval - now)
+
+        return delay
+
+    async def acquire(self, token=None):
+        """
+        Pick a token for the next request, waiting if pacing requires it.
+
+        An explicitly passed token is always used (and tracked); otherwise the
+        pool's token with the most remaining budget is chosen. The slot and
+        the expected cost are reserved before waiting, so concurrent callers
+        queue up behind each other instead of all waking at once.
+        """
+        with self._lock:
+            now = time.time()
+            if token is not None:
+                state = self._states.setdefault(token, TokenState(token))
+            else:
+                if not self.tokens:
+                    raise GitHubQueryError("No GitHub token configured")
+                state = min(
+                    self.states(),
+                    key=lambda s: (
+                        self._pacing_delay(s, now),
+                        -s.available_remaining(now),
+                    ),
+                )
+
+            delay = self._pacing_delay(state, now)
+            if delay > self.max_wait:
+                raise GitHubQueryError(
+                    f"GitHub rate limit exhausted, next budget in {round(delay)}s"
+                )
+
+            # Corrected by the rate limit the response reports
+            state.last_used = now + delay
+            if state.reset_at is None or now < state.reset_at:
+                state.remaining -= state.last_cost
+            state.requests += 1
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return state
+
+    def block(self, state, seconds):
+        """Keep a token out of rotation, e.g. after a secondary rate limit"""
+        state.blocked_until = max(state.blocked_until, time.time() + seconds)
+
+    def stats(self):
+        now = time.time()
+        return {
+            "tokens": len(self.tokens),
+            "total_remaining": sum(
+                state.available_remaining(now) for state in self.states()
+            ),
+            "budgets": [state.describe(now) for state in self.states()],
+        }
+
+
+_token_pool = None
+
+
+def get_token_pool():
+    """Return the process-wide pool built from GITHUB_TOKENS and GITHUB_TOKEN"""
+    global _token_pool
+    if _token_pool is None:
+        tokens = [
+            token.strip()
+            for token in os.getenv("GITHUB_TOKENS", "").split(",")
+            if token.strip()
+        ]
+        token = os.getenv("GITHUB_TOKEN")
+        if token and token not in tokens:
+            tokens.append(token)
+        _token_pool = TokenPool(tokens)
+    return _token_pool
+
+
+def _parse_retry_after(value, default=60):
+    """Seconds from a Retry-After header, given as seconds or as an HTTP date"""
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(retry_at.timestamp() - time.time(), 1)
+
+
+def _retry_after(response):
+    """Seconds to back off for a rate limited response, or None if not limited"""
+    if response.status_code not in (403, 429):
+        return None
+
+    if "retry-after" in response.headers:
+        return _parse_retry_after(response.headers["retry-after"])
+    if response.headers.get("x-ratelimit-remaining") == "0":
+        reset_at = float(response.headers.get("x-ratelimit-reset", time.time() + 60))
+        return max(reset_at - time.time(), 1)
+    if "rate limit" in response.text.lower():
+        # Secondary limits without Retry-After: GitHub asks for at least a minute
+        return 60
+    return None
+
+
+# Per-scrape accumulator of query count and actual GraphQL cost, set by the
+# scrape entry points and filled in by _post_graphql
+_query_cost = contextvars.ContextVar("github_query_cost", default=None)
+
+
+def _start_cost_tracking():
+    tracker = {"predicted": None, "actual": 0, "queries": 0}
+    _query_cost.set(tracker)
+    return tracker
+
+
+# Repository node lists of a user (or batch alias) in a GraphQL response body
+_REPOSITORY_NODES_PREFIX = re.compile(r"^data\.\w+\.repositories\.nodes$")
+
+
+def _streaming_parse_enabled():
+    """Streaming response parsing is on by default and needs the ijson package"""
+    if os.getenv("GITHUB_STREAMING_PARSE", "true").lower() in ("0", "false", "no"):
+        return False
+    return ijson is not None
+
+
+async def _parse_streaming(response, transform_node):
+    """
+    Parse a GraphQL response body as it arrives, turning each repository node
+    into its output record as soon as the node is complete.
+
+    The raw node, README text included, is dropped right after transform_node
+    runs, so a page never exists as raw nodes and records at the same time.
+    Connections whose nodes were transformed are marked with nodes_processed.
+    """
+    document = ijson.ObjectBuilder()
+    node = None
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+
+    def handle(prefix, event, value):
+        nonlocal node
+        if node is not None:
+            node.event(event, value)
+            if (
+                event == "end_map"
+                and prefix.endswith(".item")
+                and node.containers == []
+            ):
+                # Insert the finished record where the raw node would have gone
+                document.event("string", transform_node(node.value))
+                node = None
+            return
+
+        if (
+            event == "start_map"
+            and prefix.endswith(".item")
+            and _REPOSITORY_NODES_PREFIX.match(prefix[: -len(".item")])
+        ):
+            node = ijson.ObjectBuilder()
+            node.event(event, value)
+            return
+
+        document.event(event, value)
+        if event == "end_array" and _REPOSITORY_NODES_PREFIX.match(prefix):
+            document.event("map_key", "nodes_processed")
+            document.event("boolean", True)
+
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        for prefix, event, value in events:
+            handle(prefix, event, value)
+        del events[:]
+    parser.close()
+    for prefix, event, value in events:
+        handle(prefix, event, value)
+
+    return document.value
+
+
+def _page_records(connection, fields):
+    """Output records of a repositories connection page"""
+    if connection.get("nodes_processed"):
+        return connection["nodes"]
+    return [_process_repository(repo, fields) for repo in connection["nodes"]]
+
+
+async def _post_graphql(query, variables, token=None, transform_node=None):
+    """
+    POST a GraphQL query through the shared client and return the parsed body.
+
+    The request is signed with `token`, or with the pooled token that has the
+    most remaining budget when token is None. Rate limited responses put the
+    token on hold and the query is retried on the next best token.
+
+    With transform_node, repository nodes are turned into output records while
+    the body is parsed (see _parse_streaming) when ijson is installed.
+    """
+    pool = get_token_pool()
+    max_attempts = max(len(pool.tokens), 1) + 1
+    streaming = transform_node is not None and _streaming_parse_enabled()
+
+    for attempt in range(max_attempts):
+        state = await pool.acquire(token)
+        headers = {
+            "Authorization": f"bearer {state.token}",
+            "Content-Type": "application/json",
+        }
+
+        _http_stats["requests"] += 1
+        client = get_http_client()
+        try:
+            request = client.build_request(
+                "POST",
+                GRAPHQL_URL,
+                json={"query": query, "variables": variables},
+                headers=headers,
+            )
+            response = await client.send(request, stream=streaming)
+            _http_stats["http_version"] = response.http_version
+            try:
+                if response.status_code >= 400:
+                    await response.aread()
+
+                retry_after = _retry_after(response)
+                if retry_after is not None and attempt < max_attempts - 1:
+                    print(f"⏳ GitHub rate limit hit, holding token for {retry_after}s")
+                    pool.block(state, retry_after)
+                    continue
+
+                response.raise_for_status()
+                if streaming:
+                    data = await _parse_streaming(response, transform_node)
+                else:
+                    data = response.json()
+            finally:
+                await response.aclose()
+        except httpx.HTTPError:
+            _http_stats["errors"] += 1
+            raise
+
+        rate_limit = (data.get("data") or {}).get("rateLimit")
+        tracker = _query_cost.get()
+        if tracker is not None:
+            tracker["queries"] += 1
+            tracker["actual"] += rate_limit["cost"] if rate_limit else 0
+        if rate_limit:
+            reset_at = datetime.strptime(
+                rate_limit["resetAt"], "%Y-%m-%dT%H:%M:%SZ"
+            ).replace(tzinfo=timezone.utc)
+            state.update(
+                remaining=rate_limit["remaining"],
+                limit=rate_limit.get("limit"),
+                reset_at=reset_at.timestamp(),
+                cost=rate_limit["cost"],
+            )
+        elif "x-ratelimit-remaining" in response.headers:
+            state.update(
+                remaining=response.headers["x-ratelimit-remaining"],
+                reset_at=response.headers.get("x-ratelimit-reset"),
+            )
+
+        # Primary limit reported in the body of a 200 response
+        errors = data.get("errors") or []
+        if any(error.get("type") == "RATE_LIMITED" for error in errors):
+            pool.block(
+                state, max((state.reset_at or time.time() + 60) - time.time(), 1)
+            )
+            if attempt < max_attempts - 1:
+                continue
+
+        return data
+
+
+# Budget fields added at the top level of every query, used by the token pool
+RATE_LIMIT_SELECTION = """
+        rateLimit {
+            cost
+            remaining
+            resetAt
+            limit
+        }
+"""
+
+
+# Contribution calendar selection, shared by the standalone contributions query
+# and the combined profile query
+CONTRIBUTIONS_SELECTION = """
             contributionsCollection {
                 contributionCalendar {
                     totalContributions
@@ -25,58 +552,258 @@ def get_github_contributions(username):
                     }
                 }
             }
-        }
-    }
-    """
+"""
 
-    url = "https://api.github.com/graphql"
 
-    # Use environment variable for token
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        return {"error": "GITHUB_TOKEN not configured"}
+def _parse_contribution_days(calendar):
+    """Flatten a contribution calendar into a list of {date, count} days"""
+    return [
+        {"date": day["date"], "count": day["contributionCount"]}
+        for week in calendar["weeks"]
+        for day in week["contributionDays"]
+    ]
 
-    headers = {
-        "Authorization": f"bearer {token}",
-        "Content-Type": "application/json",
+
+def _parse_contributions(user):
+    """Build the contributions result from a GraphQL user object"""
+    contributions = user["contributionsCollection"]["contributionCalendar"]
+
+    total_contributions = contributions["totalContributions"]
+    contribution_days = _parse_contribution_days(contributions)
+
+    return {
+        "total_contributions": total_contributions,
+        # The days themselves stay out of the payload, only their metrics go in
+        "activity": Contribution_Analytics.contribution_metrics(contribution_days),
     }
 
+
+async def get_github_contributions_async(username):
+    query = f"""
+    query($username: String!) {{
+{RATE_LIMIT_SELECTION}
+        user(login: $username) {{
+{CONTRIBUTIONS_SELECTION}
+        }}
+    }}
+    """
+
+    # Tokens come from the GITHUB_TOKENS / GITHUB_TOKEN pool
+    if not get_token_pool().tokens:
+        return {"error": "GITHUB_TOKEN not configured"}
+
     variables = {"username": username}
 
     try:
-        response = requests.post(
-            url, json={"query": query, "variables": variables}, headers=headers
-        )
-        response.raise_for_status()
-
-        data = response.json()
+        data = await _post_graphql(query, variables)
 
         if "errors" in data:
             return {"error": data["errors"][0]["message"]}
 
-        contributions = data["data"]["user"]["contributionsCollection"][
-            "contributionCalendar"
-        ]
+        return _parse_contributions(data["data"]["user"])
 
-        total_contributions = contributions["totalContributions"]
-        # contribution_days = []
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to fetch data: {str(e)}"}
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
 
-        # for week in contributions["weeks"]:
-        #     for day in week["contributionDays"]:
-        #         contribution_days.append(
-        #             {"date": day["date"], "count": day["contributionCount"]}
-        #         )
 
-        return {
-            "total_contributions": total_contributions,
-            # "contributions": contribution_days,
-        }
+def _is_login(username):
+    # GitHub logins are alphanumerics and hyphens; refuse anything else, so a
+    # login can safely name a file
+    return bool(re.fullmatch(r"[A-Za-z0-9-]+", username or ""))
+
+
+def _read_json(path):
+    """Load a JSON file, or return None if it is missing or unreadable"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    """Write a JSON file atomically, so readers never see a partial one"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ContributionYearCache:
+    """
+    Per-year contribution calendars, kept on disk with the most recently used
+    GITHUB_CONTRIBUTIONS_MEMORY of them also in memory.
+
+    Only completed years are stored: once a year is over its calendar no
+    longer changes, so it is never fetched again for that user. get and put
+    touch the disk, so async callers run them in a thread.
+    """
+
+    def __init__(self, root=None, max_entries=None):
+        self.root = root or os.getenv("GITHUB_CONTRIBUTIONS_DIR", "contribution_cache")
+        self.max_entries = max_entries or int(
+            os.getenv("GITHUB_CONTRIBUTIONS_MEMORY", "1000")
+        )
+        self._years = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, username, year):
+        if not _is_login(username):
+            return None
+        return os.path.join(self.root, username.lower(), f"{year}.json")
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._years[key] = result
+            self._years.move_to_end(key)
+            while len(self._years) > self.max_entries:
+                self._years.popitem(last=False)
+
+    def get(self, username, year):
+        key = (username.lower(), year)
+        with self._lock:
+            if key in self._years:
+                self._years.move_to_end(key)
+                return self._years[key]
+        path = self._path(username, year)
+        result = _read_json(path) if path else None
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def put(self, username, year, result):
+        self._remember((username.lower(), year), result)
+        path = self._path(username, year)
+        if path:
+            _write_json(path, result)
+
+
+contribution_cache = ContributionYearCache()
+
+CONTRIBUTION_YEAR_QUERY = f"""
+    query($username: String!, $from: DateTime!, $to: DateTime!) {{
+{RATE_LIMIT_SELECTION}
+        user(login: $username) {{
+            contributionsCollection(from: $from, to: $to) {{
+                contributionCalendar {{
+                    totalContributions
+                    weeks {{
+                        contributionDays {{
+                            date
+                            contributionCount
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    }}
+"""
+
+
+def resolve_history_years(years=None, now=None):
+    """
+    Return the calendar years covered by a contribution history, oldest first.
+
+    Args:
+        years (int): Number of years ending with the current one, defaults to
+            GITHUB_HISTORY_YEARS
+
+    Returns:
+        list: Years as integers
+    """
+    now = now or datetime.now(timezone.utc)
+    years = years or int(os.getenv("GITHUB_HISTORY_YEARS", "5"))
+    if years < 1:
+        raise ValueError("years must be at least 1")
+    return list(range(now.year - years + 1, now.year + 1))
+
+
+def _year_is_complete(year, now):
+    # A day of slack so every timezone has left the year
+    return now >= datetime(year + 1, 1, 2, tzinfo=timezone.utc)
+
+
+async def _fetch_contribution_year(username, year, now, token=None):
+    start = datetime(year, 1, 1, tzinfo=timezone.utc)
+    end = min(datetime(year, 12, 31, 23, 59, 59, tzinfo=timezone.utc), now)
+    variables = {
+        "username": username,
+        "from": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "to": end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    data = await _post_graphql(CONTRIBUTION_YEAR_QUERY, variables, token)
+    calendar = _user_from_response(data, username)["contributionsCollection"][
+        "contributionCalendar"
+    ]
+    return {
+        "year": year,
+        "total_contributions": calendar["totalContributions"],
+        "contributions": _parse_contribution_days(calendar),
+    }
+
+
+async def get_contribution_history_async(username, years=None, token=None):
+    """
+    Fetch a user's daily contributions over several calendar years.
+
+    Years missing from the cache are fetched concurrently, one
+    contributionsCollection query per year. Completed years are cached for
+    good, so a repeat scrape only refetches the current year.
+
+    Args:
+        username (str): GitHub login
+        years (int): Number of years ending with the current one
+
+    Returns:
+        dict: Per-year totals and days, the overall total and the cache hits
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        history_years = resolve_history_years(years, now)
+        results = {}
+        cached = await asyncio.to_thread(
+            lambda: [contribution_cache.get(username, year) for year in history_years]
+        )
+        for year, result in zip(history_years, cached):
+            if result is not None:
+                results[year] = result
+
+        missing = [year for year in history_years if year not in results]
+        fetched = await asyncio.gather(
+            *(_fetch_contribution_year(username, year, now, token) for year in missing)
+        )
+        complete = []
+        for result in fetched:
+            results[result["year"]] = result
+            if _year_is_complete(result["year"], now):
+                complete.append(result)
+        if complete:
+            await asyncio.to_thread(
+                lambda: [
+                    contribution_cache.put(username, result["year"], result)
+                    for result in complete
+                ]
+            )
 
-    except requests.RequestException as e:
+    except GitHubQueryError as e:
+        return {"error": str(e)}
+    except httpx.HTTPError as e:
         return {"error": f"Failed to fetch data: {str(e)}"}
     except Exception as e:
         return {"error": f"An error occurred: {str(e)}"}
 
+    history = [results[year] for year in history_years]
+    days = [day for year in history for day in year["contributions"]]
+    return {
+        "total_contributions": sum(year["total_contributions"] for year in history),
+        "activity": Contribution_Analytics.contribution_metrics(days),
+        "years": history,
+        "cached_years": len(history_years) - len(missing),
+    }
+
 
 def format_date(date_str):
     """Format ISO date string to a more readable format"""
@@ -86,168 +813,1260 @@ def format_date(date_str):
     return date_obj.strftime("%B %d, %Y at %I:%M %p")
 
 
-def get_repository_info(username, token):
+def epoch_seconds(date_str):
+    """Convert an ISO date string to integer seconds since the epoch"""
+    if not date_str:
+        return None
+    date_obj = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
+    return int(date_obj.replace(tzinfo=timezone.utc).timestamp())
+
+
+# Per-scrape converter for repository timestamps: readable text by default,
+# epoch seconds for the columnar format
+_timestamp_format = contextvars.ContextVar(
+    "github_timestamp_format", default=format_date
+)
+
+
+def _timestamp(date_str):
+    return _timestamp_format.get()(date_str)
+
+
+class ReadmeBlobStore:
+    """
+    Content-addressed store for README bodies.
+
+    Each README is written once under the SHA-256 of its text, so forks and
+    templates sharing a README share one blob. Scrape responses carry only the
+    hash, size and a short preview; the full text is served by hash.
+
+    Blobs are written on a background thread, since put is called while
+    responses are parsed on the event loop. Until a write lands, the text is
+    served from memory.
     """
-    Get detailed information about all repositories for a given GitHub username.
+
+    def __init__(self, root=None, preview_chars=None):
+        self.root = root or os.getenv("README_STORE_DIR", "readme_store")
+        self.preview_chars = preview_chars or int(
+            os.getenv("README_PREVIEW_CHARS", "280")
+        )
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readme")
+        self._writing = {}  # digest -> data not yet on disk
+        self._lock = threading.Lock()
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, text):
+        """Store a README and return its reference"""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            queued = digest in self._writing
+            if not queued:
+                self._writing[digest] = data
+        if not queued:
+            self._writer.submit(self._write, digest, data)
+
+        return {
+            "hash": digest,
+            "size": len(data),
+            "preview": text[: self.preview_chars],
+        }
+
+    def _write(self, digest, data):
+        path = self._path(digest)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write to a temporary name first so readers never see partial blobs
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(path), suffix=".tmp"
+                )
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+        except OSError as e:
+            print(f"⚠️ Could not store README {digest[:12]}: {str(e)}")
+        finally:
+            with self._lock:
+                self._writing.pop(digest, None)
+
+    def flush(self):
+        """Wait for the queued writes, e.g. before shutdown"""
+        self._writer.submit(lambda: None).result()
+
+    def get(self, digest):
+        """Return the README stored under a hash, or None if unknown"""
+        if not re.fullmatch(r"[0-9a-f]{64}", digest or ""):
+            return None
+        with self._lock:
+            data = self._writing.get(digest)
+        if data is not None:
+            return data.decode("utf-8")
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+
+readme_store = ReadmeBlobStore()
+
+
+def _readme_reference(repo):
+    """Store a repository's README and return its hash, size and preview"""
+    if not repo["readme"] or repo["readme"].get("text") is None:
+        return None
+    return readme_store.put(repo["readme"]["text"])
+
+
+# Repository output fields mapped to the GraphQL selection that feeds them and
+# the function that extracts the value from a repository node
+REPOSITORY_FIELDS = {
+    "name": ("name", lambda repo: repo["name"]),
+    "description": ("description", lambda repo: repo["description"]),
+    "url": ("url", lambda repo: repo["url"]),
+    "stars": ("stargazerCount", lambda repo: repo["stargazerCount"]),
+    "forks": ("forkCount", lambda repo: repo["forkCount"]),
+    "watchers": (
+        "watchers { totalCount }",
+        lambda repo: repo["watchers"]["totalCount"],
+    ),
+    "languages": (
+        "languages(first: 10) { nodes { name } totalCount }",
+        lambda repo: [lang["name"] for lang in repo["languages"]["nodes"]],
+    ),
+    "languages_count": (
+        "languages(first: 10) { nodes { name } totalCount }",
+        lambda repo: repo["languages"]["totalCount"],
+    ),
+    "created_at": ("createdAt", lambda repo: _timestamp(repo["createdAt"])),
+    "updated_at": ("updatedAt", lambda repo: _timestamp(repo["updatedAt"])),
+    "is_fork": ("isFork", lambda repo: repo["isFork"]),
+    "topics": (
+        "repositoryTopics(first: 10) { nodes { topic { name } } }",
+        lambda repo: [
+            topic["topic"]["name"] for topic in repo["repositoryTopics"]["nodes"]
+        ],
+    ),
+    "open_issues": (
+        "openIssues: issues(states: OPEN) { totalCount }",
+        lambda repo: repo["openIssues"]["totalCount"],
+    ),
+    "closed_issues": (
+        "closedIssues: issues(states: CLOSED) { totalCount }",
+        lambda repo: repo["closedIssues"]["totalCount"],
+    ),
+    "open_pull_requests": (
+        "openPullRequests: pullRequests(states: OPEN) { totalCount }",
+        lambda repo: repo["openPullRequests"]["totalCount"],
+    ),
+    "merged_pull_requests": (
+        "mergedPullRequests: pullRequests(states: MERGED) { totalCount }",
+        lambda repo: repo["mergedPullRequests"]["totalCount"],
+    ),
+    "has_readme": (
+        'readme: object(expression: "HEAD:README.md") { ... on Blob { byteSize } }',
+        lambda repo: bool(repo["readme"]),
+    ),
+    "readme": (
+        'readme: object(expression: "HEAD:README.md") { ... on Blob { text } }',
+        _readme_reference,
+    ),
+    "readme_content": (
+        'readme: object(expression: "HEAD:README.md") { ... on Blob { text } }',
+        lambda repo: repo["readme"]["text"] if repo["readme"] else None,
+    ),
+}
+
+# Full README bodies are served from the blob store by hash, so they are only
+# inlined into scrape responses when explicitly requested
+DEFAULT_REPOSITORY_FIELDS = [
+    field for field in REPOSITORY_FIELDS if field != "readme_content"
+]
+
+
+def resolve_repository_fields(fields=None):
+    """
+    Validate a requested list of repository fields.
 
     Args:
-        username (str): GitHub username
-        token (str): GitHub personal access token
+        fields (list): Repository output fields, or None for the default set
 
     Returns:
-        list: List of dictionaries containing repository information
+        list: Requested fields in the canonical output order
     """
-    # GraphQL query to get repository data
-    query = """
-    query($username: String!, $first: Int!) {
-        user(login: $username) {
-            repositories(first: $first, orderBy: {field: UPDATED_AT, direction: DESC}) {
-                nodes {
-                    name
-                    description
-                    url
-                    stargazerCount
-                    forkCount
-                    watchers {
-                        totalCount
-                    }
-                    languages(first: 10) {
-                        nodes {
-                            name
-                        }
-                        totalCount
-                    }
-                    createdAt
-                    updatedAt
-                    isFork
-                    readme: object(expression: "HEAD:README.md") {
-                        ... on Blob {
-                            text
-                        }
-                    }
-                    repositoryTopics(first: 10) {
-                        nodes {
-                            topic {
-                                name
-                            }
-                        }
-                    }
-                    openIssues: issues(states: OPEN) {
-                        totalCount
-                    }
-                    closedIssues: issues(states: CLOSED) {
-                        totalCount
-                    }
-                    openPullRequests: pullRequests(states: OPEN) {
-                        totalCount
-                    }
-                    mergedPullRequests: pullRequests(states: MERGED) {
-                        totalCount
-                    }
-                }
-            }
-        }
+    if not fields:
+        return list(DEFAULT_REPOSITORY_FIELDS)
+
+    unknown = [field for field in fields if field not in REPOSITORY_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown repository fields: {', '.join(unknown)}")
+
+    return [field for field in REPOSITORY_FIELDS if field in fields]
+
+
+# Response formats for repository lists: one dict per repository, or one
+# array per field
+RESPONSE_FORMATS = ("records", "columnar")
+
+# List fields whose values repeat across repositories, sent as indices into a
+# per-response dictionary in the columnar format
+DICTIONARY_FIELDS = ("languages", "topics")
+
+
+def repositories_to_columnar(repos, fields=None):
+    """
+    Turn a list of repository records into one array per field.
+
+    Languages and topics are dictionary-encoded: each repository lists indices
+    into the shared "dictionaries" entry instead of repeating the names.
+
+    Args:
+        repos (list): Repository records as returned by get_repository_info
+        fields (list): Fields to include, defaults to the keys of the records
+
+    Returns:
+        dict: Record count, columns by field name and the value dictionaries
+    """
+    fields = fields or (list(repos[0]) if repos else [])
+    columns = {field: [repo.get(field) for repo in repos] for field in fields}
+
+    dictionaries = {}
+    for field in DICTIONARY_FIELDS:
+        if field not in columns:
+            continue
+        index = {}
+        columns[field] = [
+            (
+                None
+                if values is None
+                else [index.setdefault(v, len(index)) for v in values]
+            )
+            for values in columns[field]
+        ]
+        dictionaries[field] = list(index)
+
+    return {
+        "format": "columnar",
+        "count": len(repos),
+        "columns": columns,
+        "dictionaries": dictionaries,
     }
+
+
+def resolve_max_repos(max_repos=None):
+    """Repository cap for a scrape, defaulting to GITHUB_MAX_REPOS"""
+    max_repos = max_repos or int(os.getenv("GITHUB_MAX_REPOS", "100"))
+    if max_repos < 1:
+        raise ValueError("max_repos must be at least 1")
+    return max_repos
+
+
+# Repository fields whose selections are connections or blobs. Each one is
+# resolved separately for every repository on a page, which is what drives
+# both the rate limit cost and the server-side time of the repository query.
+EXPENSIVE_FIELDS = (
+    "watchers",
+    "languages",
+    "languages_count",
+    "topics",
+    "open_issues",
+    "closed_issues",
+    "open_pull_requests",
+    "merged_pull_requests",
+    "has_readme",
+    "readme",
+    "readme_content",
+)
+
+DETAIL_ORDERS = ("stars", "recency")
+
+
+class QueryPlan:
+    """
+    How a scrape's repository fields are split across GraphQL queries.
+
+    Without `detail_top_n` every requested field is selected on every
+    repository page. With it, the pages select only the cheap scalar fields
+    and the expensive ones are fetched by a second, targeted query for the
+    top `detail_top_n` repositories by stars or recency; the remaining
+    repositories report None for those fields.
     """
 
-    # GitHub GraphQL API endpoint
-    url = "https://api.github.com/graphql"
+    def __init__(
+        self, fields=None, max_repos=None, detail_top_n=None, detail_order=None
+    ):
+        self.fields = resolve_repository_fields(fields)
+        self.max_repos = resolve_max_repos(max_repos)
+        self.detail_order = detail_order or "stars"
+        if self.detail_order not in DETAIL_ORDERS:
+            raise ValueError(f"detail_order must be one of: {', '.join(DETAIL_ORDERS)}")
+
+        expensive = [field for field in self.fields if field in EXPENSIVE_FIELDS]
+        if detail_top_n is not None and not 1 <= detail_top_n <= 100:
+            raise ValueError("detail_top_n must be between 1 and 100")
+
+        if detail_top_n is not None and expensive:
+            self.detail_top_n = min(detail_top_n, self.max_repos)
+            self.page_fields = [f for f in self.fields if f not in EXPENSIVE_FIELDS]
+            self.detail_fields = expensive
+            # Node ids for the targeted query, plus whatever ranks the top-N
+            self.page_extra = ["id"]
+            if self.detail_order == "stars":
+                self.page_extra.append("stargazerCount")
+        else:
+            self.detail_top_n = None
+            self.page_fields = self.fields
+            self.detail_fields = []
+            self.page_extra = []
+
+    @property
+    def split(self):
+        return bool(self.detail_fields)
+
+    @property
+    def transform_node(self):
+        """
+        Node-to-record function for parsing pages as they stream in. Split
+        plans rank raw nodes before building records, so they have none.
+        """
+        if self.split:
+            return None
+        fields = self.fields
+        return lambda repo: _process_repository(repo, fields)
+
+    def key(self):
+        """Hashable identity, used to group compatible scrapes into a batch"""
+        return (
+            tuple(self.fields),
+            self.max_repos,
+            self.detail_top_n,
+            self.detail_order,
+        )
+
+    def page_size(self, remaining=None):
+        return min(100, self.max_repos if remaining is None else remaining)
+
+    def predict_cost(self, repo_count):
+        """Predicted rate limit points for a user with `repo_count` repositories"""
+        repo_count = min(repo_count, self.max_repos)
+        cost = 0
+        remaining = repo_count
+        while True:
+            first = self.page_size(remaining)
+            cost += estimate_query_cost(self.page_fields, first)
+            remaining -= first
+            if remaining <= 0:
+                break
+
+        if self.split and repo_count:
+            detailed = min(self.detail_top_n, repo_count)
+            selections = set(REPOSITORY_FIELDS[f][0] for f in self.detail_fields)
+            cost += max(1, round(detailed * len(selections) / 100))
+        return cost
+
 
-    # Headers for the request
-    headers = {
-        "Authorization": f"bearer {token}",
-        "Content-Type": "application/json",
+def _repositories_selection(fields, extra=()):
+    """Build one page of the repositories connection selecting only the given fields"""
+    # Several output fields share a selection, keep each one only once
+    selections = list(
+        dict.fromkeys(list(extra) + [REPOSITORY_FIELDS[field][0] for field in fields])
+    )
+    nodes = "\n".join(f"                    {selection}" for selection in selections)
+
+    return f"""
+            repositories(first: $first, after: $after, orderBy: {{field: UPDATED_AT, direction: DESC}}) {{
+                totalCount
+                pageInfo {{
+                    endCursor
+                    hasNextPage
+                }}
+                nodes {{
+{nodes}
+                }}
+            }}
+"""
+
+
+def build_repository_query(fields, extra=()):
+    """Build the repositories GraphQL query selecting only the given fields"""
+    return f"""
+    query($username: String!, $first: Int!, $after: String) {{
+{RATE_LIMIT_SELECTION}
+        user(login: $username) {{
+{_repositories_selection(fields, extra)}
+        }}
+    }}
+    """
+
+
+def build_profile_query(fields, extra=()):
+    """Build a single query for both the contribution calendar and repositories"""
+    return f"""
+    query($username: String!, $first: Int!, $after: String) {{
+{RATE_LIMIT_SELECTION}
+        user(login: $username) {{
+{CONTRIBUTIONS_SELECTION}
+{_repositories_selection(fields, extra)}
+        }}
+    }}
+    """
+
+
+def build_batch_query(fields, count, extra=()):
+    """Build one query selecting the profile of `count` users under aliases u0..uN"""
+    variables = ", ".join(f"$login{i}: String!" for i in range(count))
+    users = "\n".join(
+        f"        u{i}: user(login: $login{i}) {{ ...ProfileFields }}"
+        for i in range(count)
+    )
+
+    return f"""
+    query({variables}, $first: Int!, $after: String) {{
+{RATE_LIMIT_SELECTION}
+{users}
+    }}
+
+    fragment ProfileFields on User {{
+{CONTRIBUTIONS_SELECTION}
+{_repositories_selection(fields, extra)}
+    }}
+    """
+
+
+def build_detail_query(fields):
+    """Build the targeted query fetching expensive fields for given repository ids"""
+    selections = list(dict.fromkeys(REPOSITORY_FIELDS[field][0] for field in fields))
+    nodes = "\n".join(f"                    {selection}" for selection in selections)
+
+    return f"""
+    query($ids: [ID!]!) {{
+{RATE_LIMIT_SELECTION}
+        nodes(ids: $ids) {{
+            ... on Repository {{
+                id
+{nodes}
+            }}
+        }}
+    }}
+    """
+
+
+def estimate_query_cost(fields, first=100):
+    """
+    Estimate the GraphQL rate limit cost of one page of a user's repositories.
+
+    GitHub charges one point per hundred connection requests, where every
+    connection nested in a repository node is one request per repository.
+    """
+    selections = set(REPOSITORY_FIELDS[field][0] for field in fields)
+    nested = sum(1 for sel in selections if "totalCount" in sel or "nodes" in sel)
+    requests = 1 + first * nested
+    return max(1, round(requests / 100))
+
+
+def _process_repository(repo, fields, missing=()):
+    """Build the output record for one repository node"""
+    return {
+        field: None if field in missing else REPOSITORY_FIELDS[field][1](repo)
+        for field in fields
     }
 
-    # Variables for the query
-    variables = {"username": username, "first": 100}  # Number of repositories to fetch
 
+def _user_from_response(data, username, alias="user"):
+    """Return the user object of a GraphQL response, raising on errors"""
+    if "errors" in data:
+        raise GitHubQueryError(data["errors"][0]["message"])
+
+    user = data["data"][alias]
+    if not user:
+        raise GitHubQueryError(f"User {username} not found")
+    return user
+
+
+async def _iter_raw_repository_pages(username, token, plan, remaining, after=None):
+    """Yield raw repository connection pages for a plan, following cursors"""
+    query = build_repository_query(plan.page_fields, plan.page_extra)
+
+    while remaining > 0:
+        variables = {
+            "username": username,
+            "first": plan.page_size(remaining),
+            "after": after,
+        }
+        data = await _post_graphql(query, variables, token, plan.transform_node)
+        connection = _user_from_response(data, username)["repositories"]
+
+        remaining -= len(connection["nodes"])
+        yield connection
+
+        if not connection["pageInfo"]["hasNextPage"]:
+            break
+        after = connection["pageInfo"]["endCursor"]
+
+
+async def iter_repository_pages_async(
+    username, token, fields=None, max_repos=None, after=None
+):
+    """
+    Yield a user's processed repositories page by page, following cursors.
+
+    Pages are requested lazily, so a consumer that stops early never fetches
+    the remaining pages and only one page is held in memory at a time.
+
+    Args:
+        username (str): GitHub username
+        token (str): GitHub personal access token, or None to use the token pool
+        fields (list): Repository fields to fetch, or None for the default set
+        max_repos (int): Maximum number of repositories to yield
+        after (str): Cursor to resume from, or None to start at the first page
+
+    Yields:
+        list: Repository dictionaries for one page
+    """
+    plan = QueryPlan(fields, max_repos)
+    async for connection in _iter_raw_repository_pages(
+        username, token, plan, plan.max_repos, after
+    ):
+        page = _page_records(connection, plan.fields)
+        if page:
+            yield page
+
+
+async def _fetch_repository_details(nodes, token, plan):
+    """Fill in the plan's expensive fields on the top-N repository nodes"""
+    if plan.detail_order == "stars":
+        ranked = sorted(nodes, key=lambda repo: repo["stargazerCount"], reverse=True)
+    else:
+        # Pages are already ordered by most recently updated
+        ranked = nodes
+    top = ranked[: plan.detail_top_n]
+    if not top:
+        return set()
+
+    data = await _post_graphql(
+        build_detail_query(plan.detail_fields),
+        {"ids": [repo["id"] for repo in top]},
+        token,
+    )
+    if "errors" in data:
+        raise GitHubQueryError(data["errors"][0]["message"])
+
+    details = {detail["id"]: detail for detail in data["data"]["nodes"] if detail}
+    for repo in top:
+        repo.update(details.get(repo["id"], {}))
+    return set(details)
+
+
+async def _iter_profile_from_user(user, username, token, plan):
+    """
+    Yield the profile parts contained in a user object from a profile query,
+    continuing repository pagination past its first page and running the
+    plan's targeted detail query if it has one.
+    """
+    connection = user["repositories"]
+    tracker = _query_cost.get()
+    if tracker is not None and tracker["predicted"] is None:
+        tracker["predicted"] = plan.predict_cost(connection["totalCount"])
+
+    yield "contributions", _parse_contributions(user)
+
+    pages = [connection]
+    remaining = plan.max_repos - len(connection["nodes"])
+
+    async def next_pages():
+        if connection["pageInfo"]["hasNextPage"] and remaining > 0:
+            async for page in _iter_raw_repository_pages(
+                username,
+                token,
+                plan,
+                remaining,
+                after=connection["pageInfo"]["endCursor"],
+            ):
+                yield page
+
+    if not plan.split:
+        # Stream each page as soon as it arrives
+        async for page in _chain_pages(pages, next_pages()):
+            processed = _page_records(page, plan.fields)
+            if processed:
+                yield "repositories", processed
+        return
+
+    # Ranking needs every page first; without the expensive fields they are small
+    async for page in next_pages():
+        pages.append(page)
+    nodes = [repo for page in pages for repo in page["nodes"]]
+    detailed = await _fetch_repository_details(nodes, token, plan)
+
+    for start in range(0, len(nodes), 100):
+        processed = [
+            _process_repository(
+                repo,
+                plan.fields,
+                missing=() if repo["id"] in detailed else plan.detail_fields,
+            )
+            for repo in nodes[start : start + 100]
+        ]
+        yield "repositories", processed
+
+
+async def _chain_pages(first_pages, more_pages):
+    for page in first_pages:
+        yield page
+    async for page in more_pages:
+        yield page
+
+
+async def iter_github_profile_async(
+    username,
+    token,
+    fields=None,
+    max_repos=None,
+    detail_top_n=None,
+    detail_order=None,
+):
+    """
+    Stream a user's profile as ("contributions", dict) followed by one
+    ("repositories", list) item per page of repositories.
+
+    The contribution calendar and the first repository page share one query;
+    later pages are fetched only as the consumer asks for them. With
+    detail_top_n, expensive repository fields are fetched only for the top-N
+    repositories by detail_order ("stars" or "recency").
+    """
+    plan = QueryPlan(fields, max_repos, detail_top_n, detail_order)
+
+    variables = {"username": username, "first": plan.page_size(), "after": None}
+    query = build_profile_query(plan.page_fields, plan.page_extra)
+    data = await _post_graphql(query, variables, token, plan.transform_node)
+    user = _user_from_response(data, username)
+
+    async for part in _iter_profile_from_user(user, username, token, plan):
+        yield part
+
+
+async def _collect_profile(parts, username):
+    """Collect streamed profile parts into the two-element profile result"""
+    contribution_result = None
+    repo_info = []
     try:
-        # Make the request
-        response = requests.post(
-            url, json={"query": query, "variables": variables}, headers=headers
-        )
-        response.raise_for_status()
+        async for kind, value in parts:
+            if kind == "contributions":
+                contribution_result = value
+            else:
+                repo_info.extend(value)
+    except httpx.HTTPError as e:
+        error = {"error": f"Failed to fetch data: {str(e)}"}
+        return [contribution_result or error, error]
+    except Exception as e:
+        error = {
+            "error": (
+                str(e)
+                if isinstance(e, GitHubQueryError)
+                else f"An error occurred: {str(e)}"
+            )
+        }
+        return [contribution_result or error, error]
 
-        # Parse the response
-        data = response.json()
+    if not repo_info:
+        return [
+            contribution_result,
+            {"error": f"No repositories found for user {username}"},
+        ]
 
-        if "errors" in data:
-            return {"error": data["errors"][0]["message"]}
+    return [contribution_result, repo_info]
 
-        # Check if user exists
-        if not data["data"]["user"]:
-            return {"error": f"User {username} not found"}
-
-        # Extract repository data
-        repositories = data["data"]["user"]["repositories"]["nodes"]
-
-        if not repositories:
-            return {"error": f"No repositories found for user {username}"}
-
-        # Process each repository
-        repo_info = []
-        for repo in repositories:
-            # Extract languages
-            languages = [lang["name"] for lang in repo["languages"]["nodes"]]
-
-            # Extract topics
-            topics = [
-                topic["topic"]["name"] for topic in repo["repositoryTopics"]["nodes"]
-            ]
-
-            # Create repository info dictionary
-            repo_data = {
-                "name": repo["name"],
-                "description": repo["description"],
-                "url": repo["url"],
-                "stars": repo["stargazerCount"],
-                "forks": repo["forkCount"],
-                "watchers": repo["watchers"]["totalCount"],
-                "languages": languages,
-                "languages_count": repo["languages"]["totalCount"],
-                "created_at": format_date(repo["createdAt"]),
-                "updated_at": format_date(repo["updatedAt"]),
-                "is_fork": repo["isFork"],
-                "topics": topics,
-                "open_issues": repo["openIssues"]["totalCount"],
-                "closed_issues": repo["closedIssues"]["totalCount"],
-                "open_pull_requests": repo["openPullRequests"]["totalCount"],
-                "merged_pull_requests": repo["mergedPullRequests"]["totalCount"],
-                "has_readme": bool(repo["readme"]),
-                "readme_content": repo["readme"]["text"] if repo["readme"] else None,
-            }
 
-            repo_info.append(repo_data)
+async def get_repository_info_async(username, token, fields=None, max_repos=None):
+    """
+    Get detailed information about all repositories for a given GitHub username.
 
-        return repo_info
+    Args:
+        username (str): GitHub username
+        token (str): GitHub personal access token, or None to use the token pool
+        fields (list): Repository fields to fetch, or None for the default set
+        max_repos (int): Maximum number of repositories, GITHUB_MAX_REPOS if None
+
+    Returns:
+        list: List of dictionaries containing repository information
+    """
+    repo_info = []
+    try:
+        async for page in iter_repository_pages_async(
+            username, token, fields, max_repos
+        ):
+            repo_info.extend(page)
 
-    except requests.RequestException as e:
+    except GitHubQueryError as e:
+        return {"error": str(e)}
+    except httpx.HTTPError as e:
         return {"error": f"Failed to fetch data: {str(e)}"}
     except Exception as e:
         return {"error": f"An error occurred: {str(e)}"}
 
+    if not repo_info:
+        return {"error": f"No repositories found for user {username}"}
+
+    return repo_info
+
 
 def extract_username(url):
     match = re.search(r"(?:https?://)?(?:www\.)?github\.com/([^/?#]+)", url)
     return match.group(1) if match else None
 
 
-def scrape_github_profile(applicant_id, url):
+async def get_github_profile_async(
+    username,
+    token,
+    fields=None,
+    max_repos=None,
+    detail_top_n=None,
+    detail_order=None,
+):
+    """
+    Fetch contributions and repositories for a user, with the contribution
+    calendar and the first repository page in a single GraphQL request.
+
+    Args:
+        username (str): GitHub username
+        token (str): GitHub personal access token, or None to use the token pool
+        fields (list): Repository fields to fetch, or None for the default set
+        max_repos (int): Maximum number of repositories, GITHUB_MAX_REPOS if None
+        detail_top_n (int): Fetch expensive fields only for this many repositories
+        detail_order (str): Rank repositories for detail_top_n by "stars" or "recency"
+
+    Returns:
+        list: [contribution_result, repo_result], each shaped like the results
+        of get_github_contributions and get_repository_info
+    """
+    return await _collect_profile(
+        iter_github_profile_async(
+            username, token, fields, max_repos, detail_top_n, detail_order
+        ),
+        username,
+    )
+
+
+class SnapshotStore:
+    """
+    Last repository snapshot per username, used by incremental refreshes.
+
+    A snapshot keeps the processed repository records of the previous scrape,
+    each with its raw updatedAt, plus the newest updatedAt seen (the
+    watermark). Snapshots are tied to the query plan that produced them, so a
+    scrape asking for different fields starts from scratch.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("GITHUB_SNAPSHOT_DIR", "github_snapshots")
+
+    def _path(self, username):
+        if not _is_login(username):
+            return None
+        return os.path.join(self.root, f"{username.lower()}.json")
+
+    @staticmethod
+    def _plan_key(plan):
+        return {
+            "fields": list(plan.fields),
+            "max_repos": plan.max_repos,
+            "timestamps": _timestamp_format.get().__name__,
+        }
+
+    def load(self, username, plan):
+        path = self._path(username)
+        snapshot = _read_json(path) if path else None
+        if snapshot is None or snapshot.get("plan") != self._plan_key(plan):
+            return None
+        return snapshot
+
+    def save(self, username, plan, watermark, repos):
+        path = self._path(username)
+        if path:
+            _write_json(
+                path,
+                {"plan": self._plan_key(plan), "watermark": watermark, "repos": repos},
+            )
+
+
+snapshot_store = SnapshotStore()
+
+
+async def get_github_profile_incremental_async(
+    username, token, fields=None, max_repos=None
+):
+    """
+    Refresh a user's profile against their last snapshot.
+
+    Repositories are ordered by updatedAt, so pagination stops at the first
+    repository not updated since the snapshot's watermark. Only the changed
+    repositories are fetched; the rest are reused from the snapshot. Repositories
+    deleted since the snapshot stay in it until a scrape with a different plan.
+
+    Returns:
+        tuple: ([contribution_result, repo_result], refresh summary)
+    """
+    plan = QueryPlan(fields, max_repos)
+    # Names and raw timestamps are needed to merge, whatever fields were asked for
+    extra = ["name", "updatedAt"]
+    snapshot = await asyncio.to_thread(snapshot_store.load, username, plan)
+    watermark = snapshot["watermark"] if snapshot else None
+
+    # A repeat scrape usually finds only a few changes, so start with a small page
+    first = plan.page_size()
+    if watermark:
+        first = min(first, int(os.getenv("GITHUB_INCREMENTAL_PAGE_SIZE", "20")))
+
+    # Pages stop at the watermark, so each one is predicted as it is requested
+    tracker = _query_cost.get()
+    if tracker is not None and tracker["predicted"] is None:
+        tracker["predicted"] = 0
+
+    def predict_page(size):
+        if tracker is not None:
+            tracker["predicted"] += estimate_query_cost(plan.page_fields, size)
+
+    changed = []
+    contribution_result = None
+    try:
+        variables = {"username": username, "first": first, "after": None}
+        predict_page(first)
+        data = await _post_graphql(
+            build_profile_query(plan.page_fields, extra), variables, token
+        )
+        user = _user_from_response(data, username)
+        contribution_result = _parse_contributions(user)
+        connection = user["repositories"]
+
+        page_query = build_repository_query(plan.page_fields, extra)
+        while True:
+            reached_watermark = False
+            for repo in connection["nodes"]:
+                # Updated at the watermark second may still be new, so refetch it
+                if watermark and repo["updatedAt"] < watermark:
+                    reached_watermark = True
+                    break
+                changed.append(
+                    {
+                        "name": repo["name"],
+                        "updated_at_raw": repo["updatedAt"],
+                        "record": _process_repository(repo, plan.fields),
+                    }
+                )
+
+            remaining = plan.max_repos - len(changed)
+            if (
+                reached_watermark
+                or remaining <= 0
+                or not connection["pageInfo"]["hasNextPage"]
+            ):
+                break
+
+            variables = {
+                "username": username,
+                "first": plan.page_size(remaining),
+                "after": connection["pageInfo"]["endCursor"],
+            }
+            predict_page(variables["first"])
+            data = await _post_graphql(page_query, variables, token)
+            connection = _user_from_response(data, username)["repositories"]
+
+    except GitHubQueryError as e:
+        error = {"error": str(e)}
+    except httpx.HTTPError as e:
+        error = {"error": f"Failed to fetch data: {str(e)}"}
+    except Exception as e:
+        error = {"error": f"An error occurred: {str(e)}"}
+    else:
+        error = None
+    if error:
+        # Contributions come with the first page, so they may have succeeded
+        return [contribution_result or error, error], None
+
+    # Changed repositories replace their old records and move to the front
+    changed_names = {repo["name"] for repo in changed}
+    reused = [
+        repo
+        for repo in (snapshot or {}).get("repos", [])
+        if repo["name"] not in changed_names
+    ]
+    repos = (changed + reused)[: plan.max_repos]
+    repos.sort(key=lambda repo: repo["updated_at_raw"], reverse=True)
+
+    if repos:
+        await asyncio.to_thread(
+            snapshot_store.save, username, plan, repos[0]["updated_at_raw"], repos
+        )
+
+    refresh = {
+        "incremental": snapshot is not None,
+        "changed": len(changed),
+        "reused": len(repos) - len(changed_names & {r["name"] for r in repos}),
+        "watermark": watermark,
+    }
+
+    if not repos:
+        error = {"error": f"No repositories found for user {username}"}
+        return [contribution_result, error], refresh
+
+    return [contribution_result, [repo["record"] for repo in repos]], refresh
+
+
+async def scrape_github_profile_async(
+    applicant_id,
+    url,
+    fields=None,
+    max_repos=None,
+    detail_top_n=None,
+    detail_order=None,
+    incremental=False,
+    history_years=None,
+    response_format="records",
+):
     username = extract_username(url)
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
+    if not get_token_pool().tokens:
         return {
             "id": applicant_id,
             "source": "github",
             "data": {"error": "GITHUB_TOKEN not found in environment variables"},
         }
 
-    contribution_result = get_github_contributions(username)
-    repo_result = get_repository_info(username, token)
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(
+            f"response_format must be one of: {', '.join(RESPONSE_FORMATS)}"
+        )
+    _timestamp_format.set(
+        epoch_seconds if response_format == "columnar" else format_date
+    )
+
+    # Contributions and the first repository page come back from one round trip
+    tracker = _start_cost_tracking()
+    if incremental:
+        if detail_top_n is not None:
+            raise ValueError("incremental refresh does not support detail_top_n")
+        scrape = get_github_profile_incremental_async(
+            username, token=None, fields=fields, max_repos=max_repos
+        )
+    else:
+        scrape = get_github_profile_async(
+            username,
+            token=None,
+            fields=fields,
+            max_repos=max_repos,
+            detail_top_n=detail_top_n,
+            detail_order=detail_order,
+        )
+
+    # The per-year history queries run alongside the profile query
+    if history_years:
+        result, history = await asyncio.gather(
+            scrape, get_contribution_history_async(username, history_years)
+        )
+    else:
+        result, history = await scrape, None
+    if incremental:
+        profile, refresh = result
+    else:
+        profile = result
+    if history is not None and "error" not in profile[0]:
+        profile[0]["history"] = history
+    if response_format == "columnar" and isinstance(profile[1], list):
+        profile[1] = repositories_to_columnar(
+            profile[1], resolve_repository_fields(fields)
+        )
     data = {
         "id": applicant_id,
         "source": "github",
-        "data": [contribution_result, repo_result],
+        "data": profile,
+        "query_cost": tracker,
     }
+    if incremental:
+        data["refresh"] = refresh
     return data
+
+
+async def stream_github_profile_async(
+    applicant_id,
+    url,
+    fields=None,
+    max_repos=None,
+    detail_top_n=None,
+    detail_order=None,
+    history_years=None,
+):
+    """
+    Stream a scrape as events: one "contributions" event, one "repositories"
+    event per page, and an "error" event if the scrape fails part way. With
+    history_years a "history" event follows the repositories. A final
+    "query_cost" event reports the predicted and actual GraphQL cost.
+    """
+    username = extract_username(url)
+    if not get_token_pool().tokens:
+        yield {
+            "id": applicant_id,
+            "source": "github",
+            "type": "error",
+            "data": {"error": "GITHUB_TOKEN not found in environment variables"},
+        }
+        return
+
+    tracker = _start_cost_tracking()
+    try:
+        async for kind, value in iter_github_profile_async(
+            username,
+            token=None,
+            fields=fields,
+            max_repos=max_repos,
+            detail_top_n=detail_top_n,
+            detail_order=detail_order,
+        ):
+            yield {"id": applicant_id, "source": "github", "type": kind, "data": value}
+    except GitHubQueryError as e:
+        error = {"error": str(e)}
+        yield {"id": applicant_id, "source": "github", "type": "error", "data": error}
+    except httpx.HTTPError as e:
+        error = {"error": f"Failed to fetch data: {str(e)}"}
+        yield {"id": applicant_id, "source": "github", "type": "error", "data": error}
+    except Exception as e:
+        error = {"error": f"An error occurred: {str(e)}"}
+        yield {"id": applicant_id, "source": "github", "type": "error", "data": error}
+
+    if history_years:
+        history = await get_contribution_history_async(username, history_years)
+        kind = "error" if "error" in history else "history"
+        yield {"id": applicant_id, "source": "github", "type": kind, "data": history}
+
+    yield {
+        "id": applicant_id,
+        "source": "github",
+        "type": "query_cost",
+        "data": tracker,
+    }
+
+
+class GitHubScrapeBatcher:
+    """
+    Coalesce concurrent GitHub scrapes into aliased multi-user GraphQL queries.
+
+    Scrapes with the same query plan are gathered for up to `window` seconds,
+    or until the batch reaches `max_users` users or its estimated cost
+    reaches `max_cost` points, and are then resolved by a single query. Users
+    with more repositories than the first page continue paginating on their
+    own. Each caller gets the same payload scrape_github_profile_async would
+    have returned for it, with the batch's query cost shared between them.
+    """
+
+    def __init__(self, window=None, max_users=None, max_cost=None):
+        self.window = (
+            window
+            if window is not None
+            else float(os.getenv("GITHUB_BATCH_WINDOW_MS", "50")) / 1000
+        )
+        self.max_users = max_users or int(os.getenv("GITHUB_BATCH_MAX_USERS", "10"))
+        self.max_cost = max_cost or int(os.getenv("GITHUB_BATCH_MAX_COST", "50"))
+        self._pending = {}  # plan key -> (plan, {username: [futures]})
+        self._timers = {}
+        # The loop only keeps weak references to tasks, so running batches are
+        # held here until they finish
+        self._tasks = set()
+        self.stats = {"scrapes": 0, "batches": 0, "users": 0}
+
+    async def scrape(
+        self,
+        applicant_id,
+        url,
+        fields=None,
+        max_repos=None,
+        detail_top_n=None,
+        detail_order=None,
+    ):
+        """Queue a scrape and wait for the batch it joins to complete"""
+        username = extract_username(url)
+        if not get_token_pool().tokens:
+            return {
+                "id": applicant_id,
+                "source": "github",
+                "data": {"error": "GITHUB_TOKEN not found in environment variables"},
+            }
+
+        # A null login would make GitHub reject the whole batch's query
+        if not username:
+            error = {"error": f"Not a GitHub profile URL: {url}"}
+            return {"id": applicant_id, "source": "github", "data": [error, error]}
+
+        plan = QueryPlan(fields, max_repos, detail_top_n, detail_order)
+        key = plan.key()
+        future = asyncio.get_running_loop().create_future()
+        self.stats["scrapes"] += 1
+
+        # The same username requested twice shares one alias in the query
+        plan, batch = self._pending.setdefault(key, (plan, {}))
+        batch.setdefault(username, []).append(future)
+
+        page_cost = estimate_query_cost(plan.page_fields, plan.page_size())
+        if len(batch) >= self.max_users or len(batch) * page_cost >= self.max_cost:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, key
+            )
+
+        profile, query_cost = await future
+        return {
+            "id": applicant_id,
+            "source": "github",
+            "data": profile,
+            "query_cost": query_cost,
+        }
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        plan, batch = self._pending.pop(key, (None, None))
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(plan, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def aclose(self):
+        """Send the batches still gathering and wait for every batch to finish"""
+        for key in list(self._pending):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run_batch(self, plan, batch):
+        usernames = list(batch)
+        query = build_batch_query(plan.page_fields, len(usernames), plan.page_extra)
+        variables = {f"login{i}": name for i, name in enumerate(usernames)}
+        variables.update({"first": plan.page_size(), "after": None})
+
+        self.stats["batches"] += 1
+        self.stats["users"] += len(usernames)
+
+        # This task runs in its own context, so the tracker covers the batch only
+        tracker = _start_cost_tracking()
+        tracker["predicted"] = 0
+        tracker["shared_by"] = len(usernames)
+
+        try:
+            data = await _post_graphql(
+                query, variables, token=None, transform_node=plan.transform_node
+            )
+
+            # Errors carry the alias they belong to as the first path element
+            errors = {}
+            for error in data.get("errors", []):
+                alias = (error.get("path") or [None])[0]
+                errors.setdefault(alias, {"error": error["message"]})
+
+            results = {}
+            pending = []
+            for i, username in enumerate(usernames):
+                alias = f"u{i}"
+                error = errors.get(alias) or errors.get(None)
+                user = (data.get("data") or {}).get(alias)
+                if error:
+                    results[username] = [error, error]
+                elif not user:
+                    error = {"error": f"User {username} not found"}
+                    results[username] = [error, error]
+                else:
+                    tracker["predicted"] += plan.predict_cost(
+                        user["repositories"]["totalCount"]
+                    )
+                    parts = _iter_profile_from_user(
+                        user, username, token=None, plan=plan
+                    )
+                    pending.append((username, _collect_profile(parts, username)))
+
+            # Users spilling past the first page paginate concurrently
+            collected = await asyncio.gather(*(coro for _, coro in pending))
+            for (username, _), result in zip(pending, collected):
+                results[username] = result
+
+        except httpx.HTTPError as e:
+            error = {"error": f"Failed to fetch data: {str(e)}"}
+            results = {username: [error, error] for username in usernames}
+        except Exception as e:
+            error = {"error": f"An error occurred: {str(e)}"}
+            results = {username: [error, error] for username in usernames}
+
+        for username, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result((results[username], tracker))
+
+
+# One batcher per event loop, since its futures belong to that loop
+_batchers = weakref.WeakKeyDictionary()
+
+
+def get_batcher():
+    """Return the GitHub scrape batcher for the running event loop"""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = GitHubScrapeBatcher()
+    return batcher
+
+
+# Synchronous wrappers around the async implementation, for callers outside an
+# event loop. They share one background loop so its connection pool is reused.
+
+
+def get_github_contributions(username):
+    return _run_sync(get_github_contributions_async(username))
+
+
+def get_repository_info(username, token, fields=None, max_repos=None):
+    return _run_sync(get_repository_info_async(username, token, fields, max_repos))
+
+
+def get_github_profile(
+    username, token, fields=None, max_repos=None, detail_top_n=None, detail_order=None
+):
+    return _run_sync(
+        get_github_profile_async(
+            username, token, fields, max_repos, detail_top_n, detail_order
+        )
+    )
+
+
+def scrape_github_profile(
+    applicant_id,
+    url,
+    fields=None,
+    max_repos=None,
+    detail_top_n=None,
+    detail_order=None,
+    incremental=False,
+    history_years=None,
+    response_format="records",
+):
+    return _run_sync(
+        scrape_github_profile_async(
+            applicant_id,
+            url,
+            fields,
+            max_repos,
+            detail_top_n,
+            detail_order,
+            incremental,
+            history_years,
+            response_format,
+        )
+    )
+
+
+def get_contribution_history(username, years=None):
+    return _run_sync(get_contribution_history_async(username, years))
@@ -0,0 +1,349 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+import uuid
+
+JOB_STATES = (
+    "queued",
+    "parked",
+    "running",
+    "retry_scheduled",
+    "succeeded",
+    "failed",
+    "cancelled",
+)
+
+
+class JobCancelled(BaseException):
+    """
+    The running job was cancelled. Like asyncio.CancelledError it is not an
+    Exception, so the scraper's broad exception handlers let it through.
+    """
+
+
+class CancellationToken:
+    """Cancellation flag a running job checks between steps and in its waits"""
+
+    def __init__(self, event=None):
+        # Any Event works, including a multiprocessing one shared with a worker
+        self._event = event or threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise JobCancelled if the job has been cancelled"""
+        if self._event.is_set():
+            raise JobCancelled("Job cancelled")
+
+    def sleep(self, seconds):
+        """time.sleep that raises JobCancelled as soon as the job is cancelled"""
+        if self._event.wait(seconds):
+            raise JobCancelled("Job cancelled")
+
+
+class Job:
+    """One scheduled unit of work and its progress"""
+
+    def __init__(self, kwargs, max_attempts):
+        self.id = uuid.uuid4().hex
+        self.kwargs = kwargs
+        self.max_attempts = max_attempts
+        self.status = "queued"
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self.events = []
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.next_attempt_at = self.created_at
+        self.cancel_token = CancellationToken()
+        self._done = threading.Event()
+        # Progress is recorded from the thread running the attempt
+        self._lock = threading.Lock()
+        self.record("queued")
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def record(self, status, **details):
+        """Move to a state, appending a progress event; finished jobs stay put"""
+        with self._lock:
+            if self.done:
+                return
+            self.status = status
+            self.updated_at = time.time()
+            self.events.append(
+                {
+                    "status": status,
+                    "attempt": self.attempts,
+                    "at": self.updated_at,
+                    **details,
+                }
+            )
+            if status in ("succeeded", "failed", "cancelled"):
+                self._done.set()
+
+    def progress(self, step):
+        """Report a step of the running attempt"""
+        self.record("running", step=step)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes, returning whether it did"""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        job = {
+            "id": self.id,
+            "status": self.status,
+            "applicant_id": self.kwargs.get("applicant_id"),
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if self.status in ("parked", "retry_scheduled"):
+            job["next_attempt_at"] = self.next_attempt_at
+        if self.status == "succeeded":
+            job["result"] = self.result
+        if self.status == "failed":
+            job["error"] = self.error
+        return job
+
+
+class JobScheduler:
+    """
+    Runs jobs on a small pool of worker threads, retrying transient failures
+    after a delay without holding a worker.
+
+    A job whose attempt raises one of `retry_on` is put back on a time-ordered
+    queue with jittered exponential back-off, so the worker that ran it goes
+    straight on to the next ready job.
+
+    With a circuit breaker, every attempt asks it first and is parked on the
+    queue while it is open. Attempts raising one of `trips_on` count as
+    failures, successful ones as successes.
+
+    Args:
+        run: Callable taking a job's kwargs plus `progress` and `cancel`, a
+            CancellationToken
+        retry_on (tuple): Exception types that schedule another attempt
+        workers (int): Worker threads, defaults to LINKEDIN_WORKERS
+        breaker (CircuitBreaker): Optional breaker guarding the attempts
+        trips_on (tuple): Exception types the breaker counts as failures
+    """
+
+    def __init__(self, run, retry_on=(), workers=None, breaker=None, trips_on=()):
+        self.run = run
+        self.retry_on = tuple(retry_on)
+        self.breaker = breaker
+        self.trips_on = tuple(trips_on)
+        self.workers = workers or int(os.getenv("LINKEDIN_WORKERS", "2"))
+        self.max_attempts = int(os.getenv("LINKEDIN_MAX_ATTEMPTS", "3"))
+        self.base_delay = float(os.getenv("LINKEDIN_RETRY_BASE_DELAY", "60"))
+        self.max_delay = float(os.getenv("LINKEDIN_RETRY_MAX_DELAY", "300"))
+        self.retention = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+        self.jobs = {}
+        self._queue = []  # (ready at, sequence, job)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    def submit(self, **kwargs):
+        """
+        Queue a job for the next free worker, starting the workers if needed.
+
+        Raises:
+            CircuitOpenError: The breaker is open and set to fail fast
+        """
+        if self.breaker:
+            self.breaker.check()
+        job = Job(kwargs, self.max_attempts)
+        with self._condition:
+            self._prune()
+            self.jobs[job.id] = job
+            self._push(job, job.created_at)
+            if not self._threads:
+                self._start()
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. A waiting job is dropped from the queue; a running one
+        is told to stop through its cancellation token.
+
+        Returns:
+            Job: The job, or None if it is unknown
+        """
+        job = self.jobs.get(job_id)
+        if not job:
+            return None
+        with self._condition:
+            if job.done:
+                return job
+            job.cancel_token.cancel()
+            if job.status == "running":
+                job.record("running", step="cancel_requested")
+            else:
+                job.record("cancelled")
+        return job
+
+    def retry_delay(self, attempt):
+        """Back-off before the attempt after `attempt`, jittered to spread retries"""
+        delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        return random.uniform(delay / 2, delay)
+
+    def stats(self):
+        with self._condition:
+            counts = {state: 0 for state in JOB_STATES}
+            for job in self.jobs.values():
+                counts[job.status] += 1
+            stats = {"workers": len(self._threads), "jobs": counts}
+        if self.breaker:
+            stats["circuit"] = self.breaker.stats()
+        return stats
+
+    def shutdown(self, timeout=30):
+        """
+        Stop the workers once their running attempts finish, giving up on
+        them after `timeout` seconds in total.
+
+        Returns:
+            bool: Whether every worker stopped in time
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        deadline = time.time() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.time(), 0))
+        stopped = not any(thread.is_alive() for thread in self._threads)
+        if not stopped:
+            print(f"⚠️ Job workers still running {timeout:.0f}s after shutdown")
+        self._threads = []
+        return stopped
+
+    def _start(self):
+        self._stopping = False
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"job-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _push(self, job, ready_at):
+        job.next_attempt_at = ready_at
+        heapq.heappush(self._queue, (ready_at, next(self._sequence), job))
+        self._condition.notify()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id, job in list(self.jobs.items()):
+            if job.done and job.updated_at < cutoff:
+                del self.jobs[job_id]
+
+    def _next_job(self):
+        with self._condition:
+            while not self._stopping:
+                if self._queue:
+                    wait = self._queue[0][0] - time.time()
+                    if wait <= 0:
+                        return heapq.heappop(self._queue)[2]
+                    self._condition.wait(wait)
+                else:
+                    self._condition.wait()
+            return None
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if job.done:
+                continue  # Cancelled while waiting
+            probe = None
+            if self.breaker:
+                recheck_at, probe = self.breaker.admit()
+                if recheck_at:
+                    with self._condition:
+                        if job.done:
+                            continue  # Cancelled meanwhile
+                        if job.status != "parked":
+                            job.record("parked", until=recheck_at)
+                        self._push(job, recheck_at)
+                    continue
+            with self._condition:
+                if job.done or job.cancel_token.cancelled:
+                    self._report(None, probe)
+                    continue
+                job.attempts += 1
+                job.record("running")
+            try:
+                result = self.run(
+                    **job.kwargs, progress=job.progress, cancel=job.cancel_token
+                )
+            except JobCancelled:
+                self._cancelled(job, probe)
+            except Exception as e:
+                if job.cancel_token.cancelled:
+                    self._cancelled(job, probe)
+                elif isinstance(e, self.retry_on):
+                    self._retry(job, e, probe)
+                else:
+                    self._report(isinstance(e, self.trips_on) or None, probe)
+                    with self._condition:
+                        job.error = str(e)
+                        job.record("failed", error=job.error)
+            else:
+                self._report(False, probe)
+                with self._condition:
+                    job.result = result
+                    job.record("succeeded")
+
+    def _retry(self, job, error, probe=None):
+        self._report(isinstance(error, self.trips_on) or None, probe)
+        with self._condition:
+            if job.attempts >= job.max_attempts:
+                job.error = (
+                    f"Retries exhausted after {job.attempts} attempts: {str(error)}"
+                )
+                job.record("failed", error=job.error)
+                return
+            if job.cancel_token.cancelled:
+                job.record("cancelled")
+                return
+            delay = self.retry_delay(job.attempts)
+            print(
+                f"🔁 Job {job.id} attempt {job.attempts} failed ({str(error)}), "
+                f"retrying in {delay:.0f}s"
+            )
+            job.record("retry_scheduled", delay=round(delay, 1), error=str(error))
+            self._push(job, time.time() + delay)
+
+    def _cancelled(self, job, probe=None):
+        self._report(None, probe)
+        print(f"🛑 Job {job.id} cancelled")
+        with self._condition:
+            job.record("cancelled")
+
+    def _report(self, failed, probe=None):
+        """Pass an attempt's outcome to the breaker; None when it tells nothing"""
+        if not self.breaker:
+            return
+        if failed is None:
+            self.breaker.release(probe)
+        else:
+            self.breaker.record(failed, probe)
@@ -10,11 +10,57 @@ import re
 import os
 import zipfile
 import shutil
+import tempfile
 import imaplib
+import socket
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import email
 from email.mime.text import MIMEText
 import email.utils
 from dotenv import load_dotenv
+from Job_Scheduler import CancellationToken, JobCancelled, JobScheduler
+from Circuit_Breaker import CircuitBreaker
+from Worker_Pool import WorkerPool, call_parent, in_worker
+import Browser_Watchdog
+
+# Profile sections that can be requested from get_profile_info
+PROFILE_SECTIONS = ("about", "experience", "education", "projects", "certificates")
+
+
+class LoginChallenge(Exception):
+    """Login was stopped by a LinkedIn security challenge that was not resolved"""
+
+
+class CaptchaChallenge(LoginChallenge):
+    """LinkedIn demanded a CAPTCHA, which only a new session and IP can avoid"""
+
+
+def _timed(timings, step, function, *args):
+    """Run one bootstrap step, recording its duration in seconds"""
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        timings[step] = round(time.perf_counter() - start, 3)
+
+
+def _print_timings(timings):
+    steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items())
+    print(f"⏱️ Bootstrap timings: {steps}")
+
+
+def resolve_profile_sections(sections=None):
+    """Validate requested profile sections, returning them in canonical order"""
+    if not sections:
+        return list(PROFILE_SECTIONS)
+
+    unknown = [section for section in sections if section not in PROFILE_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown profile sections: {', '.join(unknown)}")
+
+    return [section for section in PROFILE_SECTIONS if section in sections]
 
 
 class EmailVerificationHandler:
@@ -23,6 +69,14 @@ class EmailVerificationHandler:
         self.email_password = email_password
         self.imap_server = imap_server or self._detect_imap_server(email_address)
         self.connection = None
+        self._selected = False
+        self.listener = None
+        self.dispatcher = VerificationCodeDispatcher()
+        # The connection is shared by every scrape using this mailbox
+        self._lock = threading.RLock()
+        self._last_used = 0
+        self._keepalive_stop = threading.Event()
+        self._keepalive_thread = None
 
     def _detect_imap_server(self, email_address):
         """Auto-detect IMAP server based on email domain"""
@@ -48,16 +102,32 @@ class EmailVerificationHandler:
         try:
             print(f"📧 Connecting to email server: {self.imap_server}")
             self.connection = imaplib.IMAP4_SSL(self.imap_server)
+            self._selected = False
             self.connection.login(self.email_address, self.email_password)
             print("✅ Email connection established successfully")
             return True
         except Exception as e:
+            self._drop_connection()
             print(f"❌ Email connection failed: {str(e)}")
             print("💡 Make sure you're using an app password for Gmail/Outlook")
             return False
 
+    def _drop_connection(self):
+        """Forget a broken connection, so the next search reconnects"""
+        connection, self.connection = self.connection, None
+        self._selected = False
+        if connection:
+            try:
+                connection.shutdown()
+            except Exception:
+                pass
+
     def disconnect(self):
         """Disconnect from email server"""
+        self._keepalive_stop.set()
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
         if self.connection:
             try:
                 self.connection.logout()
@@ -65,71 +135,200 @@ class EmailVerificationHandler:
             except:
                 pass
 
+    def keepalive(self):
+        """
+        NOOP the shared connection if it has been unused for a while, so the
+        server does not drop it between scrapes; reconnect if it was dropped.
+        """
+        interval = float(os.getenv("IMAP_KEEPALIVE_INTERVAL", "300"))
+        with self._lock:
+            if not self.connection or time.time() - self._last_used < interval:
+                return
+            try:
+                self.connection.noop()
+            except Exception as e:
+                print(f"⚠️ Email connection lost, reconnecting: {str(e)}")
+                self._drop_connection()
+                self.connect()
+            self._last_used = time.time()
+
+    def start_keepalive(self):
+        """Run keepalive on a timer, every half IMAP_KEEPALIVE_INTERVAL"""
+        if self._keepalive_thread and self._keepalive_thread.is_alive():
+            return
+        self._keepalive_stop.clear()
+        self._keepalive_thread = threading.Thread(
+            target=self._keepalive_loop, name="imap-keepalive", daemon=True
+        )
+        self._keepalive_thread.start()
+
+    def _keepalive_loop(self):
+        interval = float(os.getenv("IMAP_KEEPALIVE_INTERVAL", "300"))
+        while not self._keepalive_stop.wait(interval / 2):
+            try:
+                self.keepalive()
+            except Exception as e:
+                print(f"⚠️ Email keepalive failed: {str(e)}")
+
+    def start_listener(self):
+        """Start pushing new verification codes to waiting logins via IMAP IDLE"""
+        if not self.listener:
+            self.listener = VerificationCodeListener(self)
+            self.listener.start()
+        return self.listener
+
+    def wait_for_verification_code(
+        self, since=None, timeout=None, recipient=None, cancel=None
+    ):
+        """
+        Wait for the verification code of a login attempt.
+
+        With a running listener the code is returned as soon as its email
+        arrives. Without one, the inbox is searched after a fixed delay.
+
+        Args:
+            since (float): Timestamp the login was submitted at; codes from
+                emails that arrived earlier are ignored
+            timeout (float): Seconds to wait, defaults to IMAP_CODE_TIMEOUT
+            recipient (str): Address the email goes to, used to tell apart
+                concurrent logins sharing this mailbox
+            cancel (CancellationToken): Stops the wait when the scrape is
+                cancelled
+
+        Returns:
+            str: Verification code, or None if none arrived in time
+        """
+        timeout = timeout or float(os.getenv("IMAP_CODE_TIMEOUT", "60"))
+        if self.listener and self.listener.is_alive():
+            print(f"⏳ Waiting up to {timeout:.0f}s for the verification email...")
+            return self.dispatcher.wait(
+                since or time.time(), recipient, timeout, cancel
+            )
+
+        print("⏳ Waiting 10 seconds for verification email to arrive...")
+        (cancel or CancellationToken()).sleep(10)
+        return self.fetch_linkedin_verification_code()
+
     def fetch_linkedin_verification_code(self, max_age_minutes=5):
         """Fetch the latest LinkedIn verification code from emails"""
+        with self._lock:
+            self._last_used = time.time()
+            return self._search_verification_code(max_age_minutes)
+
+    def _search_verification_code(self, max_age_minutes):
         if not self.connection:
             if not self.connect():
                 return None
 
         try:
-            # Select inbox
-            self.connection.select("INBOX")
-
-            # Search for recent LinkedIn emails
-            search_criteria = [
-                'FROM "linkedin"',
-                'FROM "noreply@linkedin.com"',
-                'FROM "security@linkedin.com"',
-                'SUBJECT "verification"',
-                'SUBJECT "code"',
-                'SUBJECT "security"',
-            ]
-
-            verification_code = None
-
-            for criteria in search_criteria:
-                try:
-                    print(f"🔍 Searching emails with criteria: {criteria}")
-
-                    # Search for emails from the last few minutes
-                    typ, data = self.connection.search(None, criteria)
-
-                    if data[0]:
-                        email_ids = data[0].split()
-                        # Check latest emails first
-                        for email_id in reversed(
-                            email_ids[-10:]
-                        ):  # Check last 10 emails
-                            typ, msg_data = self.connection.fetch(email_id, "(RFC822)")
-                            email_message = email.message_from_bytes(msg_data[0][1])
-
-                            # Check email age
-                            date_tuple = email.utils.parsedate_tz(email_message["Date"])
-                            if date_tuple:
-                                email_timestamp = email.utils.mktime_tz(date_tuple)
-                                current_timestamp = time.time()
-                                age_minutes = (current_timestamp - email_timestamp) / 60
-
-                                if age_minutes > max_age_minutes:
-                                    continue  # Skip old emails
-
-                            # Extract verification code
-                            code = self._extract_verification_code(email_message)
-                            if code:
-                                print(f"✅ Found verification code: {code}")
-                                return code
+            # Select inbox once per connection; searches see newly arrived mail
+            if not self._selected:
+                self.connection.select("INBOX")
+                self._selected = True
+
+            # One search for recent LinkedIn emails not examined before
+            since = time.strftime(
+                "%d-%b-%Y", time.gmtime(time.time() - max_age_minutes * 60 - 86400)
+            )
+            watermark = _uid_watermarks.get(self._mailbox_key, 1)
+            criteria = f"UID {watermark}:* SINCE {since} {SEARCH_CRITERIA}"
+            print(f"🔍 Searching emails with criteria: {criteria}")
+            typ, data = self.connection.uid("search", None, criteria)
+
+            # "n:*" always matches the newest message, even when its UID is below n
+            uids = [int(uid) for uid in (data[0] or b"").split()]
+            uids = [uid for uid in uids if uid >= watermark]
+            if not uids:
+                print("❌ No verification code found in recent emails")
+                return None
 
-                except Exception as e:
-                    print(f"⚠️ Search error for {criteria}: {str(e)}")
-                    continue
+            # Check latest emails first
+            codes = self._fetch_codes(
+                self.connection, sorted(uids)[-10:], max_age_minutes, first_only=True
+            )
+            _uid_watermarks[self._mailbox_key] = max(uids) + 1
+            if codes:
+                print(f"✅ Found verification code: {codes[0][0]}")
+                return codes[0][0]
 
             print("❌ No verification code found in recent emails")
             return None
 
+        except (imaplib.IMAP4.error, OSError) as e:
+            print(f"❌ Email connection failed while searching: {str(e)}")
+            self._drop_connection()
+            return None
         except Exception as e:
             print(f"❌ Error fetching verification code: {str(e)}")
             return None
 
+    @property
+    def _mailbox_key(self):
+        return (self.imap_server, self.email_address.lower())
+
+    def _fetch_codes(self, connection, uids, max_age_minutes=None, first_only=False):
+        """
+        Extract (code, recipient) pairs from the given messages, newest first.
+
+        Up to FULL_FETCH_LIMIT messages are fetched whole in one command. With
+        more, and first_only, the newest one is fetched whole first, since it
+        is almost always the code email. Otherwise only the From, To, Subject
+        and Date headers of the rest are fetched, in one command, and bodies
+        are fetched for the LinkedIn messages that are recent enough, one at
+        a time, so that with first_only the search stops at the first code.
+        """
+        uids = sorted(uids, reverse=True)
+        if first_only and len(uids) > FULL_FETCH_LIMIT:
+            codes = self._fetch_whole(connection, uids[:1], max_age_minutes, True)
+            if codes:
+                return codes
+            uids = uids[1:]
+        if len(uids) <= FULL_FETCH_LIMIT:
+            return self._fetch_whole(connection, uids, max_age_minutes, first_only)
+
+        typ, data = connection.uid(
+            "fetch",
+            ",".join(str(uid) for uid in uids),
+            "(BODY.PEEK[HEADER.FIELDS (FROM TO SUBJECT DATE)])",
+        )
+        candidates = [
+            headers_uid
+            for headers_uid, headers in _fetched_messages(data)
+            if _is_recent_linkedin_email(headers, max_age_minutes)
+        ]
+
+        codes = []
+        for uid in sorted(candidates, reverse=True):
+            typ, data = connection.uid("fetch", str(uid), "(BODY.PEEK[])")
+            for _, email_message in _fetched_messages(data):
+                code = self._extract_verification_code(email_message)
+                if code:
+                    codes.append((code, email_message.get("To")))
+            if codes and first_only:
+                break
+        return codes
+
+    def _fetch_whole(self, connection, uids, max_age_minutes, first_only):
+        """Extract codes from messages downloaded whole in one command"""
+        if not uids:
+            return []
+        typ, data = connection.uid(
+            "fetch", ",".join(str(uid) for uid in uids), "(BODY.PEEK[])"
+        )
+        messages = sorted(
+            _fetched_messages(data), key=lambda item: item[0] or 0, reverse=True
+        )
+        codes = []
+        for _, email_message in messages:
+            if not _is_recent_linkedin_email(email_message, max_age_minutes):
+                continue
+            code = self._extract_verification_code(email_message)
+            if code:
+                codes.append((code, email_message.get("To")))
+                if first_only:
+                    break
+        return codes
+
     def _extract_verification_code(self, email_message):
         """Extract verification code from LinkedIn email"""
         try:
@@ -154,24 +353,13 @@ class EmailVerificationHandler:
             else:
                 body = email_message.get_payload(decode=True).decode()
 
-            # Extract verification code patterns
-            code_patterns = [
-                r"verification code[:\s]+(\d{4,8})",  # "verification code: 123456"
-                r"code[:\s]+(\d{4,8})",  # "code: 123456"
-                r"enter[:\s]+(\d{4,8})",  # "enter: 123456"
-                r"(\d{6})",  # standalone 6-digit number
-                r"(\d{4})",  # standalone 4-digit number
-                r"security code[:\s]+(\d{4,8})",  # "security code: 123456"
-                r"pin[:\s]+(\d{4,8})",  # "PIN: 123456"
-            ]
-
-            for pattern in code_patterns:
-                matches = re.findall(pattern, body, re.IGNORECASE)
+            for pattern in CODE_PATTERNS:
+                matches = pattern.findall(body)
                 if matches:
                     # Return the first valid code (4-8 digits)
                     for match in matches:
                         if 4 <= len(match) <= 8 and match.isdigit():
-                            print(f"🔍 Extracted code using pattern: {pattern}")
+                            print(f"🔍 Extracted code using pattern: {pattern.pattern}")
                             return match
 
             return None
@@ -181,11 +369,426 @@ class EmailVerificationHandler:
             return None
 
 
+# Senders and subjects of LinkedIn verification emails, combined into a single
+# IMAP search key: OR takes two keys, so the list is folded into nested ORs
+SEARCH_KEYS = [
+    'FROM "linkedin"',
+    'FROM "noreply@linkedin.com"',
+    'FROM "security@linkedin.com"',
+    'SUBJECT "verification"',
+    'SUBJECT "code"',
+    'SUBJECT "security"',
+]
+SEARCH_CRITERIA = SEARCH_KEYS[-1]
+for _key in reversed(SEARCH_KEYS[:-1]):
+    SEARCH_CRITERIA = f"OR {_key} {SEARCH_CRITERIA}"
+
+# Verification code patterns, most specific first
+CODE_PATTERNS = [
+    re.compile(r"verification code[:\s]+(\d{4,8})", re.IGNORECASE),
+    re.compile(r"code[:\s]+(\d{4,8})", re.IGNORECASE),
+    re.compile(r"enter[:\s]+(\d{4,8})", re.IGNORECASE),
+    re.compile(r"(\d{6})"),  # standalone 6-digit number
+    re.compile(r"(\d{4})"),  # standalone 4-digit number
+    re.compile(r"security code[:\s]+(\d{4,8})", re.IGNORECASE),
+    re.compile(r"pin[:\s]+(\d{4,8})", re.IGNORECASE),
+]
+
+_FETCH_UID = re.compile(rb"UID (\d+)")
+
+# Next UID to examine per (IMAP server, mailbox); earlier messages have already
+# been checked for a code
+_uid_watermarks = {}
+
+
+# Up to this many matches are fetched whole in one command instead of headers
+# first. A search bounded by SINCE and the UID watermark usually matches only
+# the code email, and a second round trip costs more than a few small bodies
+FULL_FETCH_LIMIT = 3
+
+
+def _is_recent_linkedin_email(headers, max_age_minutes=None):
+    """Whether a message, or its headers, is a LinkedIn email young enough"""
+    if "linkedin" not in (headers.get("From") or "").lower():
+        return False
+    if max_age_minutes is not None:
+        date_tuple = email.utils.parsedate_tz(headers.get("Date") or "")
+        if date_tuple:
+            age_minutes = (time.time() - email.utils.mktime_tz(date_tuple)) / 60
+            if age_minutes > max_age_minutes:
+                return False  # Skip old emails
+    return True
+
+
+def _fetched_messages(data):
+    """Yield (uid, email.message.Message) pairs from an imaplib FETCH response"""
+    for item in data or []:
+        if isinstance(item, tuple):
+            match = _FETCH_UID.search(item[0])
+            uid = int(match.group(1)) if match else None
+            yield uid, email.message_from_bytes(item[1])
+
+
+class VerificationCodeDispatcher:
+    """
+    Hands verification codes from a shared mailbox to the login attempts
+    waiting for them.
+
+    A code goes to the earliest submitted waiting login it can belong to: its
+    email arrived after that login was submitted and, when both are known,
+    was addressed to that login's email. Codes no login claims are kept for
+    ten minutes for a login that starts waiting late.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._unclaimed = []  # (arrival timestamp, code, recipient)
+
+    @staticmethod
+    def _belongs_to(waiter, arrived_at, recipient):
+        if arrived_at < waiter["since"]:
+            return False
+        if waiter["recipient"] and recipient:
+            return waiter["recipient"].lower() in recipient.lower()
+        return True
+
+    def deliver(self, code, recipient=None):
+        arrived_at = time.time()
+        with self._condition:
+            for waiter in sorted(self._waiters, key=lambda waiter: waiter["since"]):
+                if waiter["code"] is None and self._belongs_to(
+                    waiter, arrived_at, recipient
+                ):
+                    waiter["code"] = code
+                    self._condition.notify_all()
+                    return True
+
+            self._unclaimed = [
+                entry for entry in self._unclaimed if arrived_at - entry[0] < 600
+            ]
+            self._unclaimed.append((arrived_at, code, recipient))
+            return False
+
+    def wait(self, since, recipient=None, timeout=60, cancel=None):
+        """Return the code for a login submitted at `since`, or None on timeout"""
+        waiter = {"since": since, "recipient": recipient, "code": None}
+        deadline = time.time() + timeout
+        with self._condition:
+            for entry in self._unclaimed:
+                if self._belongs_to(waiter, entry[0], entry[2]):
+                    self._unclaimed.remove(entry)
+                    return entry[1]
+
+            self._waiters.append(waiter)
+            try:
+                while waiter["code"] is None:
+                    if cancel:
+                        cancel.check()
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None
+                    # Wake up every second to notice a cancelled scrape
+                    self._condition.wait(min(remaining, 1.0) if cancel else remaining)
+                return waiter["code"]
+            finally:
+                self._waiters.remove(waiter)
+
+    def stats(self):
+        with self._condition:
+            return {"waiting": len(self._waiters), "unclaimed": len(self._unclaimed)}
+
+
+class RelayedEmailHandler:
+    """
+    Stand-in for a mailbox's handler in a worker process, which asks the API
+    process for codes so that a single listener serves every worker.
+    """
+
+    def __init__(self, email_address, email_password, imap_server=None):
+        self.email_address = email_address
+        self.email_password = email_password
+        self.imap_server = imap_server
+
+    def wait_for_verification_code(
+        self, since=None, timeout=None, recipient=None, cancel=None
+    ):
+        """See EmailVerificationHandler.wait_for_verification_code"""
+        return call_parent(
+            "verification_code",
+            cancel=cancel,
+            email_address=self.email_address,
+            email_password=self.email_password,
+            imap_server=self.imap_server,
+            since=since,
+            timeout=timeout,
+            recipient=recipient,
+        )
+
+
+# Connected handlers shared by every scrape, one per mailbox and password, in
+# the API process. A wrong password gets a handler of its own that fails to
+# connect, instead of tearing down the one other logins are waiting on.
+_email_handlers = {}
+_email_handlers_lock = threading.Lock()
+_email_connect_locks = {}  # Per key, so connecting does not block other mailboxes
+
+
+def get_email_handler(email_address, email_password, imap_server=None):
+    """
+    Return the shared verification handler of a mailbox, connecting it and
+    starting its IMAP listener on first use.
+
+    Handlers stay connected across scrapes, so concurrent and later scrapes
+    on the same mailbox reuse the IMAP connections and the listener's
+    dispatcher keeps their codes apart. In a worker process the handler
+    lives in the API process, and a RelayedEmailHandler is returned.
+
+    Returns:
+        EmailVerificationHandler: Connected handler, or None if the mailbox
+            could not be reached
+    """
+    if in_worker():
+        if not call_parent(
+            "mailbox",
+            email_address=email_address,
+            email_password=email_password,
+            imap_server=imap_server,
+        ):
+            return None
+        return RelayedEmailHandler(email_address, email_password, imap_server)
+
+    key = (email_address.lower(), imap_server, email_password)
+    with _email_handlers_lock:
+        handler = _email_handlers.get(key)
+        if handler:
+            return handler
+        connect_lock = _email_connect_locks.setdefault(key, threading.Lock())
+
+    with connect_lock:
+        with _email_handlers_lock:
+            handler = _email_handlers.get(key)
+        if handler:
+            return handler
+        handler = EmailVerificationHandler(email_address, email_password, imap_server)
+        connected = handler.connect()
+        if connected:
+            handler.start_listener()
+            handler.start_keepalive()
+        with _email_handlers_lock:
+            if connected:
+                _email_handlers[key] = handler
+            else:
+                _email_connect_locks.pop(key, None)
+        return handler if connected else None
+
+
+def close_email_handlers():
+    """Disconnect every shared handler, at shutdown"""
+    with _email_handlers_lock:
+        handlers = list(_email_handlers.values())
+        _email_handlers.clear()
+        _email_connect_locks.clear()
+    for handler in handlers:
+        handler.disconnect()
+
+
+def _connect_mailbox(email_address, email_password, imap_server=None, cancel=None):
+    """Worker pool service: connect a mailbox, returning whether it is up"""
+    return get_email_handler(email_address, email_password, imap_server) is not None
+
+
+def _relay_verification_code(
+    email_address,
+    email_password,
+    imap_server=None,
+    since=None,
+    timeout=None,
+    recipient=None,
+    cancel=None,
+):
+    """Worker pool service: wait for a code on the mailbox's shared listener"""
+    handler = get_email_handler(email_address, email_password, imap_server)
+    if handler is None:
+        return None
+    return handler.wait_for_verification_code(
+        since=since, timeout=timeout, recipient=recipient, cancel=cancel
+    )
+
+
+def get_email_handler_stats():
+    with _email_handlers_lock:
+        handlers = list(_email_handlers.values())
+    return [
+        {
+            "mailbox": handler.email_address,
+            "listening": bool(handler.listener and handler.listener.is_alive()),
+            **handler.dispatcher.stats(),
+        }
+        for handler in handlers
+    ]
+
+
+class VerificationCodeListener:
+    """
+    Background IMAP listener that hands LinkedIn verification codes to waiting
+    logins the moment their email arrives.
+
+    The listener keeps its own connection in IDLE, so the server pushes new
+    mail instead of being searched after a fixed delay. Servers without IDLE
+    are polled every IMAP_POLL_INTERVAL seconds.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.connection = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._next_uid = None
+        # RFC 2177 asks clients to re-issue IDLE at least every 29 minutes
+        self.idle_timeout = float(os.getenv("IMAP_IDLE_TIMEOUT", "600"))
+        self.poll_interval = float(os.getenv("IMAP_POLL_INTERVAL", "3"))
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="imap-idle-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._logout()
+
+    def is_alive(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def _connect(self):
+        self.connection = imaplib.IMAP4_SSL(self.handler.imap_server)
+        self.connection.login(self.handler.email_address, self.handler.email_password)
+        self.connection.select("INBOX")
+        if self._next_uid is not None:
+            # Reconnected: pick up mail that arrived while disconnected
+            return
+        typ, data = self.connection.status("INBOX", "(UIDNEXT)")
+        match = re.search(rb"UIDNEXT (\d+)", data[0] or b"")
+        self._next_uid = int(match.group(1)) if match else 1
+
+    def _logout(self):
+        if self.connection:
+            try:
+                self.connection.logout()
+            except Exception:
+                pass
+            self.connection = None
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self._connect()
+                # Servers often advertise more capabilities once logged in
+                typ, data = self.connection.capability()
+                supports_idle = b"IDLE" in (data[0] or b"").upper().split()
+                print(
+                    "📬 IMAP listener started "
+                    f"({'IDLE' if supports_idle else f'polling every {self.poll_interval}s'})"
+                )
+                backoff = 1
+                while not self._stop.is_set():
+                    if supports_idle:
+                        self._idle()
+                    else:
+                        self._stop.wait(self.poll_interval)
+                        self.connection.noop()
+                    if not self._stop.is_set():
+                        self._collect_new_mail()
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"⚠️ IMAP listener error, reconnecting in {backoff}s: {str(e)}")
+                self._logout()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+        self._logout()
+
+    def _idle(self):
+        """
+        Hold the connection in IDLE until the server reports new mail, the
+        IDLE timeout elapses or the listener is stopped.
+
+        imaplib has no IDLE command before Python 3.14, so the exchange is
+        done on the socket directly; a socket timeout on imaplib's buffered
+        reader would leave it unusable.
+        """
+        connection = self.connection
+        sock = connection.socket()
+        tag = connection._new_tag()
+        connection.send(tag + b" IDLE\r\n")
+
+        buffer = b""
+        started = time.time()
+        idling = False
+        sock.settimeout(1)
+        try:
+            while not self._stop.is_set() and time.time() - started < self.idle_timeout:
+                try:
+                    chunk = sock.recv(4096)
+                except (socket.timeout, ssl.SSLWantReadError):
+                    continue
+                if not chunk:
+                    raise imaplib.IMAP4.abort("connection closed during IDLE")
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\r\n")
+                if any(line.startswith(b"+") for line in lines):
+                    idling = True
+                if any(line.startswith(tag) for line in lines):
+                    raise imaplib.IMAP4.error(f"IDLE rejected: {lines[-1]!r}")
+                if any(line.endswith(b"EXISTS") for line in lines):
+                    break
+            if not idling:
+                if self._stop.is_set():
+                    return
+                raise imaplib.IMAP4.abort("server did not enter IDLE")
+
+            connection.send(b"DONE\r\n")
+            sock.settimeout(30)
+            while not any(line.startswith(tag) for line in buffer.split(b"\r\n")):
+                chunk = sock.recv(4096)
+                if not chunk:
+                    raise imaplib.IMAP4.abort("connection closed ending IDLE")
+                buffer += chunk
+        finally:
+            sock.settimeout(None)
+
+    def _collect_new_mail(self):
+        """Extract codes from messages that arrived since the last check"""
+        typ, data = self.connection.uid("search", None, f"UID {self._next_uid}:*")
+        # "n:*" always matches the newest message, even when its UID is below n
+        uids = [int(uid) for uid in (data[0] or b"").split()]
+        uids = [uid for uid in uids if uid >= self._next_uid]
+        for code, recipient in reversed(
+            self.handler._fetch_codes(self.connection, uids)
+        ):
+            print(f"📨 Verification code delivered by IMAP listener: {code}")
+            self.handler.dispatcher.deliver(code, recipient)
+        if uids:
+            self._next_uid = max(uids) + 1
+
+
 class LinkedInScraper:
-    def __init__(self, email_handler=None):
+    def __init__(self, email_handler=None, cancel=None):
         self.driver = None
+        # Checked between steps and in every wait, see CancellationToken
+        self.cancel = cancel or CancellationToken()
         self.wait = None
         self.email_handler = email_handler
+        self._login_submitted_at = None
+        self._login_email = None
+        self.bootstrap_timings = {}
+        self.challenges = []  # Kinds of challenge met during login
+        self.browser_session = None
 
     def create_proxy_auth_extension(
         self, proxy_host, proxy_port, proxy_user, proxy_pass
@@ -241,14 +844,121 @@ class LinkedInScraper:
         );
         """
 
-        pluginfile = "proxy_auth_plugin.zip"
-        with zipfile.ZipFile(pluginfile, "w") as zp:
+        # One file per session: concurrent sessions load their own at launch
+        descriptor, pluginfile = tempfile.mkstemp(
+            prefix="proxy_auth_plugin_", suffix=".zip"
+        )
+        with os.fdopen(descriptor, "wb") as plugin, zipfile.ZipFile(plugin, "w") as zp:
             zp.writestr("manifest.json", manifest_json)
             zp.writestr("background.js", background_js)
         return pluginfile
 
     def setup_driver(self):
-        """Initialize the Chrome WebDriver with Bright Data rotating proxy"""
+        """
+        Initialize the Chrome WebDriver with Bright Data rotating proxy.
+
+        Building the proxy extension, locating the Chrome binary and resolving
+        ChromeDriver are independent, so they run concurrently and Chrome is
+        launched once all of them are done. Step durations are recorded in
+        bootstrap_timings.
+        """
+        options = self._chrome_options()
+        timings = self.bootstrap_timings
+
+        # Marks chromedriver and every Chrome process it starts, so they can
+        # be found and reaped if quitting the driver fails
+        self.browser_session = Browser_Watchdog.new_session()
+        options.add_argument(Browser_Watchdog.SESSION_ARGUMENT + self.browser_session)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            extension = pool.submit(
+                _timed, timings, "proxy_extension", self._build_proxy_extension
+            )
+            binary = pool.submit(
+                _timed, timings, "chrome_binary", self._find_chrome_binary
+            )
+            resolved = pool.submit(
+                _timed, timings, "chromedriver", self._resolve_chromedriver
+            )
+            proxy_plugin_path = extension.result()
+            chrome_binary = binary.result()
+            # Resolution errors are retried by _launch, reinstalling the driver
+            resolve_error = resolved.exception()
+
+        if proxy_plugin_path:
+            options.add_extension(proxy_plugin_path)
+            print("✅ Proxy authentication plugin created and loaded")
+
+        if chrome_binary:
+            print(f"🔍 Using Chrome binary: {chrome_binary}")
+            options.binary_location = chrome_binary
+        else:
+            print("🔍 Chrome binary not found, using system default")
+
+        try:
+            self._launch(options, resolved, resolve_error)
+        finally:
+            # Chrome has loaded the extension, or will not
+            if proxy_plugin_path and os.path.exists(proxy_plugin_path):
+                try:
+                    os.remove(proxy_plugin_path)
+                    print("🧹 Proxy plugin file cleaned up")
+                except OSError:
+                    pass  # Ignore cleanup errors
+
+        self.wait = WebDriverWait(self.driver, 10)
+
+    def _launch(self, options, resolved, resolve_error):
+        """Start chromedriver and Chrome, retrying with a reinstalled driver"""
+        from selenium.webdriver.chrome.service import Service
+
+        timings = self.bootstrap_timings
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                print(
+                    f"🚀 Setting up ChromeDriver (attempt {attempt + 1}/{max_retries})"
+                )
+
+                if attempt == 0:
+                    if resolve_error:
+                        raise resolve_error
+                    driver_path = resolved.result()
+                else:
+                    # The cache is shared by live sessions, so it is kept
+                    driver_path = self._resolve_chromedriver(reuse=False)
+
+                service = Service(
+                    driver_path,
+                    env=Browser_Watchdog.session_env(self.browser_session),
+                )
+                self.driver = _timed(
+                    timings,
+                    "launch",
+                    lambda: webdriver.Chrome(service=service, options=options),
+                )
+
+                print("🎉 ChromeDriver setup successful with Bright Data proxy!")
+                print("🤖 Browser is running in HEADLESS mode for AWS deployment")
+                print(
+                    "📧 Email verification automation will handle challenges automatically"
+                )
+                break
+
+            except Exception as e:
+                print(f"❌ Attempt {attempt + 1} failed: {str(e)}")
+                # A launch that failed half way may have left processes behind
+                Browser_Watchdog.kill_session(self.browser_session)
+                if attempt == max_retries - 1:
+                    error_msg = (
+                        f"Failed to setup ChromeDriver after {max_retries} attempts. "
+                    )
+                    error_msg += f"Last error: {str(e)}"
+                    raise RuntimeError(error_msg)
+                self.cancel.sleep(2)
+
+    def _chrome_options(self):
+        """Chrome options for a headless, stealthy session"""
         options = webdriver.ChromeOptions()
 
         # Essential browser hardening and stealth options
@@ -279,7 +989,6 @@ class LinkedInScraper:
         options.add_argument("--disable-web-security")
         options.add_argument("--allow-running-insecure-content")
         options.add_argument("--disable-features=VizDisplayCompositor")
-        options.add_argument("--remote-debugging-port=9222")
         options.add_argument("--disable-background-timer-throttling")
         options.add_argument("--disable-backgrounding-occluded-windows")
         options.add_argument("--disable-renderer-backgrounding")
@@ -300,6 +1009,10 @@ class LinkedInScraper:
             "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
         )
 
+        return options
+
+    def _build_proxy_extension(self) -> Optional[str]:
+        """Write the proxy authentication extension, returning its path"""
         # 🔐 Bright Data proxy credentials (loaded from environment for security)
         load_dotenv()
         proxy_host = os.getenv("BRIGHTDATA_PROXY_HOST", "brd.superproxy.io")
@@ -311,91 +1024,43 @@ class LinkedInScraper:
 
         print(f"🌐 Setting up Bright Data rotating proxy: {proxy_host}:{proxy_port}")
 
-        # 🔌 Create and inject proxy authentication plugin
-        proxy_plugin_path = None
+        # 🔌 Create proxy authentication plugin
         try:
-            proxy_plugin_path = self.create_proxy_auth_extension(
+            return self.create_proxy_auth_extension(
                 proxy_host, proxy_port, proxy_user, proxy_pass
             )
-            options.add_extension(proxy_plugin_path)
-            print("✅ Proxy authentication plugin created and loaded")
         except Exception as e:
             print(f"⚠️ Warning: Failed to create proxy plugin: {e}")
             print("🔄 Continuing without proxy - may face IP blocks")
+            return None
 
-        # Find Chrome binary with fallback logic
-        chrome_binary = self._find_chrome_binary()
-        if chrome_binary:
-            print(f"🔍 Using Chrome binary: {chrome_binary}")
-            options.binary_location = chrome_binary
-        else:
-            print("🔍 Chrome binary not found, using system default")
-
-        # Use webdriver-manager with retry logic
-        from webdriver_manager.chrome import ChromeDriverManager
-        from selenium.webdriver.chrome.service import Service
-
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                print(
-                    f"🚀 Setting up ChromeDriver (attempt {attempt + 1}/{max_retries})"
-                )
-
-                # Clear cache on retry attempts
-                if attempt > 0:
-                    print("🧹 Clearing webdriver-manager cache...")
-                    cache_dir = os.path.expanduser("~/.wdm")
-                    if os.path.exists(cache_dir):
-                        shutil.rmtree(cache_dir)
-
-                # Check if Chrome is available
-                chrome_installed = self._check_chrome_installation()
-
-                if chrome_installed:
-                    driver_path = ChromeDriverManager().install()
-                else:
-                    print(
-                        "⚠️ Chrome not detected, using fallback ChromeDriver version..."
-                    )
-                    driver_path = ChromeDriverManager(
-                        version="120.0.6099.109"
-                    ).install()
-
-                print(f"📍 ChromeDriver path: {driver_path}")
+    def _resolve_chromedriver(self, reuse=True) -> str:
+        """
+        Install a ChromeDriver matching the local Chrome, returning its path.
 
-                # Handle potential path issues (webdriver-manager sometimes returns wrong file)
-                actual_driver_path = self._find_actual_chromedriver(driver_path)
+        Args:
+            reuse (bool): Use CHROMEDRIVER_PATH when it points at an
+                executable, as set by resolve_browser_binaries
+        """
+        resolved = os.getenv("CHROMEDRIVER_PATH")
+        if reuse and resolved and os.access(resolved, os.X_OK):
+            return resolved
 
-                service = Service(actual_driver_path)
-                self.driver = webdriver.Chrome(service=service, options=options)
+        from webdriver_manager.chrome import ChromeDriverManager
 
-                print("🎉 ChromeDriver setup successful with Bright Data proxy!")
-                print("🤖 Browser is running in HEADLESS mode for AWS deployment")
-                print(
-                    "📧 Email verification automation will handle challenges automatically"
-                )
-                break
+        # Check if Chrome is available
+        chrome_installed = self._check_chrome_installation()
 
-            except Exception as e:
-                print(f"❌ Attempt {attempt + 1} failed: {str(e)}")
-                if attempt == max_retries - 1:
-                    error_msg = (
-                        f"Failed to setup ChromeDriver after {max_retries} attempts. "
-                    )
-                    error_msg += f"Last error: {str(e)}"
-                    raise RuntimeError(error_msg)
-                time.sleep(2)
+        if chrome_installed:
+            driver_path = ChromeDriverManager().install()
+        else:
+            print("⚠️ Chrome not detected, using fallback ChromeDriver version...")
+            driver_path = ChromeDriverManager(version="120.0.6099.109").install()
 
-        # Clean up proxy plugin file after driver starts
-        if proxy_plugin_path and os.path.exists(proxy_plugin_path):
-            try:
-                os.remove(proxy_plugin_path)
-                print("🧹 Proxy plugin file cleaned up")
-            except:
-                pass  # Ignore cleanup errors
+        print(f"📍 ChromeDriver path: {driver_path}")
 
-        self.wait = WebDriverWait(self.driver, 10)
+        # Handle potential path issues (webdriver-manager sometimes returns wrong file)
+        return self._find_actual_chromedriver(driver_path)
 
     def _find_actual_chromedriver(self, driver_path):
         """Find the actual chromedriver executable from webdriver-manager path"""
@@ -452,6 +1117,9 @@ class LinkedInScraper:
         login_button = self.driver.find_element(
             By.CSS_SELECTOR, 'button[type="submit"]'
         )
+        # LinkedIn sends the verification email, if any, once this is submitted
+        self._login_email = email
+        self._login_submitted_at = time.time()
         login_button.click()
         print("🔄 Login button clicked, waiting for authentication...")
         sys.stdout.flush()
@@ -464,6 +1132,11 @@ class LinkedInScraper:
             else:
                 print("❌ FAILED: Login failed or could not reach LinkedIn homepage")
                 sys.stdout.flush()
+                if self.challenges:
+                    raise LoginChallenge(
+                        "Login blocked by unresolved LinkedIn challenge: "
+                        + ", ".join(self.challenges)
+                    )
                 raise Exception(
                     "❌ FAILED: Login failed or could not reach LinkedIn homepage"
                 )
@@ -480,6 +1153,7 @@ class LinkedInScraper:
         start_time = time.time()
 
         while time.time() - start_time < max_wait_time:
+            self.cancel.check()
             try:
                 current_url = self.driver.current_url
                 print(f"📍 Current URL: {current_url}")
@@ -543,6 +1217,14 @@ class LinkedInScraper:
                         )
 
                         verification_success = False
+                        if is_captcha_challenge:
+                            challenge_kind = "captcha"
+                        elif is_email_verification:
+                            challenge_kind = "email_verification"
+                        else:
+                            challenge_kind = "other"
+                        if challenge_kind not in self.challenges:
+                            self.challenges.append(challenge_kind)
 
                         # Handle CAPTCHA challenges in headless mode
                         if is_captcha_challenge:
@@ -569,23 +1251,10 @@ class LinkedInScraper:
                                 )
                                 sys.stdout.flush()
 
-                                # Close current session
-                                try:
-                                    self.driver.quit()
-                                    print("🧹 Closed browser session for retry")
-                                except:
-                                    pass
-
-                                # Import time for delay
-                                import time
-
-                                # Wait before retry to avoid rate limiting
-                                print("⏳ Waiting 30 seconds before retry...")
-                                time.sleep(30)
-
-                                # Raise specific exception to trigger retry at higher level
-                                raise Exception(
-                                    "CAPTCHA_CHALLENGE_DETECTED_RETRY_NEEDED"
+                                # The scheduler closes this session and waits
+                                # out the back-off without holding a worker
+                                raise CaptchaChallenge(
+                                    "LinkedIn CAPTCHA challenge in headless mode"
                                 )
                             else:
                                 print(
@@ -601,15 +1270,13 @@ class LinkedInScraper:
                             sys.stdout.flush()
 
                             try:
-                                # Wait a moment for the email to arrive
-                                print(
-                                    "⏳ Waiting 10 seconds for verification email to arrive..."
-                                )
-                                time.sleep(10)
-
-                                # Fetch verification code from email
+                                # Wait for the email sent when the login was submitted
                                 verification_code = (
-                                    self.email_handler.fetch_linkedin_verification_code()
+                                    self.email_handler.wait_for_verification_code(
+                                        since=self._login_submitted_at,
+                                        recipient=self._login_email,
+                                        cancel=self.cancel,
+                                    )
                                 )
 
                                 if verification_code:
@@ -627,7 +1294,7 @@ class LinkedInScraper:
                                         verification_success = True
 
                                         # Wait for page to process and check if successful
-                                        time.sleep(3)
+                                        self.cancel.sleep(3)
                                         current_url_after_auto = self.driver.current_url
                                         if (
                                             "linkedin.com/checkpoint/challenge"
@@ -673,7 +1340,7 @@ class LinkedInScraper:
                             sys.stdout.flush()
 
                             # Wait 15 seconds for manual verification
-                            time.sleep(15)
+                            self.cancel.sleep(15)
 
                         # Check current URL again after manual intervention
                         current_url_after = self.driver.current_url
@@ -684,24 +1351,26 @@ class LinkedInScraper:
                         if "linkedin.com/checkpoint/challenge" in current_url_after:
                             print("⚠️ Still on challenge page - continuing to wait...")
                             sys.stdout.flush()
-                            time.sleep(2)  # Brief pause before next iteration
+                            self.cancel.sleep(2)  # Brief pause before next iteration
                             continue
                         else:
                             print("✅ Successfully moved past challenge page!")
                             sys.stdout.flush()
                             # Continue with normal login verification below
                     else:
+                        if "unknown" not in self.challenges:
+                            self.challenges.append("unknown")
                         print("❌ Challenge type could not be determined")
                         print("⏳ Waiting 15 seconds anyway for manual intervention...")
                         sys.stdout.flush()
-                        time.sleep(15)
+                        self.cancel.sleep(15)
 
                         # Check if we moved past the unknown challenge
                         current_url_after = self.driver.current_url
                         if "linkedin.com/checkpoint/challenge" in current_url_after:
                             print("❌ Still on unknown challenge page after waiting")
                             sys.stdout.flush()
-                            raise Exception(
+                            raise LoginChallenge(
                                 "LinkedIn security challenge encountered - type unknown, manual intervention failed"
                             )
                         else:
@@ -745,7 +1414,7 @@ class LinkedInScraper:
                     or "linkedin.com/uas/login" in current_url
                 ):
                     print("⏳ Still on login page, waiting...")
-                    time.sleep(1)
+                    self.cancel.sleep(1)
                     continue
 
                 # If we're redirected somewhere else, assume success
@@ -753,11 +1422,13 @@ class LinkedInScraper:
                     print(f"✅ Redirected away from login page to: {current_url}")
                     return True
 
-                time.sleep(1)
+                self.cancel.sleep(1)
 
+            except LoginChallenge:
+                raise
             except Exception as e:
                 print(f"⚠️ Error during login verification: {str(e)}")
-                time.sleep(1)
+                self.cancel.sleep(1)
                 continue
 
         print("❌ Login verification timeout - could not confirm successful login")
@@ -1009,7 +1680,7 @@ class LinkedInScraper:
             print(f"✅ Entered verification code: {verification_code}")
 
             # Give a moment for any field validation
-            time.sleep(1)
+            self.cancel.sleep(1)
 
             # Find and click submit button
             submit_selectors = [
@@ -1049,7 +1720,7 @@ class LinkedInScraper:
 
                 # Wait for processing
                 print("⏳ Waiting for verification to process...")
-                time.sleep(3)
+                self.cancel.sleep(3)
                 return True
             else:
                 print("❌ Could not find submit button")
@@ -1083,27 +1754,39 @@ class LinkedInScraper:
 
         raise ValueError("Invalid LinkedIn profile URL format")
 
-    def get_profile_info(self, profile_url: str) -> Dict:
-        """Extract information from a LinkedIn profile"""
+    def get_profile_info(
+        self, profile_url: str, sections: Optional[List[str]] = None
+    ) -> Dict:
+        """Extract information from a LinkedIn profile
+
+        Only the requested sections are scraped, so skipping projects and
+        certificates avoids navigating to their details pages entirely.
+        """
+        sections = resolve_profile_sections(sections)
+
         # Validate and format the URL
         formatted_url = self.validate_linkedin_url(profile_url)
         print(f"Accessing profile: {formatted_url}")
 
         self.driver.get(formatted_url)
-        time.sleep(2)  # Reduced wait time
+        self.cancel.sleep(2)  # Reduced wait time
 
         # Scroll down to load more content
         self._scroll_page()
 
-        profile_data = {
-            "profile_url": formatted_url,
-            "about": self._get_about(),
-            "experience": self._get_experience(),
-            "education": self._get_education(),
-            "projects": self._get_projects(formatted_url),
-            "certificates": self._get_certificates(formatted_url),
+        section_extractors = {
+            "about": self._get_about,
+            "experience": self._get_experience,
+            "education": self._get_education,
+            "projects": lambda: self._get_projects(formatted_url),
+            "certificates": lambda: self._get_certificates(formatted_url),
         }
 
+        profile_data = {"profile_url": formatted_url}
+        for section in sections:
+            self.cancel.check()
+            profile_data[section] = section_extractors[section]()
+
         return profile_data
 
     def _scroll_page(self):
@@ -1117,7 +1800,7 @@ class LinkedInScraper:
             self.driver.execute_script(
                 "window.scrollTo(0, document.body.scrollHeight);"
             )
-            time.sleep(SCROLL_PAUSE_TIME)
+            self.cancel.sleep(SCROLL_PAUSE_TIME)
 
             # Calculate new scroll height
             new_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -1453,7 +2136,7 @@ class LinkedInScraper:
                     projects_url = projects_button.get_attribute("href")
                     print(f"Navigating to projects page: {projects_url}")
                     self.driver.get(projects_url)
-                    time.sleep(3)  # Wait for projects page to load
+                    self.cancel.sleep(3)  # Wait for projects page to load
 
                     # Extract all projects from the projects page
                     projects_list = self._extract_projects_from_page()
@@ -1461,7 +2144,7 @@ class LinkedInScraper:
                     # Navigate back to main profile
                     print(f"Navigating back to main profile: {main_profile_url}")
                     self.driver.get(main_profile_url)
-                    time.sleep(2)  # Wait for main page to load
+                    self.cancel.sleep(2)  # Wait for main page to load
 
                 else:
                     print(
@@ -1488,7 +2171,7 @@ class LinkedInScraper:
             print("Extracting projects from projects page...")
 
             # Wait for the projects page to load
-            time.sleep(2)
+            self.cancel.sleep(2)
 
             # Scroll to load all projects
             self._scroll_page()
@@ -1774,7 +2457,7 @@ class LinkedInScraper:
                     certificates_url = certificates_button.get_attribute("href")
                     print(f"Navigating to certificates page: {certificates_url}")
                     self.driver.get(certificates_url)
-                    time.sleep(3)  # Wait for certificates page to load
+                    self.cancel.sleep(3)  # Wait for certificates page to load
 
                     # Extract all certificates from the certificates page
                     certificates_list = self._extract_certificates_from_page()
@@ -1782,7 +2465,7 @@ class LinkedInScraper:
                     # Navigate back to main profile
                     print(f"Navigating back to main profile: {main_profile_url}")
                     self.driver.get(main_profile_url)
-                    time.sleep(2)  # Wait for main page to load
+                    self.cancel.sleep(2)  # Wait for main page to load
 
                 else:
                     print(
@@ -1809,7 +2492,7 @@ class LinkedInScraper:
             print("Extracting certificates from certificates page...")
 
             # Wait for the certificates page to load
-            time.sleep(2)
+            self.cancel.sleep(2)
 
             # Scroll to load all certificates
             self._scroll_page()
@@ -2167,6 +2850,10 @@ class LinkedInScraper:
 
     def _find_chrome_binary(self) -> Optional[str]:
         """Find Chrome binary in common installation locations"""
+        resolved = os.getenv("CHROME_BINARY")
+        if resolved and os.access(resolved, os.X_OK):
+            return resolved
+
         possible_paths = [
             # Linux
             "/usr/bin/google-chrome",
@@ -2265,19 +2952,137 @@ class LinkedInScraper:
             return None
 
     def close(self):
-        """Close the browser"""
-        if self.driver:
-            self.driver.quit()
+        """Close the browser, killing any of its processes that outlive quit()"""
+        try:
+            if self.driver:
+                self.driver.quit()
+        finally:
+            leftover = Browser_Watchdog.kill_session(self.browser_session)
+            if leftover:
+                print(f"🧹 Killed {leftover} leftover browser processes")
+
+
+# Browsers logged in ahead of time by warm_worker, claimed by the next scrape
+# on the same account, as (account, scraper, logged in at)
+_warm_scrapers = []
+_warm_scrapers_lock = threading.Lock()
+
+
+def resolve_browser_binaries():
+    """
+    Locate Chrome and install ChromeDriver once, exporting CHROME_BINARY and
+    CHROMEDRIVER_PATH so that scrapers and worker processes started afterwards
+    skip the installation checks.
+
+    Returns:
+        dict: The resolved paths
+    """
+    scraper = LinkedInScraper()
+    chrome_binary = scraper._find_chrome_binary()
+    if chrome_binary:
+        os.environ["CHROME_BINARY"] = chrome_binary
+    chromedriver = scraper._resolve_chromedriver()
+    os.environ["CHROMEDRIVER_PATH"] = chromedriver
+    return {"chrome_binary": chrome_binary, "chromedriver": chromedriver}
+
+
+def warm_worker(slot, cancel=None):
+    """
+    Prepare a worker for scrapes with the LINKEDIN_EMAIL account: have its
+    mailbox connected and, in the first LINKEDIN_PREWARM_BROWSERS slots,
+    launch a browser and log it in for the next scrape to take over.
+    """
+    load_dotenv()
+    email = os.getenv("LINKEDIN_EMAIL")
+    password = os.getenv("LINKEDIN_PASSWORD")
+    email_password = os.getenv("EMAIL_PASSWORD") or os.getenv("EMAIL_APP_PASSWORD")
+    if not email or not password:
+        return
 
+    handler = get_email_handler(email, email_password) if email_password else None
+    if slot >= int(os.getenv("LINKEDIN_PREWARM_BROWSERS", "0")):
+        return
 
-def scrape_linkedin_profile(
+    print(f"♨️ Pre-warming a logged-in browser in slot {slot}")
+    scraper = LinkedInScraper(email_handler=handler, cancel=cancel)
+    try:
+        scraper.setup_driver()
+        scraper.login(email, password)
+    except BaseException:
+        scraper.close()
+        raise
+    with _warm_scrapers_lock:
+        _warm_scrapers.append((email.lower(), scraper, time.time()))
+
+
+def _claim_warm_scraper(email, cancel):
+    """Take a pre-warmed browser logged in as `email`, if one is still usable"""
+    max_age = float(os.getenv("LINKEDIN_PREWARM_MAX_AGE", "1800"))
+    while True:
+        with _warm_scrapers_lock:
+            index = next(
+                (
+                    index
+                    for index, (account, _, _) in enumerate(_warm_scrapers)
+                    if account == email.lower()
+                ),
+                None,
+            )
+            if index is None:
+                return None
+            _, scraper, warmed_at = _warm_scrapers.pop(index)
+
+        try:
+            current_url = scraper.driver.current_url
+            usable = time.time() - warmed_at < max_age and not any(
+                page in current_url for page in ("/login", "checkpoint")
+            )
+        except Exception:
+            usable = False
+        if usable:
+            scraper.cancel = cancel
+            return scraper
+        print("♻️ Discarding a stale pre-warmed browser")
+        scraper.close()
+
+
+def close_warm_scrapers():
+    """Close the pre-warmed browsers nobody claimed, as their worker exits"""
+    with _warm_scrapers_lock:
+        warm = list(_warm_scrapers)
+        _warm_scrapers.clear()
+    for _, scraper, _ in warm:
+        try:
+            scraper.close()
+        except Exception:
+            pass
+
+
+def scrape_linkedin_attempt(
     applicant_id: str,
     profile_url: str,
     email: str = None,
     password: str = None,
     email_password: str = None,
     enable_email_verification: bool = True,
+    sections: Optional[List[str]] = None,
+    progress=None,
+    cancel=None,
 ) -> Dict:
+    """
+    Scrape a profile in one fresh browser session, or in a browser that
+    warm_worker already logged in with the same account.
+
+    The browser is closed before any error propagates. A CAPTCHA raises
+    CaptchaChallenge, which scrape_jobs retries later in a new session.
+
+    Args:
+        progress: Optional callable reporting each completed step by name
+        cancel (CancellationToken): Stops the scrape between steps and in
+            waits by raising JobCancelled
+    """
+    progress = progress or (lambda step: None)
+    cancel = cancel or CancellationToken()
 
     # Validate required parameters
     if not profile_url:
@@ -2286,6 +3091,8 @@ def scrape_linkedin_profile(
     if not applicant_id:
         raise ValueError("Applicant ID is required")
 
+    sections = resolve_profile_sections(sections)
+
     if not email or not password:
         load_dotenv()
         email = email or os.getenv("LINKEDIN_EMAIL")
@@ -2297,133 +3104,102 @@ def scrape_linkedin_profile(
             )
 
     # Setup email verification handler if enabled
-    email_handler = None
-    if enable_email_verification:
+    if enable_email_verification and not email_password:
         # Get email password from parameter or environment
-        if not email_password:
-            load_dotenv()
-            email_password = os.getenv("EMAIL_PASSWORD") or os.getenv(
-                "EMAIL_APP_PASSWORD"
-            )
+        load_dotenv()
+        email_password = os.getenv("EMAIL_PASSWORD") or os.getenv("EMAIL_APP_PASSWORD")
 
+    def connect_email_handler():
+        try:
+            print("📧 Setting up email verification handler...")
+            # Shared per mailbox and kept connected across scrapes
+            handler = get_email_handler(email, email_password)
+            if handler:
+                print("✅ Email verification handler ready")
+            else:
+                print(
+                    "⚠️ Email connection failed - continuing without email automation"
+                )
+            return handler
+        except Exception as e:
+            print(f"⚠️ Email handler setup failed: {str(e)}")
+            print("🔄 Continuing without email automation")
+            return None
+
+    # The mailbox is connected while the browser starts; login joins both
+    timings = {}
+    email_future = None
+    if enable_email_verification:
         if email_password:
-            try:
-                print("📧 Setting up email verification handler...")
-                email_handler = EmailVerificationHandler(email, email_password)
-                if email_handler.connect():
-                    print("✅ Email verification handler ready")
-                else:
-                    print(
-                        "⚠️ Email connection failed - continuing without email automation"
-                    )
-                    email_handler = None
-            except Exception as e:
-                print(f"⚠️ Email handler setup failed: {str(e)}")
-                print("🔄 Continuing without email automation")
-                email_handler = None
+            bootstrap = ThreadPoolExecutor(max_workers=1)
+            email_future = bootstrap.submit(
+                _timed, timings, "imap", connect_email_handler
+            )
+            bootstrap.shutdown(wait=False)
         else:
             print("⚠️ No email password provided - email verification disabled")
             print(
                 "💡 Set EMAIL_PASSWORD environment variable to enable email automation"
             )
 
-    # Retry logic for CAPTCHA challenges
-    max_retries = 3
-    retry_count = 0
-    import time
     import sys
 
-    scraper = None
+    scraper = _claim_warm_scraper(email, cancel)
+    warm = scraper is not None
 
     try:
-        while retry_count < max_retries:
-            try:
-                # Initialize the scraper (new instance for each retry)
-                scraper = LinkedInScraper(email_handler=email_handler)
-                scraper.setup_driver()
-
-                retry_suffix = (
-                    f" (Attempt {retry_count + 1}/{max_retries})"
-                    if retry_count > 0
-                    else ""
-                )
-                print(
-                    f"🎯 Starting LinkedIn scraper for applicant: {applicant_id}{retry_suffix}"
-                )
-                print(f"🔗 Target profile: {profile_url}")
-                print(f"👤 Using email: {email}")
-                print("🤖 HEADLESS MODE: Automated email verification enabled")
-                print("📧 Email challenges will be handled automatically")
-
-                if retry_count > 0:
-                    print(
-                        f"🔄 Retry attempt #{retry_count + 1} after CAPTCHA challenge"
-                    )
-
-                sys.stdout.flush()
-
-                # Login to LinkedIn
-                print("🚀 Attempting LinkedIn login...")
-                scraper.login(email, password)
-                print("✅ Login completed successfully!")
-
-                # Scrape profile information
-                print("📊 Starting profile data extraction...")
-                profile_data = scraper.get_profile_info(profile_url)
-                print("✅ Profile data extraction completed!")
-
-                data = {"id": applicant_id, "source": "linkedin", "data": profile_data}
-                return data
-
-            except Exception as e:
-                error_str = str(e)
-
-                # Check if this is a CAPTCHA retry exception
-                if "CAPTCHA_CHALLENGE_DETECTED_RETRY_NEEDED" in error_str:
-                    retry_count += 1
-                    print(
-                        f"🤖 CAPTCHA challenge detected - retry {retry_count}/{max_retries}"
-                    )
-
-                    # Close current scraper instance
-                    try:
-                        if scraper:
-                            scraper.close()
-                    except:
-                        pass
-
-                    if retry_count < max_retries:
-                        print(
-                            f"🔄 Preparing retry #{retry_count + 1} with new session..."
-                        )
-                        print(
-                            "🌐 IP rotation will occur automatically with proxy system"
-                        )
-
-                        # Progressive delay between retries
-                        delay = 60 * retry_count  # 0, 60, 120 seconds
-                        if delay > 0:
-                            print(
-                                f"⏳ Waiting {delay} seconds before retry to avoid rate limiting..."
-                            )
-                            time.sleep(delay)
-
-                        continue  # Try again with new session
-                    else:
-                        print("❌ Maximum retries exceeded for CAPTCHA challenges")
-                        print(
-                            "🚨 LinkedIn is consistently showing CAPTCHAs - may need manual intervention"
-                        )
-                        raise Exception(
-                            "CAPTCHA challenges exceeded maximum retry attempts"
-                        )
-                else:
-                    # Different type of error - re-raise immediately
-                    raise e
-
-        # This should never be reached, but just in case
-        raise Exception("Unexpected exit from retry loop")
+        if warm:
+            print("♨️ Using a pre-warmed browser that is already logged in")
+            if email_future:
+                scraper.email_handler = email_future.result()
+        else:
+            scraper = LinkedInScraper(cancel=cancel)
+            bootstrap_start = time.perf_counter()
+            scraper.setup_driver()
+            if email_future:
+                scraper.email_handler = email_future.result()
+                timings.update(scraper.bootstrap_timings)
+                timings["total"] = round(time.perf_counter() - bootstrap_start, 3)
+                _print_timings(timings)
+            else:
+                _print_timings(scraper.bootstrap_timings)
+        cancel.check()
+        progress("browser_ready")
+
+        print(f"🎯 Starting LinkedIn scraper for applicant: {applicant_id}")
+        print(f"🔗 Target profile: {profile_url}")
+        print(f"👤 Using email: {email}")
+        print("🤖 HEADLESS MODE: Automated email verification enabled")
+        print("📧 Email challenges will be handled automatically")
+        sys.stdout.flush()
 
+        # Login to LinkedIn
+        if not warm:
+            print("🚀 Attempting LinkedIn login...")
+            scraper.login(email, password)
+            print("✅ Login completed successfully!")
+        cancel.check()
+        progress("logged_in")
+
+        # Scrape profile information
+        print("📊 Starting profile data extraction...")
+        profile_data = scraper.get_profile_info(profile_url, sections)
+        print("✅ Profile data extraction completed!")
+        progress("profile_scraped")
+
+        data = {"id": applicant_id, "source": "linkedin", "data": profile_data}
+        return data
+
+    except JobCancelled:
+        print("🛑 Scrape cancelled - closing browser")
+        raise
+    except CaptchaChallenge:
+        print("🤖 CAPTCHA challenge detected - closing session for a scheduled retry")
+        print("🌐 IP rotation will occur automatically with proxy system")
+        raise
+    except LoginChallenge as e:
+        print(f"🔒 {str(e)}")
+        raise
     except Exception as e:
         # Print detailed error information before re-raising
         print(f"❌ LinkedIn scraping failed with error: {str(e)}")
@@ -2458,13 +3234,150 @@ def scrape_linkedin_profile(
         except:
             print("⚠️ Warning: Could not close browser properly")
 
-        # Disconnect email handler
-        if email_handler:
+
+# Attempts run in worker processes that own their browsers. CAPTCHA retries
+# wait on the scheduler's queue, not in a worker, and logins stop while
+# LinkedIn challenges most of them
+# LinkedIn sends codes for every worker's logins to the same mailboxes, so
+# their listeners stay in the API process and workers relay to them
+worker_pool = WorkerPool(
+    scrape_linkedin_attempt,
+    warm=warm_worker,
+    cleanup=close_warm_scrapers,
+    services={
+        "mailbox": _connect_mailbox,
+        "verification_code": _relay_verification_code,
+    },
+)
+login_breaker = CircuitBreaker("LinkedIn")
+browser_watchdog = Browser_Watchdog.BrowserWatchdog(on_oversized=worker_pool.recycle)
+scrape_jobs = JobScheduler(
+    worker_pool.run,
+    retry_on=(CaptchaChallenge,),
+    breaker=login_breaker,
+    trips_on=(LoginChallenge,),
+)
+
+
+class StartupWarmUp:
+    """
+    Gets the scraper ready for traffic in the background after startup.
+
+    The browser binaries are resolved first, so the worker processes spawned
+    next inherit their paths. Then the worker pool is started and up to
+    LINKEDIN_PREWARM_TIMEOUT seconds are given to its workers to warm up, see
+    warm_worker. Steps that fail are reported and left to the first scrape.
+    Set LINKEDIN_PREWARM=false to do all of it on the first scrape instead.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.enabled = os.getenv("LINKEDIN_PREWARM", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.timeout = float(os.getenv("LINKEDIN_PREWARM_TIMEOUT", "300"))
+        self.status = "pending"
+        self.binaries = {}
+        self.timings = {}
+        self.errors = {}
+        self._thread = None
+
+    @property
+    def ready(self):
+        return not self.enabled or self.status in ("ready", "degraded")
+
+    def start(self):
+        if not self.enabled or self._thread:
+            return
+        self.status = "warming"
+        self._thread = threading.Thread(
+            target=self._run, name="linkedin-warmup", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        start = time.perf_counter()
+        for step, function in (
+            ("binaries", self._resolve_binaries),
+            ("workers", self._start_workers),
+        ):
             try:
-                email_handler.disconnect()
-                print("📧 Email connection closed")
-            except:
-                pass
+                _timed(self.timings, step, function)
+            except Exception as e:
+                print(f"⚠️ LinkedIn warm-up step {step} failed: {str(e)}")
+                self.errors[step] = str(e)
+        self.timings["total"] = round(time.perf_counter() - start, 3)
+        self.status = "degraded" if self.errors else "ready"
+        steps = ", ".join(
+            f"{step} {seconds:.2f}s" for step, seconds in self.timings.items()
+        )
+        print(f"♨️ LinkedIn warm-up {self.status}: {steps}")
+
+    def _resolve_binaries(self):
+        self.binaries = resolve_browser_binaries()
+
+    def _start_workers(self):
+        self.pool.start()
+        if not self.pool.wait_ready(self.timeout):
+            raise TimeoutError(f"Workers still warming up after {self.timeout:.0f}s")
+
+    def stats(self):
+        stats = {
+            "enabled": self.enabled,
+            "status": self.status,
+            "ready": self.ready,
+            "timings": self.timings,
+        }
+        if self.binaries:
+            stats["binaries"] = self.binaries
+        if self.errors:
+            stats["errors"] = self.errors
+        return stats
+
+
+startup_warmup = StartupWarmUp(worker_pool)
+
+
+def scrape_linkedin_profile(
+    applicant_id: str,
+    profile_url: str,
+    email: str = None,
+    password: str = None,
+    email_password: str = None,
+    enable_email_verification: bool = True,
+    sections: Optional[List[str]] = None,
+) -> Dict:
+    """
+    Scrape a profile through scrape_jobs, blocking until it finishes.
+
+    Each attempt runs in a fresh browser session; after a CAPTCHA the session
+    is closed and the next attempt is scheduled with jittered back-off, up to
+    LINKEDIN_MAX_ATTEMPTS attempts.
+    """
+    # Validate required parameters
+    if not profile_url:
+        raise ValueError("LinkedIn profile URL is required")
+
+    if not applicant_id:
+        raise ValueError("Applicant ID is required")
+
+    job = scrape_jobs.submit(
+        applicant_id=applicant_id,
+        profile_url=profile_url,
+        email=email,
+        password=password,
+        email_password=email_password,
+        enable_email_verification=enable_email_verification,
+        sections=resolve_profile_sections(sections),
+    )
+    job.wait()
+    if job.status == "failed":
+        raise Exception(job.error)
+    if job.status == "cancelled":
+        raise Exception("LinkedIn scrape was cancelled")
+    return job.result
 
 
 # Example usage:
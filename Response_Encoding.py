@@ -0,0 +1,116 @@
+import gzip
+import json
+import os
+from fastapi.responses import Response
+import msgpack
+
+# orjson and zstandard are optional: without them responses fall back to the
+# standard json encoder and gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
+def dumps(payload):
+    """Serialize a payload to JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def _accepted(header):
+    """Parse an Accept or Accept-Encoding header into {value: quality}"""
+    accepted = {}
+    for part in (header or "").split(","):
+        value, _, params = part.strip().partition(";")
+        if not value:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, q = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(q)
+                except ValueError:
+                    quality = 0.0
+        accepted[value.strip().lower()] = quality
+    return accepted
+
+
+def _content_encoding(accept_encoding):
+    """Pick zstd or gzip from an Accept-Encoding header, None for identity"""
+    accepted = _accepted(accept_encoding)
+    candidates = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    scored = [
+        (accepted.get(encoding, accepted.get("*", 0.0)), -rank, encoding)
+        for rank, encoding in enumerate(candidates)
+    ]
+    quality, _, encoding = max(scored)
+    return encoding if quality > 0 else None
+
+
+def _compress(body, encoding):
+    if encoding == "zstd":
+        level = int(os.getenv("RESPONSE_ZSTD_LEVEL", "3"))
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    level = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    return gzip.compress(body, compresslevel=level)
+
+
+def encode_response(payload, accept=None, accept_encoding=None):
+    """
+    Serialize a payload for a client, negotiating the format and compression.
+
+    MessagePack is used when the client accepts application/x-msgpack, JSON
+    otherwise. Bodies of at least RESPONSE_COMPRESS_MIN_BYTES are compressed
+    with zstd or gzip when the client accepts them.
+
+    Args:
+        payload: JSON-compatible response body
+        accept (str): Accept request header
+        accept_encoding (str): Accept-Encoding request header
+
+    Returns:
+        tuple: (body bytes, media type, extra response headers)
+    """
+    if _accepted(accept).get(MSGPACK_MEDIA_TYPE, 0.0) > 0:
+        body = msgpack.packb(payload, use_bin_type=True)
+        media_type = MSGPACK_MEDIA_TYPE
+    else:
+        body = dumps(payload)
+        media_type = "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    min_bytes = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+    encoding = _content_encoding(accept_encoding) if len(body) >= min_bytes else None
+    if encoding:
+        body = _compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return body, media_type, headers
+
+
+def negotiated_response(payload, request, status_code=200):
+    """
+    Build a Response for a payload that is already in its final shape.
+
+    The payload is serialized once, directly from the scraper's dicts, instead
+    of being validated into a model and re-encoded by the response_model.
+    """
+    body, media_type, headers = encode_response(
+        payload,
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding"),
+    )
+    return Response(
+        body, status_code=status_code, media_type=media_type, headers=headers
+    )
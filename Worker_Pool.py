@@ -0,0 +1,482 @@
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from Job_Scheduler import CancellationToken, JobCancelled
+
+
+class WorkerCrashed(Exception):
+    """The worker process running a job died or had to be killed"""
+
+
+class JobTimeout(WorkerCrashed):
+    """A job ran past LINKEDIN_JOB_TIMEOUT and its worker was killed"""
+
+
+# In a worker process, its connection to the pool in the API process
+_parent = None
+_parent_send_lock = threading.Lock()
+_parent_call_lock = threading.Lock()
+_call_ids = itertools.count()
+
+
+def in_worker():
+    """Whether this is a worker process started by a WorkerPool"""
+    return _parent is not None
+
+
+def _send_parent(message):
+    with _parent_send_lock:
+        _parent.send(message)
+
+
+def call_parent(service, cancel=None, **kwargs):
+    """
+    Run one of the pool's `services` in the API process and return its result.
+
+    Used by workers for state that must have a single owner across the pool,
+    such as a mailbox listener. Calls from one worker run one at a time.
+
+    Raises:
+        JobCancelled: `cancel` was cancelled while waiting, or the service
+            was cancelled with the job
+        Exception: Whatever the service raised
+    """
+    with _parent_call_lock:
+        call_id = next(_call_ids)
+        _send_parent(("call", (call_id, service, kwargs)))
+        while True:
+            if cancel:
+                cancel.check()
+            # Wake up every second to notice a cancelled job
+            if not _parent.poll(1):
+                continue
+            message = _parent.recv()
+            if not isinstance(message, tuple):
+                raise WorkerCrashed(f"Unexpected message while calling {service}")
+            reply_id, ok, value = message
+            if reply_id != call_id:
+                continue  # Late reply to a call given up on
+            if ok:
+                return value
+            raise value
+
+
+def _worker_main(connection, cancel_event, target, warm, cleanup, slot, max_jobs):
+    """Run jobs received over `connection` until recycled or told to stop"""
+    global _parent
+    _parent = connection
+    if hasattr(os, "setsid"):
+        # Lead a process group, so the worker can be killed with its browsers
+        os.setsid()
+
+    def progress(step):
+        _send_parent(("progress", step))
+
+    # Set by the pool to cancel the running job
+    cancel = CancellationToken(cancel_event)
+
+    try:
+        if warm:
+            try:
+                warm(slot=slot, cancel=cancel)
+            except (Exception, JobCancelled) as e:
+                print(f"⚠️ Worker {os.getpid()} warm-up failed: {str(e)}")
+        # The pool sends no job before this
+        _send_parent(("ready", None))
+
+        jobs = 0
+        while jobs < max_jobs:
+            try:
+                kwargs = connection.recv()
+            except EOFError:
+                return
+            if kwargs is None:
+                return
+            if isinstance(kwargs, tuple):
+                continue  # Late reply to a call given up on
+            jobs += 1
+            try:
+                result = target(progress=progress, cancel=cancel, **kwargs)
+                _send_parent(("result", result))
+            except JobCancelled:
+                _send_parent(("cancelled", None))
+            except Exception as e:
+                _send_parent(("error", _picklable(e)))
+    finally:
+        if cleanup:
+            try:
+                cleanup()
+            except Exception as e:
+                print(f"⚠️ Worker {os.getpid()} cleanup failed: {str(e)}")
+
+
+def _picklable(error):
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return Exception(str(error))
+
+
+class _Worker:
+    def __init__(self, context, target, warm, cleanup, slot, max_jobs):
+        self.slot = slot
+        self.connection, child = context.Pipe()
+        self.cancel_event = context.Event()
+        self.ready = threading.Event()  # Set once the worker has warmed up
+        self.send_lock = threading.Lock()  # Service replies come from threads
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child, self.cancel_event, target, warm, cleanup, slot, max_jobs),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.jobs_done = 0
+        self.started_at = time.time()
+
+    def kill(self):
+        """Kill the worker and everything it started"""
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass  # Not a group leader yet, or already gone
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(5)
+        self.connection.close()
+
+    def send(self, message):
+        with self.send_lock:
+            self.connection.send(message)
+
+    def stop(self):
+        """Ask an idle worker to exit, killing it if it does not"""
+        try:
+            self.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.connection.close()
+
+
+class WorkerPool:
+    """
+    Supervised pool of worker processes that each run one job at a time.
+
+    Jobs are sent to an idle worker over a pipe and its progress and result
+    are relayed back, so browsers live and die outside the API process. A job
+    running past LINKEDIN_JOB_TIMEOUT gets its worker killed with its whole
+    process group, and a worker is replaced after LINKEDIN_WORKER_MAX_JOBS
+    jobs to shed anything it leaked. A cancelled job is asked to stop, and
+    its worker is killed if it has not within LINKEDIN_CANCEL_GRACE seconds.
+    Set LINKEDIN_PROCESS_WORKERS=false to run jobs in the calling thread
+    instead.
+
+    Workers are spawned by start(), or by the first job. Each one runs `warm`
+    and is only given jobs once it is done, so warming never counts against
+    a job's timeout. A replacement warms up in its predecessor's slot.
+
+    Workers reach `services` through call_parent(). Each call runs in a thread
+    of the API process with the job's cancellation token, so state such as
+    connections can be shared by every worker instead of duplicated.
+
+    Args:
+        target: Module-level callable taking a job's kwargs and `progress`
+        size (int): Worker processes, defaults to LINKEDIN_WORKERS
+        warm: Optional module-level callable taking the worker's `slot`
+            (0 to size - 1) and `cancel`, run once per worker
+        cleanup: Optional module-level callable run by a worker as it exits,
+            or by shutdown() without worker processes
+        services (dict): Callables by name, run in the API process for
+            call_parent() and taking its kwargs and `cancel`
+    """
+
+    # Seconds before replacing a worker that died while warming up
+    RESPAWN_DELAY = 5
+
+    def __init__(self, target, size=None, warm=None, cleanup=None, services=None):
+        self.target = target
+        self.warm = warm
+        self.cleanup = cleanup
+        self.services = services or {}
+        self.size = size or int(os.getenv("LINKEDIN_WORKERS", "2"))
+        self.isolated = os.getenv("LINKEDIN_PROCESS_WORKERS", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.job_timeout = float(os.getenv("LINKEDIN_JOB_TIMEOUT", "600"))
+        self.max_jobs = int(os.getenv("LINKEDIN_WORKER_MAX_JOBS", "20"))
+        self.cancel_grace = float(os.getenv("LINKEDIN_CANCEL_GRACE", "10"))
+        # Fresh interpreters: forking a threaded server process is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._closing = threading.Event()  # Set with _closed, to cut waits short
+        self._recycle = set()  # pids to replace once their job is done
+        self.respawns = 0
+        self.timeouts = 0
+        self.crashes = 0
+
+    def run(self, progress=None, cancel=None, **kwargs):
+        """
+        Run one job on a worker process, blocking until it finishes.
+
+        Raises:
+            JobCancelled: The job stopped after being cancelled
+            JobTimeout: The job ran too long and its worker was killed
+            WorkerCrashed: The worker died, or was killed after a cancel
+            Exception: Whatever the job itself raised
+        """
+        if not self.isolated:
+            return self.target(progress=progress, cancel=cancel, **kwargs)
+
+        worker = self._acquire(cancel)
+        try:
+            kind, value = self._exchange(worker, kwargs, progress, cancel)
+        except WorkerCrashed:
+            self._replace(worker, kill=True)
+            raise
+
+        worker.jobs_done += 1
+        if worker.jobs_done >= self.max_jobs or worker.process.pid in self._recycle:
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+
+        if kind == "cancelled":
+            raise JobCancelled("Job cancelled")
+        if kind == "error":
+            raise value
+        return value
+
+    def _exchange(self, worker, kwargs, progress, cancel):
+        deadline = time.time() + self.job_timeout
+        try:
+            worker.cancel_event.clear()
+            worker.send(kwargs)
+            while True:
+                if cancel and cancel.cancelled and not worker.cancel_event.is_set():
+                    worker.cancel_event.set()
+                    deadline = min(deadline, time.time() + self.cancel_grace)
+                if time.time() >= deadline:
+                    if worker.cancel_event.is_set():
+                        raise WorkerCrashed(
+                            f"Worker {worker.process.pid} killed, job did not "
+                            f"stop within {self.cancel_grace:.0f}s of cancel"
+                        )
+                    self.timeouts += 1
+                    raise JobTimeout(
+                        f"Job exceeded {self.job_timeout:.0f}s, worker "
+                        f"{worker.process.pid} killed"
+                    )
+                if not worker.connection.poll(min(1.0, deadline - time.time())):
+                    if not worker.process.is_alive():
+                        raise EOFError
+                    continue
+                kind, value = worker.connection.recv()
+                if kind == "progress":
+                    if progress:
+                        progress(value)
+                    continue
+                if kind == "call":
+                    self._serve(worker, value, cancel)
+                    continue
+                return kind, value
+        except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
+            self.crashes += 1
+            worker.process.join(1)
+            raise WorkerCrashed(
+                f"Worker {worker.process.pid} exited with code "
+                f"{worker.process.exitcode} while running a job"
+            )
+
+    def start(self):
+        """
+        Spawn the workers ahead of the first job. Without worker processes,
+        run the warm-up of every slot in the calling thread instead.
+        """
+        with self._lock:
+            if self._closed:
+                raise WorkerCrashed("Worker pool is shut down")
+            if self._started:
+                return
+            self._started = True
+            if self.isolated:
+                for slot in range(self.size):
+                    self._spawn(slot)
+                return
+        if self.warm:
+            for slot in range(self.size):
+                try:
+                    self.warm(slot=slot, cancel=CancellationToken())
+                except Exception as e:
+                    print(f"⚠️ Warm-up of slot {slot} failed: {str(e)}")
+
+    def wait_ready(self, timeout=None):
+        """Block until every worker has warmed up, returning whether they did"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            remaining = None if deadline is None else max(deadline - time.time(), 0)
+            if not worker.ready.wait(remaining):
+                return False
+        return True
+
+    def _acquire(self, cancel=None):
+        """Take an idle worker, waiting while they are busy or warming up"""
+        self.start()
+        while True:
+            if self._closing.is_set():
+                raise WorkerCrashed("Worker pool is shut down")
+            if cancel and cancel.cancelled:
+                raise JobCancelled("Job cancelled")
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def _spawn(self, slot):
+        worker = _Worker(
+            self._context, self.target, self.warm, self.cleanup, slot, self.max_jobs
+        )
+        self._workers.add(worker)
+        threading.Thread(
+            target=self._await_warm_up,
+            args=(worker,),
+            name=f"worker-warm-up-{slot}",
+            daemon=True,
+        ).start()
+
+    def _await_warm_up(self, worker):
+        """Hand a new worker to jobs once it reports that it has warmed up"""
+        deadline = time.time() + self.job_timeout
+        try:
+            while time.time() < deadline:
+                if not worker.connection.poll(1):
+                    if not worker.process.is_alive():
+                        raise EOFError
+                    continue
+                kind, value = worker.connection.recv()
+                if kind == "call":
+                    self._serve(worker, value, None)
+                    continue
+                if kind == "ready":
+                    worker.ready.set()
+                    self._idle.put(worker)
+                    return
+            print(
+                f"⚠️ Worker {worker.process.pid} did not warm up within "
+                f"{self.job_timeout:.0f}s"
+            )
+            self.timeouts += 1
+        except (EOFError, OSError):
+            if self._closed:
+                return
+            print(f"⚠️ Worker {worker.process.pid} died while warming up")
+            self.crashes += 1
+        # Do not respawn in a tight loop if every warm-up fails
+        self._closing.wait(self.RESPAWN_DELAY)
+        self._replace(worker, kill=True)
+
+    def _serve(self, worker, call, cancel):
+        """Answer a worker's call_parent() from a thread, not to stall its job"""
+        call_id, service, kwargs = call
+
+        def answer():
+            try:
+                if service not in self.services:
+                    raise KeyError(f"Unknown worker pool service {service}")
+                reply = (call_id, True, self.services[service](cancel=cancel, **kwargs))
+            except (Exception, JobCancelled) as e:
+                reply = (call_id, False, _picklable(e))
+            try:
+                worker.send(reply)
+            except (BrokenPipeError, OSError):
+                pass  # The worker is gone
+
+        threading.Thread(
+            target=answer, name=f"worker-service-{service}", daemon=True
+        ).start()
+
+    def recycle(self, pid):
+        """
+        Replace the worker with this pid once its current job is done.
+
+        Returns:
+            bool: Whether pid is a worker not already due for recycling
+        """
+        with self._lock:
+            if pid in self._recycle or not any(
+                worker.process.pid == pid for worker in self._workers
+            ):
+                return False
+            self._recycle.add(pid)
+            return True
+
+    def _replace(self, worker, kill=False):
+        """Retire a worker and start its replacement"""
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        with self._lock:
+            self._workers.discard(worker)
+            self._recycle.discard(worker.process.pid)
+            if not self._closed:
+                self.respawns += 1
+                self._spawn(worker.slot)
+
+    def stats(self):
+        with self._lock:
+            workers = [
+                {
+                    "pid": worker.process.pid,
+                    "alive": worker.process.is_alive(),
+                    "ready": worker.ready.is_set(),
+                    "jobs_done": worker.jobs_done,
+                    "uptime": round(time.time() - worker.started_at, 1),
+                }
+                for worker in self._workers
+            ]
+        return {
+            "isolated": self.isolated,
+            "started": self._started,
+            "workers": workers,
+            "idle": self._idle.qsize(),
+            "respawns": self.respawns,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+        }
+
+    def shutdown(self):
+        """Stop idle workers and kill busy ones, failing their jobs"""
+        with self._lock:
+            self._closed = True
+            self._closing.set()
+            workers = list(self._workers)
+            self._workers.clear()
+        if not self.isolated and self.cleanup:
+            self.cleanup()
+        idle = set()
+        while not self._idle.empty():
+            idle.add(self._idle.get_nowait())
+        for worker in workers:
+            if worker in idle:
+                worker.stop()
+            else:
+                worker.kill()
@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, Union
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, Dict, Any, Union, List
 import os
 from dotenv import load_dotenv
 import sys
+import time
 import traceback
 
 # Add current directory to path for imports
@@ -12,14 +16,41 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import scrapers (flattened structure)
 import Github_Scraper
 import LinkedIn_Scraper
+import Response_Encoding
+from Circuit_Breaker import CircuitOpenError
 
 # Load environment variables
 load_dotenv()
 
+# Seconds between checks of a LinkedIn job's progress
+JOB_POLL_INTERVAL = 0.5
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm shared clients at startup and release them at shutdown"""
+    await Github_Scraper.warm_http_client()
+    LinkedIn_Scraper.browser_watchdog.start()
+    # In the background: /linkedin/health answers 503 until it is done
+    LinkedIn_Scraper.startup_warmup.start()
+    yield
+    await Github_Scraper.get_batcher().aclose()
+    await Github_Scraper.aclose_http_client()
+    Github_Scraper.close_http_client()
+    Github_Scraper.readme_store.flush()
+    # Killing the workers first fails their jobs instead of waiting them out
+    LinkedIn_Scraper.worker_pool.shutdown()
+    LinkedIn_Scraper.scrape_jobs.shutdown()
+    LinkedIn_Scraper.close_email_handlers()
+    # Last, so its final scan reaps browsers the workers left behind
+    LinkedIn_Scraper.browser_watchdog.stop()
+
+
 app = FastAPI(
     title="Unified Scraper Service",
     version="1.0.0",
     description="Combined GitHub and LinkedIn scraper service with separate endpoints",
+    lifespan=lifespan,
 )
 
 
@@ -27,6 +58,48 @@ app = FastAPI(
 class GitHubScrapeRequest(BaseModel):
     applicant_id: str
     github_url: str
+    fields: Optional[List[str]] = (
+        None  # Repository fields to fetch, defaults if omitted
+    )
+    # Repository cap, GITHUB_MAX_REPOS if omitted
+    max_repos: Optional[int] = Field(None, ge=1)
+    stream: Optional[bool] = False  # Stream NDJSON events page by page
+    # Fetch expensive repository fields only for the top N repositories
+    detail_top_n: Optional[int] = Field(None, ge=1, le=100)
+    detail_order: Optional[str] = None  # "stars" (default) or "recency"
+    # Refetch only repositories updated since the last snapshot of this user
+    incremental: Optional[bool] = False
+    # Add daily contributions for this many calendar years, ending with the current one
+    history_years: Optional[int] = Field(None, ge=1, le=20)
+    # "records" (default) or "columnar": one array per repository field
+    format: Optional[str] = "records"
+
+    @field_validator("fields")
+    @classmethod
+    def validate_fields(cls, fields):
+        return Github_Scraper.resolve_repository_fields(fields) if fields else None
+
+    @field_validator("format")
+    @classmethod
+    def validate_format(cls, format):
+        if format and format not in Github_Scraper.RESPONSE_FORMATS:
+            raise ValueError(
+                f"format must be one of: {', '.join(Github_Scraper.RESPONSE_FORMATS)}"
+            )
+        return format or "records"
+
+    @field_validator("detail_order")
+    @classmethod
+    def validate_detail_order(cls, detail_order):
+        if detail_order and detail_order not in Github_Scraper.DETAIL_ORDERS:
+            raise ValueError(
+                f"detail_order must be one of: {', '.join(Github_Scraper.DETAIL_ORDERS)}"
+            )
+        return detail_order
+
+
+class GitHubBatchScrapeRequest(BaseModel):
+    profiles: List[GitHubScrapeRequest]
 
 
 class LinkedInScrapeRequest(BaseModel):
@@ -36,6 +109,12 @@ class LinkedInScrapeRequest(BaseModel):
     password: Optional[str] = None
     email_password: Optional[str] = None
     enable_email_verification: Optional[bool] = True
+    sections: Optional[List[str]] = None  # Profile sections to scrape, all if omitted
+
+    @field_validator("sections")
+    @classmethod
+    def validate_sections(cls, sections):
+        return LinkedIn_Scraper.resolve_profile_sections(sections) if sections else None
 
 
 # Response Models
@@ -43,6 +122,8 @@ class GitHubScrapeResponse(BaseModel):
     id: str
     source: str
     data: list
+    query_cost: Optional[Dict[str, Any]] = None
+    refresh: Optional[Dict[str, Any]] = None  # Set on incremental refreshes
 
 
 class LinkedInScrapeResponse(BaseModel):
@@ -68,6 +149,7 @@ async def health_check():
             "github_health": "/github/health",
             "linkedin_health": "/linkedin/health",
             "github_scrape": "/github/scrape",
+            "github_batch_scrape": "/github/scrape/batch",
             "linkedin_scrape": "/linkedin/scrape",
         },
     )
@@ -76,23 +158,42 @@ async def health_check():
 @app.get("/github/health")
 async def github_health_check():
     """GitHub scraper health check"""
-    token = os.getenv("GITHUB_TOKEN")
+    token_pool = Github_Scraper.get_token_pool()
     return {
-        "status": "healthy" if token else "configuration_error",
+        "status": "healthy" if token_pool.tokens else "configuration_error",
         "service": "github-scraper",
-        "token_configured": bool(token),
+        "token_configured": bool(token_pool.tokens),
+        "rate_limit": token_pool.stats(),
+        "http_pool": Github_Scraper.get_http_client_stats(),
+        "batching": {
+            "enabled": os.getenv("GITHUB_BATCHING", "false").lower()
+            in ("1", "true", "yes"),
+            **Github_Scraper.get_batcher().stats,
+        },
     }
 
 
 @app.get("/linkedin/health")
 async def linkedin_health_check():
-    """LinkedIn scraper health check"""
+    """
+    LinkedIn scraper health check, answering 503 until the startup warm-up
+    is done so load balancers only route scrapes to a warm instance
+    """
     email = os.getenv("LINKEDIN_EMAIL")
     password = os.getenv("LINKEDIN_PASSWORD")
     email_password = os.getenv("EMAIL_PASSWORD") or os.getenv("EMAIL_APP_PASSWORD")
-
-    return {
-        "status": "healthy" if (email and password) else "configuration_error",
+    warmup = LinkedIn_Scraper.startup_warmup
+
+    if not warmup.ready:
+        status = "warming"
+    elif email and password:
+        status = "healthy"
+    else:
+        status = "configuration_error"
+
+    health = {
+        "status": status,
+        "ready": warmup.ready,
         "service": "linkedin-scraper",
         "credentials_configured": bool(email and password),
         "email_verification_available": bool(email_password),
@@ -101,31 +202,111 @@ async def linkedin_health_check():
             "automatic_email_verification": bool(email_password),
             "manual_verification_fallback": True,
         },
+        "email_handlers": LinkedIn_Scraper.get_email_handler_stats(),
+        "jobs": LinkedIn_Scraper.scrape_jobs.stats(),
+        "workers": LinkedIn_Scraper.worker_pool.stats(),
+        "browsers": LinkedIn_Scraper.browser_watchdog.stats(),
+        "warmup": warmup.stats(),
     }
+    return JSONResponse(health, status_code=200 if warmup.ready else 503)
+
+
+def _github_payload(result):
+    """Project a scrape result onto the GitHubScrapeResponse shape"""
+    return {field: result.get(field) for field in GitHubScrapeResponse.model_fields}
+
+
+def _github_response(result, http_request):
+    """
+    Encode a scrape result for the client. The scraper's dicts are serialized
+    once, without being validated into the model and encoded again by
+    response_model, which is kept for the API docs.
+    """
+    return Response_Encoding.negotiated_response(_github_payload(result), http_request)
 
 
 # GitHub Scraper Routes
 @app.post("/github/scrape", response_model=GitHubScrapeResponse)
-async def scrape_github_profile(request: GitHubScrapeRequest):
+async def scrape_github_profile(request: GitHubScrapeRequest, http_request: Request):
     """
     Scrape GitHub profile data for a given applicant
     """
     try:
         # Validate that GitHub token is available
-        token = os.getenv("GITHUB_TOKEN")
-        if not token:
+        if not Github_Scraper.get_token_pool().tokens:
             raise HTTPException(
                 status_code=500,
-                detail="GitHub token not configured. Please set GITHUB_TOKEN environment variable.",
+                detail="GitHub token not configured. Please set GITHUB_TOKEN or GITHUB_TOKENS environment variable.",
             )
 
-        # Call the scraper function
-        result = Github_Scraper.scrape_github_profile(
-            request.applicant_id, request.github_url
-        )
+        if request.stream and request.format == "columnar":
+            raise HTTPException(
+                status_code=400, detail="stream cannot be combined with format"
+            )
 
-        return GitHubScrapeResponse(**result)
+        if request.incremental:
+            if request.stream or request.detail_top_n is not None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="incremental cannot be combined with stream or detail_top_n",
+                )
+            # Incremental refreshes depend on per-user snapshots, so never batch them
+            result = await Github_Scraper.scrape_github_profile_async(
+                request.applicant_id,
+                request.github_url,
+                request.fields,
+                request.max_repos,
+                incremental=True,
+                history_years=request.history_years,
+                response_format=request.format,
+            )
+            return _github_response(result, http_request)
+
+        # Stream one JSON line per event instead of building the whole payload
+        if request.stream:
+            events = Github_Scraper.stream_github_profile_async(
+                request.applicant_id,
+                request.github_url,
+                request.fields,
+                request.max_repos,
+                request.detail_top_n,
+                request.detail_order,
+                request.history_years,
+            )
+            return StreamingResponse(
+                (Response_Encoding.dumps(event) + b"\n" async for event in events),
+                media_type="application/x-ndjson",
+            )
+
+        # Call the scraper function, coalescing concurrent scrapes if enabled.
+        # History queries are per user and batches share one record format,
+        # so those scrapes are never batched.
+        batching = os.getenv("GITHUB_BATCHING", "false").lower() in ("1", "true", "yes")
+        if batching and not request.history_years and request.format == "records":
+            result = await Github_Scraper.get_batcher().scrape(
+                request.applicant_id,
+                request.github_url,
+                request.fields,
+                request.max_repos,
+                request.detail_top_n,
+                request.detail_order,
+            )
+        else:
+            result = await Github_Scraper.scrape_github_profile_async(
+                request.applicant_id,
+                request.github_url,
+                request.fields,
+                request.max_repos,
+                request.detail_top_n,
+                request.detail_order,
+                history_years=request.history_years,
+                response_format=request.format,
+            )
+
+        return _github_response(result, http_request)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"GitHub scraping error: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
@@ -134,35 +315,154 @@ async def scrape_github_profile(request: GitHubScrapeRequest):
         )
 
 
-# LinkedIn Scraper Routes
-@app.post("/linkedin/scrape", response_model=LinkedInScrapeResponse)
-async def scrape_linkedin_profile(request: LinkedInScrapeRequest):
+def _scrape_batch_profile(profile: GitHubScrapeRequest):
+    """Scrape one profile of a batch request, coalescing it where possible"""
+    # Incremental refreshes depend on per-user snapshots, history queries are
+    # per user and batches share one record format, so those are never batched
+    if profile.incremental or profile.history_years or profile.format != "records":
+        return Github_Scraper.scrape_github_profile_async(
+            profile.applicant_id,
+            profile.github_url,
+            profile.fields,
+            profile.max_repos,
+            profile.detail_top_n,
+            profile.detail_order,
+            incremental=profile.incremental,
+            history_years=profile.history_years,
+            response_format=profile.format,
+        )
+    return Github_Scraper.get_batcher().scrape(
+        profile.applicant_id,
+        profile.github_url,
+        profile.fields,
+        profile.max_repos,
+        profile.detail_top_n,
+        profile.detail_order,
+    )
+
+
+@app.post("/github/scrape/batch", response_model=List[GitHubScrapeResponse])
+async def scrape_github_profiles(
+    request: GitHubBatchScrapeRequest, http_request: Request
+):
     """
-    Scrape LinkedIn profile data for a given applicant
+    Scrape several GitHub profiles, resolving them with aliased multi-user queries
     """
     try:
-        # Use provided credentials or fall back to environment variables
-        email = request.email or os.getenv("LINKEDIN_EMAIL")
-        password = request.password or os.getenv("LINKEDIN_PASSWORD")
-
-        if not email or not password:
+        if not Github_Scraper.get_token_pool().tokens:
             raise HTTPException(
                 status_code=500,
-                detail="LinkedIn credentials not configured. Please provide email/password or set LINKEDIN_EMAIL/LINKEDIN_PASSWORD environment variables.",
+                detail="GitHub token not configured. Please set GITHUB_TOKEN or GITHUB_TOKENS environment variable.",
             )
-        print(request)
-        # Call the scraper function with email verification support
-        result = LinkedIn_Scraper.scrape_linkedin_profile(
-            applicant_id=request.applicant_id,
-            profile_url=request.linkedin_url,
-            email=email,
-            password=password,
-            email_password=request.email_password,
-            enable_email_verification=request.enable_email_verification,
+
+        if any(
+            profile.incremental and profile.detail_top_n is not None
+            for profile in request.profiles
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail="incremental cannot be combined with detail_top_n",
+            )
+
+        results = await asyncio.gather(
+            *(_scrape_batch_profile(profile) for profile in request.profiles)
         )
 
-        return LinkedInScrapeResponse(**result)
+        return Response_Encoding.negotiated_response(
+            [_github_payload(result) for result in results], http_request
+        )
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"GitHub batch scraping error: {str(e)}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500, detail=f"Error scraping GitHub profiles: {str(e)}"
+        )
+
+
+@app.get("/github/readme/{readme_hash}", response_class=PlainTextResponse)
+async def get_github_readme(readme_hash: str):
+    """
+    Return the full README stored under a hash from a scrape response
+    """
+    text = await asyncio.to_thread(Github_Scraper.readme_store.get, readme_hash)
+    if text is None:
+        raise HTTPException(status_code=404, detail="README not found")
+    return text
+
+
+# LinkedIn Scraper Routes
+def _linkedin_job_kwargs(request: LinkedInScrapeRequest):
+    """Resolve credentials for a LinkedIn scrape job"""
+    # Use provided credentials or fall back to environment variables
+    email = request.email or os.getenv("LINKEDIN_EMAIL")
+    password = request.password or os.getenv("LINKEDIN_PASSWORD")
+
+    if not email or not password:
+        raise HTTPException(
+            status_code=500,
+            detail="LinkedIn credentials not configured. Please provide email/password or set LINKEDIN_EMAIL/LINKEDIN_PASSWORD environment variables.",
+        )
+
+    return {
+        "applicant_id": request.applicant_id,
+        "profile_url": request.linkedin_url,
+        "email": email,
+        "password": password,
+        "email_password": request.email_password,
+        "enable_email_verification": request.enable_email_verification,
+        "sections": request.sections,
+    }
+
+
+def _submit_linkedin_job(request: LinkedInScrapeRequest):
+    """Queue a LinkedIn scrape, answering 503 while logins are suspended"""
+    kwargs = _linkedin_job_kwargs(request)
+    try:
+        return LinkedIn_Scraper.scrape_jobs.submit(**kwargs)
+    except CircuitOpenError as e:
+        retry_after = max(int(e.retry_at - time.time()), 1)
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(retry_after)}
+        )
+
+
+def _get_job(job_id: str):
+    job = LinkedIn_Scraper.scrape_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/linkedin/scrape", response_model=LinkedInScrapeResponse)
+async def scrape_linkedin_profile(
+    request: LinkedInScrapeRequest, http_request: Request
+):
+    """
+    Scrape LinkedIn profile data for a given applicant
+    """
+    try:
+        print(request)
+        # Runs on the scheduler's workers; CAPTCHA retries are queued there
+        job = _submit_linkedin_job(request)
+        while not job.done:
+            if await http_request.is_disconnected():
+                # Nobody is waiting for the result: free the browser now
+                print(f"🔌 Client disconnected, cancelling job {job.id}")
+                LinkedIn_Scraper.scrape_jobs.cancel(job.id)
+                raise HTTPException(status_code=499, detail="Client disconnected")
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+        if job.status == "cancelled":
+            raise HTTPException(status_code=409, detail="LinkedIn scrape was cancelled")
+        if job.status == "failed":
+            raise Exception(job.error)
+        return LinkedInScrapeResponse(**job.result)
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"LinkedIn scraping error: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
@@ -171,17 +471,70 @@ async def scrape_linkedin_profile(request: LinkedInScrapeRequest):
         )
 
 
+@app.post("/linkedin/jobs", status_code=202)
+async def submit_linkedin_job(request: LinkedInScrapeRequest):
+    """
+    Queue a LinkedIn scrape and return its job immediately. Poll it at
+    /jobs/{id} or follow its progress at /jobs/{id}/events.
+    """
+    job = _submit_linkedin_job(request)
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a scrape job, with its result once it has succeeded"""
+    return _get_job(job_id).to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a scrape job. A waiting job is dropped at once; a running one stops
+    at its next step or wait and closes its browser.
+    """
+    job = _get_job(job_id)
+    if job.done:
+        raise HTTPException(
+            status_code=409, detail=f"Job already finished with status {job.status}"
+        )
+    return LinkedIn_Scraper.scrape_jobs.cancel(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream a job's progress events as NDJSON until it finishes; the last line
+    is the finished job itself.
+    """
+    job = _get_job(job_id)
+
+    async def events():
+        sent = 0
+        while True:
+            done = job.done
+            for event in job.events[sent:]:
+                yield Response_Encoding.dumps(event) + b"\n"
+                sent += 1
+            if done:
+                yield Response_Encoding.dumps(job.to_dict()) + b"\n"
+                return
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 # Legacy Routes (for backward compatibility)
 @app.post("/scrape/github", response_model=GitHubScrapeResponse)
-async def legacy_github_scrape(request: GitHubScrapeRequest):
+async def legacy_github_scrape(request: GitHubScrapeRequest, http_request: Request):
     """Legacy GitHub scrape endpoint for backward compatibility"""
-    return await scrape_github_profile(request)
+    return await scrape_github_profile(request, http_request)
 
 
 @app.post("/scrape/linkedin", response_model=LinkedInScrapeResponse)
-async def legacy_linkedin_scrape(request: LinkedInScrapeRequest):
+async def legacy_linkedin_scrape(request: LinkedInScrapeRequest, http_request: Request):
     """Legacy LinkedIn scrape endpoint for backward compatibility"""
-    return await scrape_linkedin_profile(request)
+    return await scrape_linkedin_profile(request, http_request)
 
 
 # Root endpoint
@@ -195,8 +548,22 @@ async def root():
         "platform": "Render",
         "endpoints": {
             "health": "/health",
-            "github": {"health": "/github/health", "scrape": "/github/scrape"},
-            "linkedin": {"health": "/linkedin/health", "scrape": "/linkedin/scrape"},
+            "github": {
+                "health": "/github/health",
+                "scrape": "/github/scrape",
+                "batch_scrape": "/github/scrape/batch",
+                "readme": "/github/readme/{hash}",
+            },
+            "linkedin": {
+                "health": "/linkedin/health",
+                "scrape": "/linkedin/scrape",
+                "jobs": "/linkedin/jobs",
+            },
+            "jobs": {
+                "status": "/jobs/{id}",
+                "events": "/jobs/{id}/events",
+                "cancel": "DELETE /jobs/{id}",
+            },
             "docs": "/docs",
             "redoc": "/redoc",
         },
@@ -0,0 +1,162 @@
+"""
+Compare the previous verification code search against the current one on a
+busy mailbox served by a local IMAP stand-in.
+
+The previous search ran six separate SEARCH commands with no date bound and
+downloaded up to ten full messages per search just to read their Date
+header. The current one runs one OR search bounded by SINCE and a UID
+watermark and downloads the newest match, which is usually the code email.
+Without a code there, it fetches the headers of the other candidates in one
+command and downloads a body only for recent LinkedIn emails.
+
+Run from the repository root:
+
+    python benchmarks/bench_imap_search.py --messages 3000 --latency-ms 20
+"""
+
+import argparse
+import email
+import email.utils
+import imaplib
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import LinkedIn_Scraper
+from fake_imap import FakeIMAPServer, build_message
+
+LEGACY_CRITERIA = [
+    'FROM "linkedin"',
+    'FROM "noreply@linkedin.com"',
+    'FROM "security@linkedin.com"',
+    'SUBJECT "verification"',
+    'SUBJECT "code"',
+    'SUBJECT "security"',
+]
+LEGACY_PATTERNS = [
+    r"verification code[:\s]+(\d{4,8})",
+    r"code[:\s]+(\d{4,8})",
+    r"enter[:\s]+(\d{4,8})",
+    r"(\d{6})",
+    r"(\d{4})",
+    r"security code[:\s]+(\d{4,8})",
+    r"pin[:\s]+(\d{4,8})",
+]
+
+
+def legacy_extract(email_message):
+    if "linkedin" not in email_message.get("From", "").lower():
+        return None
+    body = ""
+    for part in email_message.walk():
+        if part.get_content_type() in ("text/plain", "text/html"):
+            body += part.get_payload(decode=True).decode()
+    for pattern in LEGACY_PATTERNS:
+        for match in re.findall(pattern, body, re.IGNORECASE):
+            if 4 <= len(match) <= 8 and match.isdigit():
+                return match
+    return None
+
+
+def legacy_fetch(connection, max_age_minutes=5):
+    """The search as it was before: six searches, full messages"""
+    connection.select("INBOX")
+    for criteria in LEGACY_CRITERIA:
+        typ, data = connection.search(None, criteria)
+        if not data[0]:
+            continue
+        for email_id in reversed(data[0].split()[-10:]):
+            typ, msg_data = connection.fetch(email_id, "(RFC822)")
+            email_message = email.message_from_bytes(msg_data[0][1])
+            date_tuple = email.utils.parsedate_tz(email_message["Date"])
+            if date_tuple:
+                age_minutes = (time.time() - email.utils.mktime_tz(date_tuple)) / 60
+                if age_minutes > max_age_minutes:
+                    continue
+            code = legacy_extract(email_message)
+            if code:
+                return code
+    return None
+
+
+def fill_mailbox(server, messages):
+    now = time.time()
+    newsletter = "<p>" + "Someone viewed your profile. " * 600 + "</p>"
+    for i in range(messages):
+        date = now - 86400 * (1 + i % 300)
+        if i % 4:
+            sender = "LinkedIn <messages-noreply@linkedin.com>"
+            subject = "You appeared in 12 searches this week"
+        else:
+            sender = "Newsletter <news@example.com>"
+            subject = "Your weekly security digest"
+        server.mailbox.add(build_message(sender, subject, newsletter, date), date)
+
+
+def add_code_email(server):
+    server.mailbox.add(
+        build_message(
+            "LinkedIn <security-noreply@linkedin.com>",
+            "Here's your verification code",
+            "Your verification code: 482913",
+        )
+    )
+
+
+def measure(label, server, search):
+    mailbox = server.mailbox
+    connection = imaplib.IMAP4("127.0.0.1", server.port)
+    connection.login("recruiter@example.com", "password")
+    commands, sent = len(mailbox.commands), mailbox.bytes_sent
+    start = time.perf_counter()
+    code = search(connection)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(
+        f"{label:<10} {elapsed:9.1f} ms  {len(mailbox.commands) - commands:4} commands"
+        f"  {(mailbox.bytes_sent - sent) / 1024:10.1f} KiB  code={code}"
+    )
+    connection.logout()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    server = FakeIMAPServer(latency=args.latency_ms / 1000)
+    fill_mailbox(server, args.messages)
+    print(
+        f"📬 {args.messages} messages, {args.latency_ms:.0f} ms per command round trip"
+    )
+
+    handler = LinkedIn_Scraper.EmailVerificationHandler(
+        "recruiter@example.com", "password", imap_server="127.0.0.1"
+    )
+
+    def current(connection):
+        handler.connection = connection
+        handler._selected = False
+        LinkedIn_Scraper._uid_watermarks.clear()
+        return handler.fetch_linkedin_verification_code()
+
+    print("Code email not delivered yet:")
+    legacy = measure("previous", server, legacy_fetch)
+    new = measure("current", server, current)
+    print(f"{'':<10} {new / legacy:9.0%} of the previous time")
+
+    add_code_email(server)
+    print("Code email delivered:")
+    legacy = measure("previous", server, legacy_fetch)
+    new = measure("current", server, current)
+    print(f"{'':<10} {new / legacy:9.0%} of the previous time")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Compare the cost of serializing a large GitHub scrape response.
+
+The baseline is the previous path: the result is validated into
+GitHubScrapeResponse, validated again by the route's response_model, run
+through jsonable_encoder and encoded with the standard json module. The fast
+path serializes the scraper's dicts once through Response_Encoding.
+
+Run from the repository root:
+
+    python benchmarks/bench_responses.py --repos 100 --readme-kb 8
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import Response_Encoding
+from app import GitHubScrapeResponse, _github_payload
+
+
+def build_result(repos, readme_kb):
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(500)]
+
+    def readme():
+        text = " ".join(rng.choices(words, k=readme_kb * 150))
+        return "# Project\n\n" + text[: readme_kb * 1024]
+
+    records = [
+        {
+            "name": f"repo-{i}",
+            "description": "A repository used to size scrape responses",
+            "url": f"https://github.com/user/repo-{i}",
+            "stars": rng.randint(0, 5000),
+            "forks": rng.randint(0, 500),
+            "watchers": rng.randint(0, 200),
+            "languages": rng.sample(["Python", "Go", "TypeScript", "Rust", "C"], 3),
+            "languages_count": 3,
+            "created_at": "January 01, 2020 at 12:00 AM",
+            "updated_at": "June 01, 2024 at 09:30 AM",
+            "is_fork": False,
+            "topics": ["api", "scraper"],
+            "open_issues": rng.randint(0, 50),
+            "closed_issues": rng.randint(0, 500),
+            "open_pull_requests": rng.randint(0, 20),
+            "merged_pull_requests": rng.randint(0, 300),
+            "has_readme": True,
+            "readme_content": readme(),
+        }
+        for i in range(repos)
+    ]
+    return {
+        "id": "bench",
+        "source": "github",
+        "data": [{"total_contributions": 1234}, records],
+        "query_cost": {"predicted": 7, "actual": 7, "queries": 1},
+    }
+
+
+def baseline(result):
+    model = GitHubScrapeResponse(**result)
+    validated = TypeAdapter(GitHubScrapeResponse).validate_python(model)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False).encode("utf-8")
+
+
+def measure(label, encode, iterations):
+    start = time.process_time()
+    for _ in range(iterations):
+        body = encode()
+    elapsed = (time.process_time() - start) / iterations * 1000
+    print(f"{label:<28} {elapsed:9.2f} ms CPU  {len(body):>10,} bytes")
+    return elapsed, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repos", type=int, default=100)
+    parser.add_argument("--readme-kb", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    result = build_result(args.repos, args.readme_kb)
+    print(f"📦 {args.repos} repositories with {args.readme_kb} KB READMEs")
+    print(f"   orjson: {'yes' if Response_Encoding.orjson else 'no'}")
+    print(f"   zstandard: {'yes' if Response_Encoding.zstandard else 'no'}")
+
+    reference, reference_bytes = measure(
+        "baseline (pydantic + json)", lambda: baseline(result), args.iterations
+    )
+    variants = [
+        ("fast json", None, None),
+        ("fast json + gzip", None, "gzip"),
+        ("fast json + zstd", None, "zstd"),
+        ("fast msgpack", Response_Encoding.MSGPACK_MEDIA_TYPE, None),
+        ("fast msgpack + zstd", Response_Encoding.MSGPACK_MEDIA_TYPE, "zstd"),
+    ]
+    for label, accept, encoding in variants:
+        if encoding == "zstd" and Response_Encoding.zstandard is None:
+            continue
+        elapsed, size = measure(
+            label,
+            lambda: Response_Encoding.encode_response(
+                _github_payload(result), accept, encoding
+            )[0],
+            args.iterations,
+        )
+        print(
+            f"{'':<28} {elapsed / reference:9.2f}x baseline CPU"
+            f"  {size / reference_bytes:10.0%} of baseline bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
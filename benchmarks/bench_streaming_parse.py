@@ -0,0 +1,112 @@
+"""
+Compare peak memory of parsing a large repositories page in one go against
+parsing it as it streams in.
+
+The GraphQL endpoint is replaced by an in-process transport that generates
+the response body in chunks, so the only large allocations measured are the
+scraper's own. READMEs go to a temporary blob store.
+
+Run from the repository root:
+
+    python benchmarks/bench_streaming_parse.py --repos 100 --readme-kb 256
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GITHUB_TOKEN", "benchmark")
+
+import httpx
+
+import Github_Scraper
+
+FIELDS = ["name", "stars", "languages", "updated_at", "readme"]
+
+
+def repository_node(i, readme_kb):
+    return {
+        "name": f"repo-{i}",
+        "stargazerCount": i,
+        "languages": {"nodes": [{"name": "Python"}], "totalCount": 1},
+        "updatedAt": "2024-06-01T09:30:00Z",
+        "readme": {"text": f"# repo-{i}\n" + "x" * (readme_kb * 1024)},
+    }
+
+
+def body_chunks(repos, readme_kb):
+    """Yield the response body piece by piece, one repository node at a time"""
+    yield (
+        b'{"data":{"rateLimit":{"cost":1,"remaining":4999,'
+        b'"resetAt":"2030-01-01T00:00:00Z","limit":5000},'
+        b'"user":{"repositories":{"totalCount":%d,'
+        b'"pageInfo":{"endCursor":null,"hasNextPage":false},"nodes":[' % repos
+    )
+    for i in range(repos):
+        node = json.dumps(repository_node(i, readme_kb)).encode("utf-8")
+        yield node if i == 0 else b"," + node
+    yield b"]}}}}"
+
+
+def install_transport(repos, readme_kb):
+    async def stream():
+        for chunk in body_chunks(repos, readme_kb):
+            yield chunk
+
+    def handler(request):
+        return httpx.Response(200, content=stream())
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    Github_Scraper.get_http_client = lambda: client
+
+
+async def scrape_page(streaming):
+    os.environ["GITHUB_STREAMING_PARSE"] = "true" if streaming else "false"
+    pages = Github_Scraper.iter_repository_pages_async(
+        "benchmark", None, FIELDS, max_repos=100
+    )
+    return [record async for page in pages for record in page]
+
+
+def measure(label, streaming):
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = asyncio.run(scrape_page(streaming))
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<22} {peak / 1024 / 1024:8.1f} MiB peak  {elapsed:8.1f} ms"
+        f"  {len(records)} records"
+    )
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repos", type=int, default=100)
+    parser.add_argument("--readme-kb", type=int, default=256)
+    args = parser.parse_args()
+
+    if Github_Scraper.ijson is None:
+        print("❌ ijson is not installed, there is no streaming parser to measure")
+        return
+
+    Github_Scraper.readme_store = Github_Scraper.ReadmeBlobStore(tempfile.mkdtemp())
+    install_transport(args.repos, args.readme_kb)
+    body_mb = args.repos * args.readme_kb / 1024
+    print(f"📦 {args.repos} repositories, about {body_mb:.0f} MiB of READMEs")
+
+    whole = measure("response.json()", streaming=False)
+    streamed = measure("streaming (ijson)", streaming=True)
+    print(f"{'':<22} {streamed / whole:8.0%} of the one-shot peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Minimal in-process IMAP server standing in for a real mailbox in benchmarks.
+
+It implements just enough of IMAP4rev1 for the verification code paths:
+LOGIN, SELECT, STATUS, CAPABILITY, NOOP, IDLE, LOGOUT, and SEARCH and FETCH
+(plain and UID) with FROM, SUBJECT, SINCE, UID, OR and ALL keys. Every
+command can be delayed to simulate the network round trip.
+"""
+
+import email.utils
+import functools
+import re
+import select
+import socket
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+
+def build_message(sender, subject, body, date=None):
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = "recruiter@example.com"
+    message["Subject"] = subject
+    message["Date"] = email.utils.formatdate(date or time.time())
+    message.set_content(body)
+    return message.as_bytes()
+
+
+class Mailbox:
+    def __init__(self):
+        self.messages = []  # (uid, internal date, bytes)
+        self.next_uid = 1
+        self.lock = threading.Condition()
+        self.commands = []
+        self.bytes_sent = 0
+
+    def add(self, raw, date=None):
+        with self.lock:
+            self.messages.append((self.next_uid, date or time.time(), raw))
+            self.next_uid += 1
+            self.lock.notify_all()
+
+
+def _tokens(text):
+    return re.findall(r'"[^"]*"|\(|\)|[^\s()]+', text)
+
+
+@functools.lru_cache(maxsize=None)
+def _since(date):
+    return time.mktime(time.strptime(date, "%d-%b-%Y"))
+
+
+@functools.lru_cache(maxsize=65536)
+def _header(raw, name):
+    match = re.search(
+        rb"^" + name.encode() + rb":\s*(.*)$", raw, re.IGNORECASE | re.MULTILINE
+    )
+    return match.group(1).decode(errors="replace").strip() if match else ""
+
+
+def _parse(tokens):
+    """Parse one search key into a tree, consuming its tokens"""
+    token = tokens.pop(0)
+    upper = token.upper()
+    if upper == "(":
+        keys = []
+        while tokens[0] != ")":
+            keys.append(_parse(tokens))
+        tokens.pop(0)
+        return ("AND", keys)
+    if upper == "OR":
+        return ("OR", [_parse(tokens), _parse(tokens)])
+    if upper == "ALL":
+        return ("AND", [])
+    if upper in ("FROM", "SUBJECT", "SINCE", "UID"):
+        return (upper, tokens.pop(0).strip('"'))
+    raise ValueError(f"unsupported search key {token}")
+
+
+def _match(key, uid, date, raw, max_uid):
+    """Evaluate a parsed search key against one message, short-circuiting"""
+    kind, value = key
+    if kind == "AND":
+        return all(_match(k, uid, date, raw, max_uid) for k in value)
+    if kind == "OR":
+        return any(_match(k, uid, date, raw, max_uid) for k in value)
+    if kind in ("FROM", "SUBJECT"):
+        return value.lower() in _header(raw, kind.title()).lower()
+    if kind == "SINCE":
+        return date >= _since(value)
+    return _in_set(value, uid, max_uid)
+
+
+def _in_set(spec, value, max_value):
+    for part in spec.split(","):
+        if ":" in part:
+            low, high = part.split(":")
+            low = max_value if low == "*" else int(low)
+            high = max_value if high == "*" else int(high)
+            if min(low, high) <= value <= max(low, high):
+                return True
+        elif (max_value if part == "*" else int(part)) == value:
+            return True
+    return False
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def send(self, line):
+        data = line if isinstance(line, bytes) else line.encode()
+        self.server.mailbox.bytes_sent += len(data)
+        self.wfile.write(data)
+
+    def handle(self):
+        # Replies are written piecemeal; without this Nagle's algorithm adds
+        # a delayed-ACK stall to every multi-line reply
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        box = self.server.mailbox
+        self.send("* OK fake IMAP ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            tag, _, rest = line.decode().rstrip("\r\n").partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+            box.commands.append(rest)
+            if command == "UID":
+                sub, _, args = args.partition(" ")
+                if not self.dispatch(tag, sub.upper(), args, True):
+                    return
+            elif not self.dispatch(tag, command, args, False):
+                return
+
+    def dispatch(self, tag, command, args, by_uid):
+        box = self.server.mailbox
+        if command == "CAPABILITY":
+            caps = "IMAP4rev1 IDLE" if self.server.idle else "IMAP4rev1"
+            self.send(f"* CAPABILITY {caps}\r\n{tag} OK done\r\n")
+        elif command in ("LOGIN", "NOOP", "CHECK"):
+            self.send(f"{tag} OK done\r\n")
+        elif command in ("SELECT", "EXAMINE"):
+            with box.lock:
+                self.send(f"* {len(box.messages)} EXISTS\r\n")
+                self.send(f"* OK [UIDNEXT {box.next_uid}] next\r\n")
+            self.send(f"{tag} OK [READ-WRITE] selected\r\n")
+        elif command == "STATUS":
+            with box.lock:
+                self.send(f"* STATUS INBOX (UIDNEXT {box.next_uid})\r\n")
+            self.send(f"{tag} OK done\r\n")
+        elif command == "SEARCH":
+            tokens = _tokens(args)
+            if tokens and tokens[0].upper() == "CHARSET":
+                tokens = tokens[2:]
+            with box.lock:
+                messages = list(box.messages)
+            max_uid = messages[-1][0] if messages else 0
+            found = []
+            keys = []
+            while tokens:
+                keys.append(_parse(tokens))
+            key = ("AND", keys)
+            for seq, (uid, date, raw) in enumerate(messages, 1):
+                if _match(key, uid, date, raw, max_uid):
+                    found.append(uid if by_uid else seq)
+            self.send(f"* SEARCH {' '.join(map(str, found))}\r\n{tag} OK done\r\n")
+        elif command == "FETCH":
+            spec, _, items = args.partition(" ")
+            with box.lock:
+                messages = list(box.messages)
+            max_value = (
+                (messages[-1][0] if by_uid else len(messages)) if messages else 0
+            )
+            for seq, (uid, date, raw) in enumerate(messages, 1):
+                if not _in_set(spec, uid if by_uid else seq, max_value):
+                    continue
+                upper = items.upper()
+                if "HEADER.FIELDS" in upper:
+                    names = re.search(r"HEADER\.FIELDS \(([^)]*)\)", upper).group(1)
+                    payload = (
+                        b"".join(
+                            f"{name.title()}: {_header(raw, name)}\r\n".encode()
+                            for name in names.split()
+                        )
+                        + b"\r\n"
+                    )
+                    key = f"BODY[HEADER.FIELDS ({names})]"
+                else:
+                    payload, key = raw, "RFC822"
+                self.send(f"* {seq} FETCH (UID {uid} {key} {{{len(payload)}}}\r\n")
+                self.send(payload + b")\r\n")
+            self.send(f"{tag} OK done\r\n")
+        elif command == "IDLE":
+            self.send("+ idling\r\n")
+            with box.lock:
+                seen = len(box.messages)
+            while True:
+                readable, _, _ = select.select([self.connection], [], [], 0.05)
+                if readable:
+                    line = self.rfile.readline()
+                    if not line:
+                        return False
+                    if line.strip().upper() == b"DONE":
+                        break
+                with box.lock:
+                    if len(box.messages) > seen:
+                        seen = len(box.messages)
+                        self.send(f"* {seen} EXISTS\r\n")
+            self.send(f"{tag} OK idle done\r\n")
+        elif command == "LOGOUT":
+            self.send(f"* BYE\r\n{tag} OK bye\r\n")
+            return False
+        else:
+            self.send(f"{tag} BAD unknown\r\n")
+        return True
+
+
+class FakeIMAPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, idle=True, latency=0.0):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.mailbox = Mailbox()
+        self.idle = idle
+        self.latency = latency
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
@@ -0,0 +1,38 @@
+from Circuit_Breaker import CircuitBreaker
+
+
+def _half_open_breaker(monkeypatch):
+    monkeypatch.setenv("LINKEDIN_BREAKER_MIN_CALLS", "1")
+    monkeypatch.setenv("LINKEDIN_BREAKER_COOLDOWN", "0")
+    breaker = CircuitBreaker("test")
+    breaker.record(True)
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_only_the_probe_owner_releases_the_probe(monkeypatch):
+    breaker = _half_open_breaker(monkeypatch)
+    recheck_at, probe = breaker.admit()
+    assert recheck_at is None and probe is not None
+
+    # A call admitted before the breaker opened ends while the probe runs
+    breaker.release()
+    recheck_at, second = breaker.admit()
+    assert recheck_at is not None and second is None
+
+    breaker.release(probe)
+    recheck_at, second = breaker.admit()
+    assert recheck_at is None and second is not None
+
+
+def test_probe_outcome_closes_or_reopens(monkeypatch):
+    breaker = _half_open_breaker(monkeypatch)
+    _, probe = breaker.admit()
+    breaker.record(True, probe)
+    assert breaker.state == "open" and breaker.trips == 2
+
+    _, probe = breaker.admit()
+    breaker.record(False)  # Not the probe: the breaker stays half-open
+    assert breaker.state == "half_open"
+    breaker.record(False, probe)
+    assert breaker.state == "closed"
@@ -0,0 +1,86 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from Contribution_Analytics import contribution_metrics, score_cohort
+
+
+def _days(first, counts):
+    start = date.fromisoformat(first)
+    return [
+        {"date": (start + timedelta(days=offset)).isoformat(), "count": count}
+        for offset, count in enumerate(counts)
+    ]
+
+
+def _loop_streaks(counts):
+    """The per-day loop the vectorized streaks replace"""
+    longest = run = 0
+    for count in counts:
+        run = run + 1 if count > 0 else 0
+        longest = max(longest, run)
+
+    # Today may not have seen activity yet, so a streak can end yesterday
+    current = 0
+    day = len(counts) - 1
+    if day >= 0 and counts[day] == 0:
+        day -= 1
+    while day >= 0 and counts[day] > 0:
+        current += 1
+        day -= 1
+    return current, longest
+
+
+@pytest.mark.parametrize(
+    "first, counts",
+    [
+        ("2024-01-01", [0] * 30),
+        ("2024-01-01", [0, 1, 1, 0, 2, 3, 1]),  # Streak ending today
+        ("2024-01-01", [1, 1, 0, 1, 1, 1, 0]),  # Gap on the last day
+        ("2024-01-01", [0, 1, 1, 0, 1, 0, 0]),  # Gaps on the last two days
+        ("2024-01-01", [4] * 10),
+        ("2024-01-01", [3]),
+        ("2024-01-01", [0]),
+        ("2024-02-27", [1, 1, 1, 1, 0, 1]),  # Through February 29
+        ("2023-12-30", [1, 1, 1, 1]),  # Across a year boundary
+    ],
+)
+def test_streaks_match_the_per_day_loop(first, counts):
+    metrics = contribution_metrics(_days(first, counts))
+    current, longest = _loop_streaks(counts)
+    assert metrics["current_streak"] == current
+    assert metrics["longest_streak"] == longest
+    assert metrics["total_contributions"] == sum(counts)
+
+
+def test_leap_year_covers_366_days():
+    counts = [1] * 366
+    metrics = contribution_metrics(_days("2024-01-01", counts))
+    assert metrics["current_streak"] == metrics["longest_streak"] == 366
+    assert metrics["active_day_ratio"] == 1.0
+
+
+def test_no_days():
+    metrics = contribution_metrics([])
+    assert metrics["current_streak"] == metrics["longest_streak"] == 0
+    assert metrics["total_contributions"] == 0
+
+
+def test_cohort_rows_match_the_per_day_loop():
+    rng = random.Random(7)
+    cohort = [[rng.choice([0, 0, 1, 2]) for _ in range(400)] for _ in range(25)] + [
+        [0] * 400,
+        [1] * 400,
+    ]
+    rows = score_cohort([_days("2023-06-01", counts) for counts in cohort])
+    for counts, row in zip(cohort, rows):
+        assert (row["current_streak"], row["longest_streak"]) == _loop_streaks(counts)
+        assert row == contribution_metrics(_days("2023-06-01", counts))
+
+
+def test_weekday_distribution_follows_the_calendar():
+    # 2024-01-01 was a Monday
+    metrics = contribution_metrics(_days("2024-01-01", [1, 0, 0, 0, 0, 0, 3]))
+    assert metrics["weekday_distribution"]["monday"] == 0.25
+    assert metrics["weekday_distribution"]["sunday"] == 0.75
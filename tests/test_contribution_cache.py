@@ -0,0 +1,17 @@
+from Github_Scraper import ContributionYearCache
+
+
+def test_memory_is_bounded_and_disk_keeps_everything(tmp_path):
+    cache = ContributionYearCache(root=str(tmp_path), max_entries=2)
+    for year in (2020, 2021, 2022):
+        cache.put("alice", year, {"year": year})
+    assert list(cache._years) == [("alice", 2021), ("alice", 2022)]
+    # Evicted from memory, read back from disk
+    assert cache.get("Alice", 2020) == {"year": 2020}
+    assert list(cache._years) == [("alice", 2022), ("alice", 2020)]
+
+
+def test_invalid_logins_are_not_written(tmp_path):
+    cache = ContributionYearCache(root=str(tmp_path))
+    cache.put("../etc", 2020, {"year": 2020})
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import LinkedIn_Scraper
+
+
+class _FakeHandler:
+    """Handler stand-in whose connect succeeds only with the right password"""
+
+    slow = threading.Event()
+
+    def __init__(self, email_address, email_password, imap_server=None):
+        self.email_address = email_address
+        self.email_password = email_password
+        self.disconnected = False
+
+    def connect(self):
+        if self.email_address.startswith("slow"):
+            self.slow.wait(5)
+        return self.email_password == "right"
+
+    def start_listener(self):
+        pass
+
+    def start_keepalive(self):
+        pass
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+def test_wrong_password_leaves_the_shared_handler_alone(monkeypatch):
+    monkeypatch.setattr(LinkedIn_Scraper, "EmailVerificationHandler", _FakeHandler)
+    monkeypatch.setattr(LinkedIn_Scraper, "_email_handlers", {})
+    monkeypatch.setattr(LinkedIn_Scraper, "_email_connect_locks", {})
+
+    shared = LinkedIn_Scraper.get_email_handler("a@example.com", "right", "imap")
+    assert LinkedIn_Scraper.get_email_handler("a@example.com", "wrong", "imap") is None
+    assert not shared.disconnected
+    assert (
+        LinkedIn_Scraper.get_email_handler("A@example.com", "right", "imap") is shared
+    )
+
+
+def test_connecting_one_mailbox_does_not_block_others(monkeypatch):
+    monkeypatch.setattr(LinkedIn_Scraper, "EmailVerificationHandler", _FakeHandler)
+    monkeypatch.setattr(LinkedIn_Scraper, "_email_handlers", {})
+    monkeypatch.setattr(LinkedIn_Scraper, "_email_connect_locks", {})
+
+    _FakeHandler.slow.clear()
+    slow = threading.Thread(
+        target=LinkedIn_Scraper.get_email_handler,
+        args=("slow@example.com", "right", "imap"),
+    )
+    slow.start()
+    try:
+        time.sleep(0.1)
+        started = time.time()
+        assert LinkedIn_Scraper.get_email_handler("b@example.com", "right", "imap")
+        assert time.time() - started < 1
+    finally:
+        _FakeHandler.slow.set()
+        slow.join()
@@ -0,0 +1,32 @@
+import asyncio
+
+import Github_Scraper
+from Github_Scraper import GitHubScrapeBatcher, TokenPool
+
+
+def test_malformed_url_does_not_fail_the_batch(monkeypatch):
+    monkeypatch.setattr(Github_Scraper, "_token_pool", TokenPool(["token-a"]))
+    sent = []
+
+    async def post_graphql(query, variables, token=None, transform_node=None):
+        sent.append(variables)
+        return {"data": {}}
+
+    monkeypatch.setattr(Github_Scraper, "_post_graphql", post_graphql)
+
+    async def scrape_all():
+        batcher = GitHubScrapeBatcher(window=0.01)
+        return await asyncio.gather(
+            batcher.scrape("1", "https://github.com/alice"),
+            batcher.scrape("2", "https://gitlab.com/carol"),
+            batcher.scrape("3", "https://github.com/bob"),
+        )
+
+    alice, carol, bob = asyncio.run(scrape_all())
+    assert len(sent) == 1
+    logins = {
+        name: value for name, value in sent[0].items() if name.startswith("login")
+    }
+    assert sorted(logins.values()) == ["alice", "bob"]
+    assert "Not a GitHub profile URL" in carol["data"][0]["error"]
+    assert "not found" in alice["data"][0]["error"]
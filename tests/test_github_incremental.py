@@ -0,0 +1,77 @@
+import asyncio
+
+import Github_Scraper
+from Github_Scraper import GitHubQueryError, QueryPlan, SnapshotStore
+
+
+def _user(names, has_next_page):
+    return {
+        "contributionsCollection": {
+            "contributionCalendar": {
+                "totalContributions": 3,
+                "weeks": [
+                    {
+                        "contributionDays": [
+                            {"date": "2026-01-01", "contributionCount": 3}
+                        ]
+                    }
+                ],
+            }
+        },
+        "repositories": {
+            "totalCount": 1000,
+            "nodes": [
+                {"name": name, "updatedAt": f"2026-01-0{day}T00:00:00Z"}
+                for day, name in names
+            ],
+            "pageInfo": {"hasNextPage": has_next_page, "endCursor": "cursor"},
+        },
+    }
+
+
+def _refresh(monkeypatch, tmp_path, responses):
+    store = SnapshotStore(root=str(tmp_path))
+    monkeypatch.setattr(Github_Scraper, "snapshot_store", store)
+    requests = []
+
+    async def post_graphql(query, variables, token=None, transform_node=None):
+        requests.append(variables)
+        response = responses[len(requests) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return {"data": {"user": response}}
+
+    monkeypatch.setattr(Github_Scraper, "_post_graphql", post_graphql)
+
+    async def refresh():
+        tracker = Github_Scraper._start_cost_tracking()
+        result = await Github_Scraper.get_github_profile_incremental_async(
+            "alice", None, fields=["name"], max_repos=1000
+        )
+        return result, tracker
+
+    return store, requests, asyncio.run(refresh())
+
+
+def test_repository_error_keeps_the_contributions(monkeypatch, tmp_path):
+    responses = [_user([(2, "a")], True), GitHubQueryError("secondary rate limit")]
+    _, _, ((profile, refresh), _) = _refresh(monkeypatch, tmp_path, responses)
+    assert profile[0]["total_contributions"] == 3
+    assert profile[1] == {"error": "secondary rate limit"}
+    assert refresh is None
+
+
+def test_prediction_uses_the_incremental_page_size(monkeypatch, tmp_path):
+    monkeypatch.setenv("GITHUB_INCREMENTAL_PAGE_SIZE", "20")
+    store = SnapshotStore(root=str(tmp_path))
+    plan = QueryPlan(["name"], 1000)
+    store.save("alice", plan, "2026-01-02T00:00:00Z", [])
+
+    responses = [_user([(3, "b"), (1, "a")], True)]
+    _, requests, ((profile, refresh), tracker) = _refresh(
+        monkeypatch, tmp_path, responses
+    )
+    assert requests[0]["first"] == 20
+    assert len(requests) == 1
+    assert tracker["predicted"] == 1
+    assert refresh["changed"] == 1
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+import Github_Scraper
+from Github_Scraper import (
+    DEFAULT_REPOSITORY_FIELDS,
+    QueryPlan,
+    ReadmeBlobStore,
+    estimate_query_cost,
+)
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), "fixtures", "github_profile_page.json"
+)
+
+
+class _ChunkedStream(httpx.AsyncByteStream):
+    def __init__(self, body, chunk_size):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start : start + self.chunk_size]
+
+
+def _body(alias="user"):
+    with open(FIXTURE, "rb") as f:
+        data = json.load(f)
+    if alias != "user":
+        data["data"][alias] = data["data"].pop("user")
+    return data, json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _parse_streaming(body, chunk_size, plan):
+    response = httpx.Response(200, stream=_ChunkedStream(body, chunk_size))
+    return asyncio.run(Github_Scraper._parse_streaming(response, plan.transform_node))
+
+
+@pytest.fixture(autouse=True)
+def readme_store(tmp_path, monkeypatch):
+    store = ReadmeBlobStore(root=str(tmp_path))
+    monkeypatch.setattr(Github_Scraper, "readme_store", store)
+    return store
+
+
+@pytest.mark.skipif(Github_Scraper.ijson is None, reason="ijson not installed")
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+@pytest.mark.parametrize("alias", ["user", "u1"])
+def test_streaming_parse_matches_one_shot_parse(chunk_size, alias):
+    plan = QueryPlan()
+    data, body = _body(alias)
+    streamed = _parse_streaming(body, chunk_size, plan)
+
+    streamed_page = streamed["data"][alias]["repositories"]
+    page = data["data"][alias]["repositories"]
+    records = Github_Scraper._page_records(streamed_page, plan.fields)
+    assert records == Github_Scraper._page_records(page, plan.fields)
+    assert [record["name"] for record in records] == [
+        "hello-world",
+        "Spoon-Knife",
+        "linguist",
+    ]
+
+    # Everything but the repository nodes comes through untouched
+    assert streamed_page.pop("nodes_processed") is True
+    del streamed_page["nodes"], page["nodes"]
+    assert streamed == data
+
+
+def test_default_page_cost_matches_the_reported_cost():
+    data, _ = _body()
+    # One request for the repositories connection, plus one per repository
+    # for each of its 7 nested connections: (1 + 100 * 7) / 100 points
+    assert estimate_query_cost(DEFAULT_REPOSITORY_FIELDS, 100) == 7
+    assert data["data"]["rateLimit"]["cost"] == 7
+
+
+def test_scalar_fields_cost_one_point():
+    assert estimate_query_cost(["name", "stars", "updated_at"], 100) == 1
+
+
+def test_predicted_cost_follows_the_pages():
+    # Pages of 100, 100 and 50 repositories
+    assert QueryPlan(max_repos=300).predict_cost(250) == 7 + 7 + 4
+    # Capped at max_repos
+    assert QueryPlan(max_repos=100).predict_cost(250) == 7
+
+
+def test_split_plan_pays_for_details_once():
+    plan = QueryPlan(max_repos=300, detail_top_n=10)
+    assert plan.split
+    # Three scalar pages, then 10 repositories x 7 selections in one query
+    assert plan.predict_cost(250) == 3 + 1
+    assert plan.predict_cost(0) == 1
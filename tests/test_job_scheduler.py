@@ -0,0 +1,65 @@
+import threading
+import time
+
+from Job_Scheduler import Job, JobScheduler
+
+
+class _ClosedBreaker:
+    """Breaker stub that keeps parking every attempt"""
+
+    def __init__(self):
+        self.parked = threading.Event()
+
+    def check(self):
+        pass
+
+    def admit(self):
+        self.parked.set()
+        return time.time() + 0.05, None
+
+    def release(self, probe=None):
+        pass
+
+    def record(self, failed, probe=None):
+        pass
+
+    def stats(self):
+        return {}
+
+
+def test_finished_job_ignores_later_transitions():
+    job = Job({}, max_attempts=1)
+    job.record("cancelled")
+    job.record("running", step="cancel_requested")
+    job.progress("logged_in")
+    assert job.status == "cancelled"
+    assert [event["status"] for event in job.events] == ["queued", "cancelled"]
+
+
+def test_cancelled_parked_job_is_not_parked_again():
+    breaker = _ClosedBreaker()
+    scheduler = JobScheduler(lambda **kwargs: None, workers=1, breaker=breaker)
+    job = scheduler.submit()
+    assert breaker.parked.wait(2)
+    scheduler.cancel(job.id)
+    time.sleep(0.2)
+    scheduler.shutdown()
+    assert job.status == "cancelled"
+    assert job.events[-1]["status"] == "cancelled"
+
+
+def test_cancel_running_job_then_finish():
+    started = threading.Event()
+
+    def run(progress, cancel):
+        started.set()
+        cancel.sleep(5)
+
+    scheduler = JobScheduler(run, workers=1)
+    job = scheduler.submit()
+    assert started.wait(2)
+    scheduler.cancel(job.id)
+    assert job.wait(2)
+    scheduler.shutdown()
+    assert job.status == "cancelled"
+    assert scheduler.cancel(job.id).status == "cancelled"
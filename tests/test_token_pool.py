@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import Github_Scraper
+from Github_Scraper import TokenPool
+
+
+def _paced_pool(remaining=100, window=2.0):
+    """One token below the reserve, so its requests are spaced out"""
+    pool = TokenPool(["token-a"])
+    state = pool.states()[0]
+    state.update(remaining=remaining, reset_at=time.time() + window, cost=1)
+    return pool, state
+
+
+def test_concurrent_acquires_are_spaced_out():
+    pool, state = _paced_pool()
+    interval = 2.0 / 100
+
+    async def acquire_all():
+        async def acquire():
+            await pool.acquire()
+            return time.monotonic()
+
+        started = time.monotonic()
+        fired = await asyncio.gather(*(acquire() for _ in range(10)))
+        return [moment - started for moment in sorted(fired)]
+
+    fired = asyncio.run(acquire_all())
+    # Sleeps never end early, so each request waits at least for its slot
+    for index, moment in enumerate(fired):
+        assert moment >= interval * index * 0.8
+    assert state.requests == 10
+
+
+def test_acquire_reserves_expected_cost():
+    pool, state = _paced_pool(remaining=100)
+    asyncio.run(pool.acquire())
+    assert state.remaining == 99
+
+
+def test_retry_after_accepts_http_dates():
+    assert Github_Scraper._parse_retry_after("30") == 30
+    assert Github_Scraper._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 1
+    assert Github_Scraper._parse_retry_after("soon") == 60
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+
+import pytest
+
+from Job_Scheduler import CancellationToken, JobCancelled
+from Worker_Pool import WorkerCrashed, WorkerPool, call_parent
+
+
+def _warm(slot, cancel=None):
+    time.sleep(0.5)
+    os.environ["WARMED_SLOT"] = str(slot)
+
+
+def _slow_warm(slot, cancel=None):
+    time.sleep(30)
+
+
+def _target(progress=None, cancel=None, **kwargs):
+    return os.environ.get("WARMED_SLOT")
+
+
+def _cleanup():
+    directory = os.environ["CLEANUP_DIR"]
+    open(os.path.join(directory, str(os.getpid())), "w").close()
+
+
+def test_jobs_wait_for_warm_up_and_workers_clean_up(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLEANUP_DIR", str(tmp_path))
+    monkeypatch.setenv("LINKEDIN_PROCESS_WORKERS", "true")
+    monkeypatch.setenv("LINKEDIN_WORKER_MAX_JOBS", "1")
+    pool = WorkerPool(_target, size=1, warm=_warm, cleanup=_cleanup)
+    try:
+        pool.start()
+        assert not pool.wait_ready(0)
+        # Dispatched only once warmed, then recycled after its one job
+        assert pool.run() == "0"
+        assert len(os.listdir(tmp_path)) == 1
+        assert pool.wait_ready(30)
+    finally:
+        pool.shutdown()
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def _relay_warm(slot, cancel=None):
+    os.environ["WARM_REPLY"] = str(call_parent("owner", cancel=cancel))
+
+
+def _relay_target(progress=None, cancel=None, **kwargs):
+    return os.environ["WARM_REPLY"], call_parent("owner", cancel=cancel)
+
+
+def test_services_run_in_the_api_process(monkeypatch):
+    monkeypatch.setenv("LINKEDIN_PROCESS_WORKERS", "true")
+    calls = []
+
+    def owner(cancel=None):
+        calls.append(cancel)
+        return os.getpid()
+
+    pool = WorkerPool(
+        _relay_target, size=1, warm=_relay_warm, services={"owner": owner}
+    )
+    try:
+        assert pool.run() == (str(os.getpid()), os.getpid())
+    finally:
+        pool.shutdown()
+    assert len(calls) == 2
+
+
+def test_waiting_jobs_fail_on_shutdown_or_cancel(monkeypatch):
+    monkeypatch.setenv("LINKEDIN_PROCESS_WORKERS", "true")
+    pool = WorkerPool(_target, size=1, warm=_slow_warm)
+    try:
+        cancel = CancellationToken()
+        threading.Timer(0.5, cancel.cancel).start()
+        with pytest.raises(JobCancelled):
+            pool.run(cancel=cancel)
+
+        # Still warming up when the pool shuts down
+        threading.Timer(0.5, pool.shutdown).start()
+        started = time.time()
+        with pytest.raises(WorkerCrashed):
+            pool.run()
+        assert time.time() - started < 5
+    finally:
+        pool.shutdown()